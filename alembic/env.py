@@ -5,9 +5,15 @@ from sqlalchemy import pool
 
 from alembic import context
 
+from api.configs.db import Base, DATABASE_URL
+# Import model để các bảng được đăng ký vào Base.metadata (cho autogenerate)
+from src.models import user_model, role_model, user_role_model, blacklist_model  # noqa: F401
+
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
+# migrate.py có thể truyền URL khác qua config.attributes (vd. database tạm khi test)
+config.set_main_option("sqlalchemy.url", config.attributes.get("url", DATABASE_URL))
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
@@ -18,7 +24,7 @@ if config.config_file_name is not None:
 # for 'autogenerate' support
 # from myapp import mymodel
 # target_metadata = mymodel.Base.metadata
-target_metadata = None
+target_metadata = Base.metadata
 
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
@@ -0,0 +1,42 @@
+"""store revoked tokens as sha256 digest
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('blacklist_token', sa.Column('token_hash', sa.String(64), nullable=True))
+    # Token cũ không có jti -> key thu hồi là sha256 của cả chuỗi JWT (giống revocation_key)
+    op.execute(
+        "UPDATE blacklist_token SET token_hash = encode(sha256(convert_to(token, 'UTF8')), 'hex')"
+    )
+    op.alter_column('blacklist_token', 'token_hash', nullable=False)
+    op.create_unique_constraint('blacklist_token_token_hash_key', 'blacklist_token', ['token_hash'])
+    op.drop_constraint('blacklist_token_token_key', 'blacklist_token', type_='unique')
+    op.drop_column('blacklist_token', 'token')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Không khôi phục được JWT gốc, giữ digest trong cột token để không mất dòng nào
+    op.add_column('blacklist_token', sa.Column('token', sa.String(), nullable=True))
+    op.execute("UPDATE blacklist_token SET token = token_hash")
+    op.alter_column('blacklist_token', 'token', nullable=False)
+    op.create_unique_constraint('blacklist_token_token_key', 'blacklist_token', ['token'])
+    op.drop_constraint('blacklist_token_token_hash_key', 'blacklist_token', type_='unique')
+    op.drop_column('blacklist_token', 'token_hash')
@@ -0,0 +1,36 @@
+"""index blacklist_token.expires_at for the expired-token reaper
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY không chạy được trong transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_blacklist_token_expires_at', 'blacklist_token', ['expires_at'],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_blacklist_token_expires_at', table_name='blacklist_token',
+            postgresql_concurrently=True, if_exists=True,
+        )
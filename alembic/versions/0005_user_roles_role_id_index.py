@@ -0,0 +1,36 @@
+"""reverse (role_id, user_id) index on user_roles
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, Sequence[str], None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # PK (user_id, role_id) không dùng được khi lọc chỉ theo role_id
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_user_roles_role_id_user_id', 'user_roles', ['role_id', 'user_id'],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_user_roles_role_id_user_id', table_name='user_roles',
+            postgresql_concurrently=True, if_exists=True,
+        )
@@ -0,0 +1,36 @@
+"""index blacklist_token.blacklisted_at for incremental revocation cache sync
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, Sequence[str], None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Mỗi worker đọc blacklisted_at > mốc đồng bộ trước, khoảng 1 lần/giây
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_blacklist_token_blacklisted_at', 'blacklist_token', ['blacklisted_at'],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_blacklist_token_blacklisted_at', table_name='blacklist_token',
+            postgresql_concurrently=True, if_exists=True,
+        )
@@ -1,34 +1,78 @@
 from datetime import datetime, timedelta, timezone
 import jwt
-from typing import Optional
+from typing import List, Optional, Tuple
+from uuid import uuid4
+import hashlib
+import time
 from pwdlib import PasswordHash
-from passlib.context import CryptContext
+from pwdlib.hashers.argon2 import Argon2Hasher
+from pwdlib.hashers.bcrypt import BcryptHasher
+
+from api.configs.metrics import JWT_SECONDS
 
 SECRET_KEY = "SECRET"  
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 180
 
-password_hash = PasswordHash.recommended()
+# Hasher đầu tiên dùng để hash mới, bcrypt giữ lại để verify các hash cũ
+password_hash = PasswordHash((Argon2Hasher(), BcryptHasher()))
+
+
+def configure_password_hash(params: dict) -> None:
+    # Gọi trong từng process hash với tham số Argon2 đã được tune
+    global password_hash
+    password_hash = PasswordHash((Argon2Hasher(**params), BcryptHasher()))
 
 
 def get_password_hash(password: str) -> str:
     return password_hash.hash(password)
 
 
+def get_password_hashes(passwords: List[str]) -> List[str]:
+    return [password_hash.hash(password) for password in passwords]
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return password_hash.verify(plain_password, hashed_password)
 
 
+def verify_password_and_check(plain_password: str, hashed_password: str) -> Tuple[bool, bool]:
+    # Trả về (đúng mật khẩu, cần hash lại) - hash lại khi là bcrypt hoặc tham số Argon2 đã cũ
+    for hasher in password_hash.hashers:
+        if hasher.identify(hashed_password):
+            if not hasher.verify(plain_password, hashed_password):
+                return False, False
+            current = password_hash.current_hasher
+            return True, hasher is not current or current.check_needs_rehash(hashed_password)
+    return False, False
+
+
 def create_access_token(data: dict) -> str:
     expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    data.update({"exp": expire, "type": "access"})
-    return jwt.encode(data, SECRET_KEY, algorithm=ALGORITHM)
+    data.update({"exp": expire, "type": "access", "jti": uuid4().hex})
+    start = time.perf_counter()
+    token = jwt.encode(data, SECRET_KEY, algorithm=ALGORITHM)
+    JWT_SECONDS.labels("encode").observe(time.perf_counter() - start)
+    return token
+
+
+def token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def revocation_key(token: str, payload: Optional[dict] = None) -> str:
+    # Token mới thu hồi theo jti, token cũ (không có jti) theo sha256 của cả chuỗi JWT
+    jti = payload.get("jti") if payload else None
+    return token_digest(jti or token)
 
 
 def verify_token(token: str) -> Optional[dict]:
+    start = time.perf_counter()
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         return payload
     except jwt.PyJWTError:
         return None
+    finally:
+        JWT_SECONDS.labels("decode").observe(time.perf_counter() - start)
 
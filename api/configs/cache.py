@@ -0,0 +1,31 @@
+import os
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# "memory": chỉ đúng khi chạy 1 worker, "redis": chia sẻ danh sách token bị thu hồi giữa các worker
+REVOCATION_BACKEND = os.getenv("REVOCATION_BACKEND", "memory").lower()
+REVOCATION_BLOOM_CAPACITY = int(os.getenv("REVOCATION_BLOOM_CAPACITY", "100000"))
+REVOCATION_BLOOM_ERROR_RATE = float(os.getenv("REVOCATION_BLOOM_ERROR_RATE", "0.001"))
+# Backend "memory": mỗi worker tự nạp token mới bị thu hồi ở worker khác theo chu kỳ này;
+# quá REVOCATION_MAX_STALENESS_SECONDS chưa đồng bộ được thì hỏi thẳng database
+REVOCATION_SYNC_INTERVAL_SECONDS = float(os.getenv("REVOCATION_SYNC_INTERVAL_SECONDS", "1"))
+REVOCATION_MAX_STALENESS_SECONDS = float(os.getenv("REVOCATION_MAX_STALENESS_SECONDS", "5"))
+# Dọn token hết hạn trong blacklist_token theo từng lô nhỏ để không giữ lock lâu
+REAPER_INTERVAL_SECONDS = float(os.getenv("REAPER_INTERVAL_SECONDS", "300"))
+REAPER_BATCH_SIZE = int(os.getenv("REAPER_BATCH_SIZE", "1000"))
+
+# Cache payload + thông tin user của token đã verify, tránh decode JWT và query user mỗi request
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+TOKEN_CACHE_TTL_SECONDS = float(os.getenv("TOKEN_CACHE_TTL_SECONDS", "60"))
+
+# Bitset role theo user cho require_roles; TTL giới hạn độ trễ khi chạy nhiều worker
+RBAC_CACHE_SIZE = int(os.getenv("RBAC_CACHE_SIZE", "100000"))
+RBAC_CACHE_TTL_SECONDS = float(os.getenv("RBAC_CACHE_TTL_SECONDS", "60"))
+
+# Cache response đã serialize của các endpoint đọc: "memory", "redis" (chia sẻ giữa worker), "off"
+RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "memory").lower()
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "10000"))
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "300"))
+# Backend "memory" nằm riêng trong từng worker: bump version ở worker này không làm mất entry của
+# worker khác, nên entry chỉ được giữ tối đa chừng này giây (tăng lên nếu chỉ chạy 1 worker)
+RESPONSE_CACHE_MEMORY_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_MEMORY_TTL_SECONDS", "5"))
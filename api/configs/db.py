@@ -1,27 +1,95 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from passlib.context import CryptContext
-from typing import Generator
+from typing import AsyncGenerator, Generator
 import os
 
+from api.configs.pool import (
+    PoolStats, InstrumentedQueuePool, InstrumentedAsyncQueuePool, instrument_pool
+)
+from api.configs.metrics import instrument_engine
+
 POSTGRES_USER = os.getenv("POSTGRES_USER", "postgres")
 POSTGRES_PASSWORD = os.getenv("POSTGRES_PASSWORD", "Chelsea1a")
 POSTGRES_DB = os.getenv("POSTGRES_DB", "mydb")
 POSTGRES_HOST = os.getenv("POSTGRES_HOST", "localhost")
 POSTGRES_PORT = os.getenv("POSTGRES_PORT", "5432")
 
+# "sync": psycopg2 + threadpool routes, "async": asyncpg + async routes
+DB_MODE = os.getenv("DB_MODE", "sync").lower()
+
 DATABASE_URL = f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
+ASYNC_DATABASE_URL = f"postgresql+asyncpg://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
+
+# Pool mặc định của SQLAlchemy (5 + 10 overflow) nhỏ hơn nhiều so với threadpool 40 luồng
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+DB_POOL_USE_LIFO = os.getenv("DB_POOL_USE_LIFO", "true").lower() in ("1", "true", "yes")
+
+# Số connection mở sẵn trong lifespan; giới hạn thời gian warm để DB chậm/chưa lên không chặn worker
+DB_POOL_WARM = int(os.getenv("DB_POOL_WARM", str(min(DB_POOL_SIZE, 4))))
+DB_WARM_TIMEOUT = float(os.getenv("DB_WARM_TIMEOUT", "2"))
+
+POOL_OPTIONS = dict(
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+    pool_use_lifo=DB_POOL_USE_LIFO,
+)
 
-engine = create_engine(DATABASE_URL, future=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# DB_MODE=async: engine sync chỉ còn phục vụ các đường chưa có bản async (import COPY, export
+# stream, token reaper, nạp cache thu hồi) -> pool riêng nhỏ, không nhân đôi số connection mỗi worker
+DB_SYNC_POOL_SIZE = int(os.getenv("DB_SYNC_POOL_SIZE", "2"))
+DB_SYNC_MAX_OVERFLOW = int(os.getenv("DB_SYNC_MAX_OVERFLOW", "3"))
+
+SYNC_POOL_OPTIONS = (
+    dict(POOL_OPTIONS, pool_size=DB_SYNC_POOL_SIZE, max_overflow=DB_SYNC_MAX_OVERFLOW)
+    if DB_MODE == "async"
+    else POOL_OPTIONS
+)
+
+pool_stats = PoolStats("primary")
+async_pool_stats = PoolStats("async")
+
+engine = create_engine(DATABASE_URL, future=True, poolclass=InstrumentedQueuePool, **SYNC_POOL_OPTIONS)
+instrument_pool(engine.pool, pool_stats)
+instrument_engine(engine, "primary")
+# expire_on_commit=False: sau commit không SELECT lại object; giá trị server default
+# (created_at, updated_at...) đã được lấy qua RETURNING nhờ eager_defaults trên model
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 Base = declarative_base()
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Async engine chỉ được tạo khi bật DB_MODE=async (cần driver asyncpg)
+async_engine = (
+    create_async_engine(ASYNC_DATABASE_URL, poolclass=InstrumentedAsyncQueuePool, **POOL_OPTIONS)
+    if DB_MODE == "async"
+    else None
+)
+if async_engine is not None:
+    instrument_pool(async_engine.sync_engine.pool, async_pool_stats)
+    instrument_engine(async_engine.sync_engine, "async")
+AsyncSessionLocal = (
+    async_sessionmaker(bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+    if async_engine is not None
+    else None
+)
 
 def get_db() -> Generator[Session, None, None]:
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database is disabled, set DB_MODE=async")
+    async with AsyncSessionLocal() as db:
+        yield db
\ No newline at end of file
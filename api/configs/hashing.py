@@ -0,0 +1,233 @@
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from fastapi import HTTPException, status
+from threading import BoundedSemaphore, Lock
+from typing import List, Optional, Tuple
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import statistics
+import tempfile
+import time
+
+from pwdlib.hashers.argon2 import Argon2Hasher
+
+from api.configs.metrics import PASSWORD_HASH_SECONDS, PASSWORD_HASH_REJECTED
+from api.configs.auth import (
+    configure_password_hash, get_password_hash, get_password_hashes,
+    verify_password, verify_password_and_check
+)
+
+logger = logging.getLogger(__name__)
+
+# Argon2 tốn CPU -> chạy trong process pool riêng thay vì threadpool của request
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(os.cpu_count() or 1)))
+# Số job được phép chờ thêm khi tất cả worker đều bận, vượt quá thì trả 503 ngay
+HASH_QUEUE_SIZE = int(os.getenv("HASH_QUEUE_SIZE", str(HASH_WORKERS * 4)))
+
+# Tune tham số Argon2 để mỗi lần hash mất khoảng HASH_TARGET_MS trên máy hiện tại
+HASH_AUTOTUNE = os.getenv("HASH_AUTOTUNE", "true").lower() in ("1", "true", "yes")
+HASH_TARGET_MS = float(os.getenv("HASH_TARGET_MS", "250"))
+HASH_MEMORY_COST = int(os.getenv("HASH_MEMORY_COST", "65536"))
+HASH_MIN_MEMORY_COST = int(os.getenv("HASH_MIN_MEMORY_COST", "19456"))
+HASH_MAX_TIME_COST = int(os.getenv("HASH_MAX_TIME_COST", "10"))
+# Song song hóa đã nằm ở process pool nên mỗi hash chỉ dùng 1 lane
+HASH_PARALLELISM = int(os.getenv("HASH_PARALLELISM", "1"))
+# Kết quả tune được lưu lại để các worker sau khởi động không phải đo lại. Mặc định nằm ở thư mục
+# gốc project (không phụ thuộc CWD) để mọi worker đọc cùng 1 file và dùng cùng tham số
+HASH_PARAMS_FILE = os.getenv(
+    "HASH_PARAMS_FILE",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), ".hash_params.json"),
+)
+# Worker khởi động cùng lúc chờ worker đang tune tối đa chừng này giây
+HASH_TUNE_LOCK_TIMEOUT = float(os.getenv("HASH_TUNE_LOCK_TIMEOUT", "60"))
+
+
+def _measure_ms(params: dict, samples: int = 3) -> float:
+    hasher = Argon2Hasher(**params)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        hasher.hash("autotune-sample-password")
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def tune_argon2_params(
+    target_ms: float = HASH_TARGET_MS,
+    memory_cost: int = HASH_MEMORY_COST,
+    min_memory_cost: int = HASH_MIN_MEMORY_COST,
+    max_time_cost: int = HASH_MAX_TIME_COST,
+    parallelism: int = HASH_PARALLELISM,
+) -> dict:
+    # Đo 1 vòng với memory_cost ban đầu; máy yếu quá thì giảm memory, còn dư thì tăng time_cost
+    while True:
+        params = {"time_cost": 1, "memory_cost": memory_cost, "parallelism": parallelism}
+        per_pass_ms = _measure_ms(params)
+        if per_pass_ms <= target_ms or memory_cost <= min_memory_cost:
+            break
+        memory_cost = max(memory_cost // 2, min_memory_cost)
+
+    params["time_cost"] = min(max(int(round(target_ms / per_pass_ms)), 1), max_time_cost)
+    logger.info(
+        "Argon2 tuned to %s (%.1f ms per pass, target %.0f ms)", params, per_pass_ms, target_ms
+    )
+    return params
+
+
+@contextmanager
+def _file_lock(path: str, timeout: float = HASH_TUNE_LOCK_TIMEOUT):
+    # Lock bằng file tạo với O_EXCL (chạy được cả trên Windows); lock bị bỏ lại lâu hơn
+    # timeout (process chết giữa chừng) thì coi như hết hạn
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(path) > timeout:
+                    os.remove(path)
+                    continue
+            except OSError:
+                pass
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Timed out waiting for {path}")
+            time.sleep(0.05)
+    try:
+        yield
+    finally:
+        os.close(fd)
+        os.remove(path)
+
+
+def _read_hash_params(path: str) -> Optional[dict]:
+    try:
+        with open(path) as f:
+            params = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if params.get("target_ms") != HASH_TARGET_MS:
+        return None
+    params.pop("target_ms")
+    return params
+
+
+def _write_hash_params(path: str, params: dict) -> None:
+    # Ghi ra file tạm rồi os.replace: worker khác không bao giờ đọc phải file ghi dở
+    directory = os.path.dirname(os.path.abspath(path))
+    with tempfile.NamedTemporaryFile("w", dir=directory, suffix=".tmp", delete=False) as f:
+        json.dump({**params, "target_ms": HASH_TARGET_MS}, f)
+    os.replace(f.name, path)
+
+
+def load_or_tune_hash_params(path: str = HASH_PARAMS_FILE) -> dict:
+    if not HASH_AUTOTUNE:
+        return {
+            "time_cost": int(os.getenv("HASH_TIME_COST", "3")),
+            "memory_cost": HASH_MEMORY_COST,
+            "parallelism": HASH_PARALLELISM,
+        }
+    params = _read_hash_params(path)
+    if params is not None:
+        return params
+
+    # Nhiều worker khởi động cùng lúc: chỉ 1 worker tune, các worker còn lại chờ rồi đọc kết quả,
+    # tránh mỗi worker ra 1 bộ tham số và hash bị rehash qua lại giữa các worker
+    try:
+        with _file_lock(path + ".lock"):
+            params = _read_hash_params(path)
+            if params is None:
+                params = tune_argon2_params()
+                _write_hash_params(path, params)
+    except OSError:
+        logger.warning("Could not persist tuned hash parameters to %s", path, exc_info=True)
+        if params is None:
+            params = tune_argon2_params()
+    return params
+
+
+class HashingExecutor:
+    def __init__(self, workers: int = HASH_WORKERS, queue_size: int = HASH_QUEUE_SIZE) -> None:
+        self.workers = workers
+        self.queue_size = queue_size
+        self.params: Optional[dict] = None
+        self._slots = BoundedSemaphore(workers + queue_size)
+        self._lock = Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def start(self, params: Optional[dict] = None) -> None:
+        with self._lock:
+            if self._executor is None:
+                self.params = params or load_or_tune_hash_params()
+                configure_password_hash(self.params)
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=configure_password_hash,
+                    initargs=(self.params,),
+                )
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+    def submit(self, fn, *args, block: bool = False) -> Future:
+        # block=True chỉ dùng cho job nền (import hàng loạt), gọi từ thread riêng
+        if not self._slots.acquire(blocking=block):
+            PASSWORD_HASH_REJECTED.inc()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please retry",
+                headers={"Retry-After": "1"},
+            )
+        try:
+            if self._executor is None:
+                self.start()
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        start = time.perf_counter()
+
+        def done(_: Future) -> None:
+            self._slots.release()
+            PASSWORD_HASH_SECONDS.labels(fn.__name__).observe(time.perf_counter() - start)
+
+        future.add_done_callback(done)
+        return future
+
+    def hash(self, password: str) -> str:
+        return self.submit(get_password_hash, password).result()
+
+    def hash_many(self, passwords: List[str], chunk_size: int = 64) -> List[str]:
+        # Chia thành nhiều job để tận dụng mọi process, chờ slot trống thay vì trả 503
+        futures = [
+            self.submit(get_password_hashes, passwords[start:start + chunk_size], block=True)
+            for start in range(0, len(passwords), chunk_size)
+        ]
+        return [hashed for future in futures for hashed in future.result()]
+
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return self.submit(verify_password, plain_password, hashed_password).result()
+
+    def verify_and_check(self, plain_password: str, hashed_password: str) -> Tuple[bool, bool]:
+        return self.submit(verify_password_and_check, plain_password, hashed_password).result()
+
+    async def ahash(self, password: str) -> str:
+        return await asyncio.wrap_future(self.submit(get_password_hash, password))
+
+    async def averify(self, plain_password: str, hashed_password: str) -> bool:
+        return await asyncio.wrap_future(self.submit(verify_password, plain_password, hashed_password))
+
+    async def averify_and_check(self, plain_password: str, hashed_password: str) -> Tuple[bool, bool]:
+        return await asyncio.wrap_future(
+            self.submit(verify_password_and_check, plain_password, hashed_password)
+        )
+
+
+hashing_executor = HashingExecutor()
@@ -0,0 +1,136 @@
+from contextvars import ContextVar
+from prometheus_client import Counter, Histogram
+from sqlalchemy import event
+from typing import Optional
+import os
+import time
+
+# Chạy nhiều worker: đặt PROMETHEUS_MULTIPROC_DIR (thư mục rỗng, xóa trước mỗi lần khởi động)
+# để prometheus_client ghi giá trị ra file mmap và /metrics gộp số liệu của mọi worker
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+HASH_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.15, 0.2, 0.25, 0.3, 0.4, 0.5, 0.75, 1, 2, 5)
+STATEMENT_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500)
+
+DB_STATEMENTS = Counter(
+    "db_statements_total", "SQL statements executed", ["engine", "operation"]
+)
+DB_STATEMENT_SECONDS = Histogram(
+    "db_statement_duration_seconds", "SQL statement execution time", ["engine", "operation"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_STATEMENTS_PER_REQUEST = Histogram(
+    "db_statements_per_request", "SQL statements executed per HTTP request", ["handler"],
+    buckets=STATEMENT_COUNT_BUCKETS,
+)
+DB_SECONDS_PER_REQUEST = Histogram(
+    "db_duration_per_request_seconds", "Total SQL time per HTTP request", ["handler"],
+    buckets=LATENCY_BUCKETS,
+)
+POOL_WAIT_SECONDS = Histogram(
+    "db_pool_wait_seconds", "Time spent waiting for a pooled connection", ["pool"],
+    buckets=LATENCY_BUCKETS,
+)
+POOL_TIMEOUTS = Counter(
+    "db_pool_timeouts_total", "Connection checkouts that hit pool_timeout", ["pool"]
+)
+PASSWORD_HASH_SECONDS = Histogram(
+    "password_hash_duration_seconds", "Password hash/verify time including queueing in the hash pool",
+    ["operation"], buckets=HASH_BUCKETS,
+)
+PASSWORD_HASH_REJECTED = Counter(
+    "password_hash_rejected_total", "Hash jobs rejected with 503 because the hash pool was saturated"
+)
+JWT_SECONDS = Histogram(
+    "jwt_duration_seconds", "JWT encode/decode time", ["operation"], buckets=LATENCY_BUCKETS,
+)
+REVOCATION_LOOKUPS = Counter(
+    "revocation_cache_lookups_total", "Revocation checks answered by the cache (hit) or the database (miss)",
+    ["result"],
+)
+RESPONSE_CACHE_REQUESTS = Counter(
+    "response_cache_requests_total", "Cached read endpoint lookups", ["result"]
+)
+
+
+class RequestStats:
+    # Đối tượng mutable: threadpool nhận bản copy của context nhưng vẫn trỏ cùng object
+    __slots__ = ("statements", "db_seconds", "queries")
+
+    def __init__(self) -> None:
+        self.statements = 0
+        self.db_seconds = 0.0
+        # Chỉ khác None khi profiler bật: (statement, parameters, executemany, duration)
+        self.queries: Optional[list] = None
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    return _request_stats.get()
+
+
+def _operation(statement: str) -> str:
+    parts = statement.lstrip().split(None, 1)
+    return parts[0].upper() if parts else "UNKNOWN"
+
+
+def instrument_engine(sync_engine, name: str) -> None:
+    # Gắn vào Engine sync (với async engine thì truyền async_engine.sync_engine)
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        operation = _operation(statement)
+        DB_STATEMENTS.labels(name, operation).inc()
+        DB_STATEMENT_SECONDS.labels(name, operation).observe(elapsed)
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.db_seconds += elapsed
+            if stats.queries is not None:
+                stats.queries.append((statement, parameters, executemany, elapsed))
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(context):
+        starts = context.connection.info.get("query_start") if context.connection is not None else None
+        if starts:
+            starts.pop()
+
+
+def route_label(scope) -> str:
+    # FastAPI gắn APIRoute vào scope sau khi match -> dùng path template, tránh label theo id
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class RequestMetricsMiddleware:
+    # Đếm số câu SQL và tổng thời gian SQL của từng request, gom theo route
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_stats.reset(token)
+            handler = route_label(scope)
+            DB_STATEMENTS_PER_REQUEST.labels(handler).observe(stats.statements)
+            DB_SECONDS_PER_REQUEST.labels(handler).observe(stats.db_seconds)
+
+
+def mark_worker_dead() -> None:
+    # Gọi khi worker tắt để gauge "live" của process này bị loại khỏi kết quả gộp
+    if PROMETHEUS_MULTIPROC_DIR:
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(os.getpid())
@@ -0,0 +1,116 @@
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from threading import Lock
+from typing import Dict, List, Optional
+import time
+
+from api.configs.metrics import POOL_WAIT_SECONDS, POOL_TIMEOUTS
+
+# Mốc histogram thời gian chờ lấy connection (ms)
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class PoolStats:
+    def __init__(self, name: str = "primary") -> None:
+        self.name = name
+        self._lock = Lock()
+        self.bucket_counts: List[int] = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self.wait_count = 0
+        self.wait_sum_ms = 0.0
+        self.wait_max_ms = 0.0
+        self.timeouts = 0
+        self.checkouts = 0
+        self.checkins = 0
+
+    def observe_wait(self, wait_ms: float) -> None:
+        POOL_WAIT_SECONDS.labels(self.name).observe(wait_ms / 1000)
+        index = len(WAIT_BUCKETS_MS)
+        for i, bound in enumerate(WAIT_BUCKETS_MS):
+            if wait_ms <= bound:
+                index = i
+                break
+        with self._lock:
+            self.bucket_counts[index] += 1
+            self.wait_count += 1
+            self.wait_sum_ms += wait_ms
+            self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+
+    def observe_timeout(self) -> None:
+        POOL_TIMEOUTS.labels(self.name).inc()
+        with self._lock:
+            self.timeouts += 1
+
+    def observe_checkout(self) -> None:
+        with self._lock:
+            self.checkouts += 1
+
+    def observe_checkin(self) -> None:
+        with self._lock:
+            self.checkins += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            cumulative = 0
+            buckets = {}
+            for bound, count in zip(WAIT_BUCKETS_MS, self.bucket_counts):
+                cumulative += count
+                buckets[f"le_{bound}ms"] = cumulative
+            buckets["le_inf"] = cumulative + self.bucket_counts[-1]
+            return {
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "timeouts": self.timeouts,
+                "wait_count": self.wait_count,
+                "wait_avg_ms": self.wait_sum_ms / self.wait_count if self.wait_count else 0.0,
+                "wait_max_ms": self.wait_max_ms,
+                "wait_histogram": buckets,
+            }
+
+
+class _WaitTimingMixin:
+    # QueuePool._do_get là chỗ duy nhất request bị block khi pool đã hết connection
+    stats: Optional[PoolStats] = None
+
+    def _do_get(self):
+        if self.stats is None:
+            return super()._do_get()
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.observe_timeout()
+            raise
+        self.stats.observe_wait((time.perf_counter() - start) * 1000)
+        return conn
+
+
+class InstrumentedQueuePool(_WaitTimingMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_WaitTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def instrument_pool(pool, stats: PoolStats) -> None:
+    pool.stats = stats
+
+    @event.listens_for(pool, "checkout")
+    def _on_checkout(dbapi_conn, conn_record, conn_proxy):
+        stats.observe_checkout()
+
+    @event.listens_for(pool, "checkin")
+    def _on_checkin(dbapi_conn, conn_record):
+        stats.observe_checkin()
+
+
+def pool_status(pool) -> Dict:
+    stats = getattr(pool, "stats", None)
+    status = stats.snapshot() if stats is not None else {}
+    status.update({
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+    })
+    return status
@@ -0,0 +1,165 @@
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+from sqlalchemy import event
+from typing import Dict, Iterator, List, Optional, Tuple
+import json
+import logging
+import os
+import re
+import time
+
+from api.configs.metrics import current_request_stats, route_label
+
+logger = logging.getLogger(__name__)
+
+# Bật bằng QUERY_PROFILER=true (dev/staging); tắt thì middleware chỉ chuyển tiếp request
+QUERY_PROFILER = os.getenv("QUERY_PROFILER", "false").lower() in ("1", "true", "yes")
+# Cùng 1 dạng SELECT lặp lại từ ngưỡng này trở lên trong 1 request -> nghi N+1
+PROFILER_N_PLUS_ONE_THRESHOLD = int(os.getenv("PROFILER_N_PLUS_ONE_THRESHOLD", "5"))
+# Request chậm hơn ngưỡng (ms) được ghi profile đầy đủ ra file xoay vòng; rỗng = không ghi
+PROFILER_SLOW_REQUEST_MS = float(os.getenv("PROFILER_SLOW_REQUEST_MS", "500"))
+PROFILER_SLOW_LOG_FILE = os.getenv("PROFILER_SLOW_LOG_FILE", "")
+PROFILER_SLOW_LOG_MAX_BYTES = int(os.getenv("PROFILER_SLOW_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+PROFILER_SLOW_LOG_BACKUPS = int(os.getenv("PROFILER_SLOW_LOG_BACKUPS", "5"))
+
+# IN (...) được mở rộng thành số bind khác nhau tùy số phần tử -> gộp về cùng 1 dạng
+_IN_LIST = re.compile(r"\(\s*(?:%\(\w+\)s|\?|\$\d+)(?:\s*,\s*(?:%\(\w+\)s|\?|\$\d+))*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    return _IN_LIST.sub("(...)", _WHITESPACE.sub(" ", statement).strip())
+
+
+def params_shape(parameters, executemany: bool) -> str:
+    if executemany and isinstance(parameters, (list, tuple)):
+        first = parameters[0] if parameters else None
+        return f"{len(parameters)} x {params_shape(first, False)}"
+    if isinstance(parameters, dict):
+        return "{" + ",".join(sorted(parameters)) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return f"({len(parameters)})"
+    return "-"
+
+
+class QueryProfile:
+    def __init__(self, queries: List[tuple], threshold: int = PROFILER_N_PLUS_ONE_THRESHOLD) -> None:
+        self.count = len(queries)
+        self.db_ms = sum(duration for *_, duration in queries) * 1000
+        groups: Dict[Tuple[str, str], List[float]] = {}
+        for statement, parameters, executemany, duration in queries:
+            key = (statement_shape(statement), params_shape(parameters, executemany))
+            groups.setdefault(key, []).append(duration)
+        self.statements = [
+            {"sql": sql, "params": params, "count": len(durations), "total_ms": round(sum(durations) * 1000, 3)}
+            for (sql, params), durations in sorted(groups.items(), key=lambda item: -sum(item[1]))
+        ]
+        self.n_plus_one = [
+            entry for entry in self.statements
+            if entry["count"] >= threshold and entry["sql"].upper().startswith("SELECT")
+        ]
+
+    def server_timing(self, app_ms: float) -> str:
+        return f'db;dur={self.db_ms:.1f};desc="{self.count} queries", app;dur={app_ms:.1f}'
+
+
+def _slow_logger() -> Optional[logging.Logger]:
+    if not PROFILER_SLOW_LOG_FILE:
+        return None
+    slow = logging.getLogger("query_profiler.slow")
+    if not slow.handlers:
+        handler = RotatingFileHandler(
+            PROFILER_SLOW_LOG_FILE, maxBytes=PROFILER_SLOW_LOG_MAX_BYTES, backupCount=PROFILER_SLOW_LOG_BACKUPS
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        slow.addHandler(handler)
+        slow.setLevel(logging.INFO)
+        slow.propagate = False
+    return slow
+
+
+class QueryProfilerMiddleware:
+    # Ghi lại mọi câu SQL của request (dạng câu lệnh, dạng tham số, thời gian, số lần),
+    # gắn Server-Timing vào response và cảnh báo khi 1 dạng SELECT lặp lại nhiều lần (N+1)
+    def __init__(self, app, enabled: bool = QUERY_PROFILER, slow_ms: float = PROFILER_SLOW_REQUEST_MS) -> None:
+        self.app = app
+        self.enabled = enabled
+        self.slow_ms = slow_ms
+        self.slow_log = _slow_logger() if enabled else None
+
+    async def __call__(self, scope, receive, send):
+        if not self.enabled or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Dùng chung RequestStats do RequestMetricsMiddleware (bọc ngoài) tạo cho request
+        stats = current_request_stats()
+        if stats is None:
+            await self.app(scope, receive, send)
+            return
+        stats.queries = []
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                # Header phải gửi trước body: profile tính tới thời điểm bắt đầu trả response
+                profile = QueryProfile(list(stats.queries))
+                headers = [
+                    (b"server-timing", profile.server_timing((time.perf_counter() - start) * 1000).encode()),
+                    (b"x-query-count", str(profile.count).encode()),
+                ]
+                if profile.n_plus_one:
+                    headers.append((b"x-query-warning", b"n+1"))
+                message["headers"] = [*message.get("headers", []), *headers]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self._report(scope, QueryProfile(stats.queries), (time.perf_counter() - start) * 1000)
+
+    def _report(self, scope, profile: QueryProfile, elapsed_ms: float) -> None:
+        route = route_label(scope)
+        for entry in profile.n_plus_one:
+            logger.warning(
+                "Possible N+1 on %s %s: %d x %s", scope["method"], route, entry["count"], entry["sql"][:200]
+            )
+        if self.slow_log is not None and elapsed_ms >= self.slow_ms:
+            self.slow_log.info(json.dumps({
+                "ts": time.time(),
+                "method": scope["method"],
+                "route": route,
+                "path": scope["path"],
+                "duration_ms": round(elapsed_ms, 3),
+                "db_ms": round(profile.db_ms, 3),
+                "query_count": profile.count,
+                "n_plus_one": [entry["sql"] for entry in profile.n_plus_one],
+                "statements": profile.statements,
+            }))
+
+
+@contextmanager
+def assert_max_queries(max_queries: int, engines=None) -> Iterator[List[str]]:
+    # Helper cho test/benchmark: đếm mọi câu SQL trên engine trong khối with, kể cả khi app
+    # chạy ở thread khác (TestClient), rồi assert không vượt quá max_queries
+    #
+    #     with assert_max_queries(2):
+    #         client.get("/api/users/list?expand=roles")
+    if engines is None:
+        from api.configs.db import engine, async_engine
+        engines = [engine] + ([async_engine.sync_engine] if async_engine is not None else [])
+    statements: List[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement_shape(statement))
+
+    for target in engines:
+        event.listen(target, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        for target in engines:
+            event.remove(target, "before_cursor_execute", record)
+    if len(statements) > max_queries:
+        listing = "\n".join(f"  {i + 1}. {sql[:200]}" for i, sql in enumerate(statements))
+        raise AssertionError(f"Expected at most {max_queries} queries, got {len(statements)}:\n{listing}")
@@ -0,0 +1,228 @@
+from contextvars import ContextVar
+from http.cookies import SimpleCookie
+from itertools import count
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql.dml import UpdateBase
+from threading import Lock
+from typing import AsyncGenerator, Dict, Generator, List, Optional
+import logging
+import os
+import time
+
+from api.configs.db import engine, async_engine, SessionLocal, AsyncSessionLocal, POOL_OPTIONS
+from api.configs.metrics import instrument_engine
+
+logger = logging.getLogger(__name__)
+
+# Danh sách URL replica (sync, dạng postgresql://...), phân tách bằng dấu phẩy; rỗng = chỉ dùng primary
+REPLICA_URLS = [url.strip() for url in os.getenv("REPLICA_URLS", "").split(",") if url.strip()]
+# Replica trễ hơn ngưỡng này (hoặc không kết nối được) bị loại khỏi vòng cho tới lần kiểm tra sau
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+REPLICA_CHECK_INTERVAL_SECONDS = float(os.getenv("REPLICA_CHECK_INTERVAL_SECONDS", "5"))
+# Sau 1 request ghi, client được ghim vào primary trong khoảng này để đọc được chính dữ liệu vừa ghi
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+READ_YOUR_WRITES_COOKIE = "primary_until"
+# Client không dùng cookie (SDK, service khác) gửi lại header này để được ghim vào primary
+READ_YOUR_WRITES_HEADER = "X-Primary-Until"
+
+# Postgres: replica đã replay hết WAL nhận được thì coi như không trễ
+REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() "
+    "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+def to_async_url(url: str) -> str:
+    return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+
+
+class Replica:
+    def __init__(self, url: str, async_mode: bool, name: str = "replica") -> None:
+        self.url = url
+        self.name = name
+        # Engine sync luôn có: dùng để đo độ trễ, và để đọc ở chế độ sync. Chế độ async chỉ
+        # dùng nó cho lag check nên giữ 1 connection thay vì nhân đôi pool của replica
+        pool_options = dict(POOL_OPTIONS, pool_size=1, max_overflow=0) if async_mode else POOL_OPTIONS
+        self.engine = create_engine(url, future=True, **(pool_options if url.startswith("postgresql") else {}))
+        self.async_engine = create_async_engine(to_async_url(url), **POOL_OPTIONS) if async_mode else None
+        instrument_engine(self.engine, name)
+        if self.async_engine is not None:
+            instrument_engine(self.async_engine.sync_engine, name)
+        # Chưa đo độ trễ thì chưa nhận request đọc; lifespan chạy 1 lần check trước khi nhận request
+        self.healthy = False
+        self.lag_seconds = 0.0
+        self.last_error: Optional[str] = None
+
+    def measure_lag(self) -> float:
+        with self.engine.connect() as conn:
+            if conn.dialect.name != "postgresql":
+                # SQLite và các stand-in khác khi test: không có khái niệm replication lag
+                conn.execute(text("SELECT 1"))
+                return 0.0
+            return float(conn.execute(REPLICA_LAG_SQL).scalar() or 0.0)
+
+
+class ReplicaSet:
+    def __init__(self, urls: List[str], async_mode: bool = async_engine is not None) -> None:
+        self.replicas = [Replica(url, async_mode, f"replica_{i}") for i, url in enumerate(urls)]
+        self._counter = count()
+        self._lock = Lock()
+
+    def choose(self) -> Optional[Replica]:
+        # Round-robin trên các replica còn khỏe; không còn replica nào thì caller dùng primary
+        with self._lock:
+            healthy = [replica for replica in self.replicas if replica.healthy]
+            if not healthy:
+                return None
+            return healthy[next(self._counter) % len(healthy)]
+
+    def check(self, max_lag: float = REPLICA_MAX_LAG_SECONDS) -> None:
+        for replica in self.replicas:
+            try:
+                lag = replica.measure_lag()
+                error = None
+            except Exception as e:
+                lag, error = float("inf"), str(e)
+            healthy = lag <= max_lag
+            if healthy != replica.healthy:
+                logger.log(
+                    logging.INFO if healthy else logging.WARNING,
+                    "Replica %s %s rotation (lag %.1fs%s)", replica.engine.url.render_as_string(),
+                    "put in" if healthy else "taken out of", lag, f", {error}" if error else "",
+                )
+            with self._lock:
+                replica.healthy, replica.lag_seconds, replica.last_error = healthy, lag, error
+
+    def status(self) -> List[Dict]:
+        return [
+            {
+                "url": replica.engine.url.render_as_string(),
+                "healthy": replica.healthy,
+                "lag_seconds": replica.lag_seconds,
+                "last_error": replica.last_error,
+            }
+            for replica in self.replicas
+        ]
+
+
+replica_set = ReplicaSet(REPLICA_URLS)
+
+# True khi request hiện tại phải đọc từ primary (read-your-writes)
+_pinned_to_primary: ContextVar[bool] = ContextVar("pinned_to_primary", default=False)
+
+
+def pinned_to_primary() -> bool:
+    return _pinned_to_primary.get()
+
+
+class RoutingSession(Session):
+    # Đọc từ 1 replica (chọn 1 lần cho cả session để các câu đọc nhất quán với nhau),
+    # mọi flush/INSERT/UPDATE/DELETE vẫn đi primary
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or isinstance(clause, UpdateBase):
+            return engine
+        replica = self.info.get("replica")
+        return replica.engine if replica is not None else engine
+
+
+class AsyncRoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or isinstance(clause, UpdateBase):
+            return async_engine.sync_engine
+        replica = self.info.get("replica")
+        return replica.async_engine.sync_engine if replica is not None else async_engine.sync_engine
+
+
+ReadSessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, expire_on_commit=False)
+AsyncReadSessionLocal = (
+    async_sessionmaker(
+        class_=AsyncSession, sync_session_class=AsyncRoutingSession, autoflush=False, expire_on_commit=False
+    )
+    if async_engine is not None
+    else None
+)
+
+
+def read_session() -> Session:
+    replica = None if pinned_to_primary() else replica_set.choose()
+    if replica is None:
+        return SessionLocal()
+    return ReadSessionLocal(info={"replica": replica})
+
+
+def get_read_db() -> Generator[Session, None, None]:
+    # Dùng cho endpoint GET / controller chỉ đọc; thay cho get_db
+    db = read_session()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db() -> AsyncGenerator[AsyncSession, None]:
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database is disabled, set DB_MODE=async")
+    replica = None if pinned_to_primary() else replica_set.choose()
+    factory = AsyncSessionLocal if replica is None else AsyncReadSessionLocal
+    async with factory(info={"replica": replica}) as db:
+        yield db
+
+
+class ReadYourWritesMiddleware:
+    # ASGI middleware: request ghi thành công -> set cookie primary_until và header X-Primary-Until;
+    # request sau còn trong hạn (cookie hoặc header gửi lại) thì get_read_db trả session của primary.
+    # Mốc thời gian nằm ở phía client nên dùng được với nhiều worker mà không cần chia sẻ trạng thái
+    SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+    def __init__(self, app, window: float = READ_YOUR_WRITES_SECONDS) -> None:
+        self.app = app
+        self.window = window
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not replica_set.replicas:
+            await self.app(scope, receive, send)
+            return
+
+        token = _pinned_to_primary.set(self._pinned(scope))
+        is_write = scope["method"] not in self.SAFE_METHODS
+
+        async def send_wrapper(message):
+            if is_write and message["type"] == "http.response.start" and message["status"] < 400:
+                until = f"{time.time() + self.window:.3f}"
+                cookie = (
+                    f"{READ_YOUR_WRITES_COOKIE}={until}; "
+                    f"Max-Age={int(self.window) + 1}; Path=/; HttpOnly; SameSite=Lax"
+                )
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"set-cookie", cookie.encode("latin-1")),
+                    (READ_YOUR_WRITES_HEADER.lower().encode("latin-1"), until.encode("latin-1")),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _pinned_to_primary.reset(token)
+
+    @staticmethod
+    def _pinned(scope) -> bool:
+        header = READ_YOUR_WRITES_HEADER.lower().encode("latin-1")
+        for name, value in scope.get("headers", ()):
+            until = None
+            if name == header:
+                until = value.decode("latin-1")
+            elif name == b"cookie":
+                morsel = SimpleCookie(value.decode("latin-1")).get(READ_YOUR_WRITES_COOKIE)
+                until = morsel.value if morsel is not None else None
+            if until is None:
+                continue
+            try:
+                if float(until) > time.time():
+                    return True
+            except ValueError:
+                continue
+        return False
@@ -0,0 +1,77 @@
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.configs.db import get_async_db
+from api.configs.auth import create_access_token, revocation_key
+from datetime import datetime, timezone
+from src.schemas.auth_schema import UserRegister, Token
+from src.schemas.user_schema import UserOut
+from src.controller.async_auth_controller import (
+    create_user_account,
+    authenticate_user,
+    blacklist_token,
+)
+
+from src.dependencies.async_auth_dependencies import get_current_user, get_auth_context
+from src.dependencies.auth_dependencies import AuthContext
+from src.cache.token_cache import token_cache
+from src.models.user_model import User
+
+router = APIRouter(prefix="/auth", tags=["Auth"])
+
+
+@router.post("/register", response_model=UserOut, status_code=status.HTTP_201_CREATED)
+async def register(user_data: UserRegister, db: AsyncSession = Depends(get_async_db)):
+    user = await create_user_account(db, user_data)
+    return user
+
+
+
+@router.post("/login", response_model=Token)
+async def login(
+    background_tasks: BackgroundTasks,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: AsyncSession = Depends(get_async_db)
+):
+    user = await authenticate_user(db, form_data.username, form_data.password, background_tasks)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect username or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    access_token = create_access_token(data={"sub": user.username, "user_id": str(user.id)})
+
+    return {
+        "access_token": access_token,
+        "token_type": "bearer"
+    }
+
+
+@router.post("/logout", status_code=status.HTTP_200_OK)
+async def logout(
+    context: AuthContext = Depends(get_auth_context),
+    db: AsyncSession = Depends(get_async_db),
+):
+    payload = context.payload
+    if not payload.get("exp"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid token payload"
+        )
+
+    expires_at = datetime.fromtimestamp(payload["exp"], tz=timezone.utc)
+
+    await blacklist_token(db, revocation_key(context.token, payload), expires_at)
+    token_cache.invalidate_token(context.digest)
+
+    return {
+        "message": f"User {context.principal.username} successfully logged out. Token has been revoked."
+    }
+
+
+@router.get("/me", response_model=UserOut)
+async def get_current_user_info(current_user: User = Depends(get_current_user)):
+    return current_user
@@ -0,0 +1,144 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from uuid import UUID
+
+from api.configs.db import get_async_db
+from api.configs.replicas import get_async_read_db
+from src.schemas.role_schema import (
+    RoleCreate, RoleUpdate, RoleOut,
+    AssignRoleRequest, RemoveRoleRequest, AssignRoleResult
+)
+from src.schemas.user_schema import UserOut
+from src.controller.pagination import next_cursor_headers
+from src.cache.response_cache import response_cache, ROLES, USERS, MEMBERSHIPS
+from src.controller.export_controller import stream_memberships, EXPORT_MEDIA_TYPES
+from src.controller.async_role_controller import (
+    create_role, get_role, list_roles,
+    update_role, delete_role, assign_role,
+    remove_role_from_users, get_users_by_role, get_missing_user_ids
+)
+
+router = APIRouter(prefix="/roles", tags=["Roles"])
+
+
+@router.post("/create", response_model=RoleOut, status_code=status.HTTP_201_CREATED)
+async def create_role_endpoint(role_in: RoleCreate, db: AsyncSession = Depends(get_async_db)):
+    role = await create_role(db, role_in)
+    return role
+
+
+@router.get("/get", response_model=RoleOut)
+async def get_role_endpoint(request: Request, role_id: UUID, db: AsyncSession = Depends(get_async_read_db)):
+    async def load():
+        role = await get_role(db, role_id)
+        if not role:
+            raise HTTPException(status_code=404, detail="Role not found")
+        return role
+
+    return await response_cache.arespond(request, (ROLES,), RoleOut, load, db=db)
+
+
+@router.get("/list", response_model=List[RoleOut])
+async def list_roles_endpoint(
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor của trang trước; bỏ qua skip"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    async def load():
+        return await list_roles(db, skip=skip, limit=limit, cursor=cursor)
+
+    return await response_cache.arespond(
+        request, (ROLES,), List[RoleOut], load, lambda roles: next_cursor_headers(roles, limit), db=db
+    )
+
+
+@router.put("/update", response_model=RoleOut)
+async def update_role_endpoint(
+    role_id: UUID,
+    role_in: RoleUpdate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    role = await get_role(db, role_id)
+    if not role:
+        raise HTTPException(status_code=404, detail="Role not found")
+
+    role = await update_role(db, role, role_in)
+    return role
+
+
+
+@router.post("/assign_role", response_model=AssignRoleResult)
+async def assign_role_endpoint(
+    role_id: UUID,
+    request: AssignRoleRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    role = await get_role(db, role_id)
+    if not role:
+        raise HTTPException(status_code=404, detail="Role not found")
+
+    missing_ids = await get_missing_user_ids(db, request.total_ids)
+    if missing_ids:
+        raise HTTPException(status_code=404, detail=f"Users not found: {missing_ids}")
+
+    return await assign_role(db, role, role_id, request.total_ids)
+
+
+
+@router.get("/export_memberships")
+def export_memberships_endpoint(format: str = Query("ndjson", pattern="^(ndjson|csv)$")):
+    return StreamingResponse(
+        stream_memberships(format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename=user_roles.{format}"},
+    )
+
+
+
+@router.get("/list/get_users_with_role", response_model=List[UserOut])
+async def get_role_by_users_endpoint(
+    request: Request,
+    role_id: UUID,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor của trang trước; bỏ qua skip"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    async def load():
+        role = await get_role(db, role_id)
+        if not role:
+            raise HTTPException(status_code=404, detail="Role not found")
+        return await get_users_by_role(db, role, skip=skip, limit=limit, cursor=cursor)
+
+    return await response_cache.arespond(
+        request, (ROLES, USERS, MEMBERSHIPS), List[UserOut], load,
+        lambda users: next_cursor_headers(users, limit), db=db
+    )
+
+
+
+@router.delete("/remove_role_from_users", response_model=RoleOut)
+async def remove_role_from_users_endpoint(
+    role_id: UUID,
+    request: RemoveRoleRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    role = await get_role(db, role_id)
+    if not role:
+        raise HTTPException(status_code=404, detail="Role not found")
+    role = await remove_role_from_users(db, role, role_id, request.total_ids)
+    return role
+
+
+
+@router.delete("/delete", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_role_endpoint(role_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    role = await get_role(db, role_id)
+    if not role:
+        raise HTTPException(status_code=404, detail="Role not found")
+    await delete_role(db, role)
+    return None
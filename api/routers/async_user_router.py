@@ -0,0 +1,124 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from uuid import UUID
+
+from api.configs.db import get_async_db
+from api.configs.replicas import get_async_read_db
+from src.schemas.user_schema import (
+    UserCreate, UserUpdate, UserOut, UserExpandedOut, UserImportResult,
+    UserBatchRequest, UserBatchUpdateRequest, UserBatchResult
+)
+from src.controller.pagination import next_cursor_headers
+from src.cache.response_cache import response_cache, ROLES, USERS, MEMBERSHIPS
+from src.controller.async_user_controller import (
+    create_user, get_user,
+    list_users, update_user, delete_user,
+    get_users, update_users, delete_users
+)
+from src.controller.user_controller import batch_results, expanded_user, user_out_model
+from src.controller.user_import_controller import import_users
+from src.controller.export_controller import stream_users, EXPORT_MEDIA_TYPES
+
+router = APIRouter(prefix="/users", tags=["Users"])
+
+
+@router.post("/create", response_model=UserOut, status_code=status.HTTP_201_CREATED)
+async def create_user_endpoint(user_in: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    user = await create_user(db, user_in)
+    return user
+
+
+
+@router.post("/import", response_model=UserImportResult)
+async def import_users_endpoint(request: Request):
+    # Body NDJSON (mặc định) hoặc CSV có dòng header, đọc dạng stream theo từng lô
+    return await import_users(request.stream(), request.headers.get("content-type", ""))
+
+
+
+@router.get("/export")
+def export_users_endpoint(format: str = Query("ndjson", pattern="^(ndjson|csv)$")):
+    # Ghi từng lô ra response ngay khi fetch được, không dựng cả danh sách trong bộ nhớ
+    return StreamingResponse(
+        stream_users(format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename=users.{format}"},
+    )
+
+
+
+@router.get("/get", response_model=UserExpandedOut, response_model_exclude_unset=True)
+async def get_user_byid_endpoint(
+    request: Request,
+    user_id: UUID,
+    expand: Optional[str] = Query(None, pattern="^roles$", description="roles: kèm danh sách role của user"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    expand_roles = expand == "roles"
+
+    async def load():
+        user = await get_user(db, user_id, expand_roles=expand_roles)
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        return expanded_user(user, expand_roles)
+
+    entities = (USERS, ROLES, MEMBERSHIPS) if expand_roles else (USERS,)
+    return await response_cache.arespond(request, entities, user_out_model(expand_roles), load, db=db)
+
+
+
+@router.get("/list", response_model=List[UserExpandedOut], response_model_exclude_unset=True)
+async def list_users_endpoint(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor của trang trước; bỏ qua skip"),
+    expand: Optional[str] = Query(None, pattern="^roles$", description="roles: kèm danh sách role của user"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    expand_roles = expand == "roles"
+    users = await list_users(db, skip=skip, limit=limit, cursor=cursor, expand_roles=expand_roles)
+    response.headers.update(next_cursor_headers(users, limit))
+    return [expanded_user(user, expand_roles) for user in users]
+
+
+
+@router.put("/update", response_model=UserOut, status_code=status.HTTP_201_CREATED)
+async def update_user_byid_endpoint(user_id: UUID, user_in: UserUpdate, db: AsyncSession = Depends(get_async_db)):
+    user = await get_user(db, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    user = await update_user(db, user, user_in)
+    return user
+
+
+
+@router.delete("/delete", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_user_byid_endpoint(user_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    user = await get_user(db, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    await delete_user(db, user)
+    return None
+
+
+
+@router.post("/batch_get", response_model=List[UserBatchResult])
+async def batch_get_users_endpoint(request: UserBatchRequest, db: AsyncSession = Depends(get_async_read_db)):
+    # 1 query IN cho cả lô, kết quả trả theo thứ tự user_ids gửi lên
+    users = await get_users(db, request.user_ids)
+    return batch_results(request.user_ids, users)
+
+
+
+@router.put("/batch_update", response_model=List[UserBatchResult])
+async def batch_update_users_endpoint(request: UserBatchUpdateRequest, db: AsyncSession = Depends(get_async_db)):
+    return await update_users(db, request.items)
+
+
+
+@router.post("/batch_delete", response_model=List[UserBatchResult])
+async def batch_delete_users_endpoint(request: UserBatchRequest, db: AsyncSession = Depends(get_async_db)):
+    return await delete_users(db, request.user_ids)
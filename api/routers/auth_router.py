@@ -1,9 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 
 from api.configs.db import get_db
-from api.configs.auth import create_access_token, verify_token
+from api.configs.auth import create_access_token, revocation_key
 from src.controller.auth_controller import blacklist_token
 from datetime import datetime, timedelta, timezone
 from src.schemas.auth_schema import UserRegister, Token
@@ -13,8 +13,8 @@ from src.controller.auth_controller import (
     authenticate_user,
 )
 
-from src.controller.user_controller import get_user_by_name
-from src.dependencies.auth_dependencies import get_current_user, get_token, get_payload
+from src.dependencies.auth_dependencies import get_current_user, get_auth_context, AuthContext
+from src.cache.token_cache import token_cache
 from src.models.user_model import User
 from api.configs.auth import ACCESS_TOKEN_EXPIRE_MINUTES
 
@@ -23,20 +23,7 @@ router = APIRouter(prefix="/auth", tags=["Auth"])
 
 @router.post("/register", response_model=UserOut, status_code=status.HTTP_201_CREATED)
 def register(user_data: UserRegister, db: Session = Depends(get_db)):
-    existing_user = get_user_by_name(db, user_data.username)
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username already registered"
-        )
-    
-    existing_email = db.query(User).filter(User.email == user_data.email).first()
-    if existing_email:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
-        )
-    
+    # Trùng username/email do unique constraint báo về (xem src/controller/integrity.py)
     user = create_user_account(db, user_data)
     return user
 
@@ -44,10 +31,11 @@ def register(user_data: UserRegister, db: Session = Depends(get_db)):
 
 @router.post("/login", response_model=Token)
 def login(
+    background_tasks: BackgroundTasks,
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = authenticate_user(db, form_data.username, form_data.password, background_tasks)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -65,13 +53,11 @@ def login(
 
 @router.post("/logout", status_code=status.HTTP_200_OK)
 def logout(
-    current_user: User = Depends(get_current_user),
-    token: str = Depends(get_token),
-    payload: dict = Depends(get_payload),
+    context: AuthContext = Depends(get_auth_context),
     db: Session = Depends(get_db),
 ):    
-
-    if not payload or not payload.get("exp"):
+    payload = context.payload
+    if not payload.get("exp"):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid token payload"
@@ -79,10 +65,11 @@ def logout(
 
     expires_at = datetime.fromtimestamp(payload["exp"], tz=timezone.utc)
     
-    blacklist_token(db, token, expires_at)
+    blacklist_token(db, revocation_key(context.token, payload), expires_at)
+    token_cache.invalidate_token(context.digest)
     
     return {
-        "message": f"User {current_user} successfully logged out. Token has been revoked."
+        "message": f"User {context.principal.username} successfully logged out. Token has been revoked."
     }
 
 
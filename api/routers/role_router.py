@@ -1,19 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
 from api.configs.db import get_db
+from api.configs.replicas import get_read_db
 from src.schemas.role_schema import (
     RoleCreate, RoleUpdate, RoleOut, 
-    AssignRoleRequest, RemoveRoleRequest
+    AssignRoleRequest, RemoveRoleRequest, AssignRoleResult
 )
 from src.schemas.user_schema import UserOut
-from src.models.user_model import User
+from src.controller.pagination import next_cursor_headers
+from src.cache.response_cache import response_cache, ROLES, USERS, MEMBERSHIPS
+from src.controller.export_controller import stream_memberships, EXPORT_MEDIA_TYPES
 from src.controller.role_controller import (
-    create_role, get_role, get_role_by_name, list_roles, 
+    create_role, get_role, list_roles, 
     update_role, delete_role, assign_role, 
-    remove_role_from_users, get_users_by_role
+    remove_role_from_users, get_users_by_role, get_missing_user_ids
 )
 
 router = APIRouter(prefix="/roles", tags=["Roles"])
@@ -21,31 +25,35 @@ router = APIRouter(prefix="/roles", tags=["Roles"])
 
 @router.post("/create", response_model=RoleOut, status_code=status.HTTP_201_CREATED)
 def create_role_endpoint(role_in: RoleCreate, db: Session = Depends(get_db)):
-    existing = get_role_by_name(db, role_in.rolename)
-    if existing:
-        raise HTTPException(status_code=400, detail="Role already exists")
-    
     role = create_role(db, role_in)
     return role
 
 
 @router.get("/get", response_model=RoleOut)
-def get_role_endpoint(role_id: UUID, db: Session = Depends(get_db)):
-    role = get_role(db, role_id)
-    if not role:
-        raise HTTPException(status_code=404, detail="Role not found")
-    
-    return role
+def get_role_endpoint(request: Request, role_id: UUID, db: Session = Depends(get_read_db)):
+    def load():
+        role = get_role(db, role_id)
+        if not role:
+            raise HTTPException(status_code=404, detail="Role not found")
+        return role
+
+    return response_cache.respond(request, (ROLES,), RoleOut, load, db=db)
 
 
 @router.get("/list", response_model=List[RoleOut])
 def list_roles_endpoint(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor của trang trước; bỏ qua skip"),
+    db: Session = Depends(get_read_db)
 ):
-    roles = list_roles(db, skip=skip, limit=limit)
-    return roles
+    def load():
+        return list_roles(db, skip=skip, limit=limit, cursor=cursor)
+
+    return response_cache.respond(
+        request, (ROLES,), List[RoleOut], load, lambda roles: next_cursor_headers(roles, limit), db=db
+    )
 
 
 @router.put("/update", response_model=RoleOut)
@@ -57,12 +65,7 @@ def update_role_endpoint(
     role = get_role(db, role_id)
     if not role:
         raise HTTPException(status_code=404, detail="Role not found")
-    
-    if role_in.rolename is not None:
-        existing = get_role(db, role_in.rolename)
-        if existing and existing.id != role_id:
-            raise HTTPException(status_code=400, detail="Role name already exists")
-        
+
     role = update_role(db, role, role_in)
     return role
 
@@ -70,7 +73,7 @@ def update_role_endpoint(
 
 
 
-@router.post("/assign_role", response_model=RoleOut)
+@router.post("/assign_role", response_model=AssignRoleResult)
 def assign_role_endpoint(
     role_id: UUID,
     request: AssignRoleRequest,
@@ -80,24 +83,43 @@ def assign_role_endpoint(
     if not role:
         raise HTTPException(status_code=404, detail="Role not found")
     
-    users = db.query(User).filter(User.id.in_(request.total_ids)).all()
-    if len(users) != len(request.total_ids):
-        found_ids = {user.id for user in users}
-        missing_ids = set(request.total_ids) - found_ids
-        raise HTTPException(status_code=404, detail=f"Users not found: {list(missing_ids)}")
-    
-    role = assign_role(db, role, role_id, request.total_ids)
-    return role
+    missing_ids = get_missing_user_ids(db, request.total_ids)
+    if missing_ids:
+        raise HTTPException(status_code=404, detail=f"Users not found: {missing_ids}")
+
+    return assign_role(db, role, role_id, request.total_ids)
+
+
+
+@router.get("/export_memberships")
+def export_memberships_endpoint(format: str = Query("ndjson", pattern="^(ndjson|csv)$")):
+    return StreamingResponse(
+        stream_memberships(format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename=user_roles.{format}"},
+    )
 
 
 
 @router.get("/list/get_users_with_role", response_model=List[UserOut])
-def get_role_by_users_endpoint(role_id: UUID, db: Session = Depends(get_db)):
-    role = get_role(db, role_id)
-    if not role:
-        raise HTTPException(status_code=404, detail="Role not found")
-    users = get_users_by_role(db, role)
-    return users
+def get_role_by_users_endpoint(
+    request: Request,
+    role_id: UUID,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor của trang trước; bỏ qua skip"),
+    db: Session = Depends(get_read_db)
+):
+    def load():
+        role = get_role(db, role_id)
+        if not role:
+            raise HTTPException(status_code=404, detail="Role not found")
+        return get_users_by_role(db, role, skip=skip, limit=limit, cursor=cursor)
+
+    return response_cache.respond(
+        request, (ROLES, USERS, MEMBERSHIPS), List[UserOut], load,
+        lambda users: next_cursor_headers(users, limit), db=db
+    )
 
 
 
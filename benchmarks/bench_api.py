@@ -0,0 +1,298 @@
+"""Load-test login/me/users list/assign_role/logout at fixed concurrency and compare with a baseline.
+
+Seed dữ liệu (benchmarks.seed) rồi bắn request qua httpx với số request đồng thời cố định,
+báo throughput, p50/p95/p99 và số câu SQL mỗi request (header X-Query-Count của profiler).
+Mặc định chạy app trong process qua ASGITransport (tự bật QUERY_PROFILER); --base-url để đo
+server thật (khi đó server cần QUERY_PROFILER=true mới có số câu SQL).
+
+    python -m benchmarks.bench_api --users 10000 --concurrency 32 --save-baseline benchmarks/baselines/api.json
+    python -m benchmarks.bench_api --skip-seed --baseline benchmarks/baselines/api.json --threshold 0.2
+
+Thoát với mã 1 khi có scenario chậm hơn / throughput thấp hơn baseline quá ngưỡng, hoặc tốn
+thêm câu SQL mỗi request.
+"""
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import sys
+import time
+
+import httpx
+
+# Phải đặt trước khi import app để QueryProfilerMiddleware bật và trả X-Query-Count
+os.environ.setdefault("QUERY_PROFILER", "true")
+
+from sqlalchemy import select
+
+from api.configs.auth import create_access_token
+from api.configs.db import SessionLocal, DB_MODE
+from src.controller.pagination import encode_cursor
+from src.models.user_model import User
+from benchmarks.seed import SeedData, load, reset, seed
+
+DEEP_PAGE_SIZE = 50
+
+
+@dataclass
+class Scenario:
+    name: str
+    requests: int
+    call: Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]]
+    expected_status: int = 200
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    # Nearest-rank: không nội suy, ổn định giữa các lần chạy
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, max(math.ceil(q * len(sorted_values)) - 1, 0))]
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, concurrency: int) -> Dict:
+    latencies: List[float] = []
+    queries: List[int] = []
+    errors = 0
+    indexes = iter(range(scenario.requests))
+
+    async def worker() -> None:
+        nonlocal errors
+        # Các worker dùng chung 1 iterator: tổng số request đúng bằng scenario.requests
+        for i in indexes:
+            start = time.perf_counter()
+            try:
+                response = await scenario.call(client, i)
+            except httpx.HTTPError:
+                errors += 1
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code != scenario.expected_status:
+                errors += 1
+            count = response.headers.get("x-query-count")
+            if count is not None:
+                queries.append(int(count))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": scenario.requests,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "rps": round(scenario.requests / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "queries_per_request": round(sum(queries) / len(queries), 2) if queries else None,
+    }
+
+
+def deep_cursor(offset: int) -> Optional[str]:
+    # Cursor trỏ tới dòng ngay trước offset để so sánh trang sâu: OFFSET vs keyset
+    with SessionLocal() as db:
+        row = db.execute(
+            select(User.created_at, User.id).order_by(User.created_at, User.id).offset(offset - 1).limit(1)
+        ).first()
+    return encode_cursor(row.created_at, row.id) if row is not None else None
+
+
+def build_scenarios(data: SeedData, args) -> List[Scenario]:
+    users = len(data.user_ids)
+    tokens = [
+        create_access_token({"sub": data.usernames[i], "user_id": str(data.user_ids[i])})
+        for i in range(min(users, args.token_pool))
+    ]
+    # Token riêng cho logout: mỗi token bị thu hồi đúng 1 lần rồi dùng lại để đo đường 401
+    logout_tokens = [
+        create_access_token({"sub": data.usernames[i % users], "user_id": str(data.user_ids[i % users])})
+        for i in range(args.requests)
+    ]
+    deep_offset = max(users - DEEP_PAGE_SIZE, 1)
+    cursor = deep_cursor(deep_offset)
+    assign_size = min(args.assign_size, users)
+
+    def bearer(token: str) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {token}"}
+
+    async def login(client, i):
+        return await client.post(
+            "/api/auth/login",
+            data={"username": data.usernames[i % users], "password": data.password},
+        )
+
+    async def me(client, i):
+        return await client.get("/api/auth/me", headers=bearer(tokens[i % len(tokens)]))
+
+    async def users_list_shallow(client, i):
+        return await client.get("/api/users/list", params={"limit": DEEP_PAGE_SIZE})
+
+    async def users_list_deep_offset(client, i):
+        return await client.get("/api/users/list", params={"skip": deep_offset, "limit": DEEP_PAGE_SIZE})
+
+    async def users_list_deep_cursor(client, i):
+        return await client.get("/api/users/list", params={"cursor": cursor, "limit": DEEP_PAGE_SIZE})
+
+    async def assign_role(client, i):
+        # Xoay vòng role và lát cắt user để phần lớn request thực sự chèn membership mới
+        start = (i * assign_size) % users
+        ids = [str(data.user_ids[(start + k) % users]) for k in range(assign_size)]
+        return await client.post(
+            "/api/roles/assign_role",
+            params={"role_id": str(data.role_ids[i % len(data.role_ids)])},
+            json={"total_ids": ids},
+        )
+
+    async def logout(client, i):
+        return await client.post("/api/auth/logout", headers=bearer(logout_tokens[i]))
+
+    async def revoked_me(client, i):
+        return await client.get("/api/auth/me", headers=bearer(logout_tokens[i]))
+
+    scenarios = [
+        Scenario("login", args.login_requests, login),
+        Scenario("me", args.requests, me),
+        Scenario("users_list_shallow", args.requests, users_list_shallow),
+        Scenario("users_list_deep_offset", args.requests, users_list_deep_offset),
+        Scenario("assign_role", args.assign_requests, assign_role),
+        Scenario("logout", args.requests, logout),
+        Scenario("revoked_me", args.requests, revoked_me, expected_status=401),
+    ]
+    if cursor is not None:
+        scenarios.insert(4, Scenario("users_list_deep_cursor", args.requests, users_list_deep_cursor))
+    if not data.role_ids:
+        scenarios = [s for s in scenarios if s.name != "assign_role"]
+    if args.scenarios:
+        wanted = set(args.scenarios.split(","))
+        scenarios = [s for s in scenarios if s.name in wanted]
+    return scenarios
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+    regressions = []
+    for name, result in current["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if base is None:
+            continue
+        if base["p95_ms"] and result["p95_ms"] > base["p95_ms"] * (1 + threshold):
+            regressions.append(f"{name}: p95 {base['p95_ms']} -> {result['p95_ms']} ms")
+        if base["rps"] and result["rps"] < base["rps"] * (1 - threshold):
+            regressions.append(f"{name}: throughput {base['rps']} -> {result['rps']} req/s")
+        # Số câu SQL là tất định: chỉ cho phép lệch do làm tròn trung bình
+        if (
+            base.get("queries_per_request") is not None
+            and result.get("queries_per_request") is not None
+            and result["queries_per_request"] > base["queries_per_request"] + 0.5
+        ):
+            regressions.append(
+                f"{name}: queries/request {base['queries_per_request']} -> {result['queries_per_request']}"
+            )
+        if result["errors"] > base.get("errors", 0):
+            regressions.append(f"{name}: errors {base.get('errors', 0)} -> {result['errors']}")
+    return regressions
+
+
+def print_report(report: Dict) -> None:
+    print(f"{'scenario':<24}{'req':>7}{'err':>6}{'req/s':>10}{'p50':>9}{'p95':>9}{'p99':>9}{'sql/req':>9}")
+    for name, r in report["scenarios"].items():
+        qpr = "-" if r["queries_per_request"] is None else f"{r['queries_per_request']:.2f}"
+        print(
+            f"{name:<24}{r['requests']:>7}{r['errors']:>6}{r['rps']:>10.1f}"
+            f"{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}{r['p99_ms']:>9.2f}{qpr:>9}"
+        )
+
+
+async def run(args, data: SeedData) -> Dict:
+    scenarios = build_scenarios(data, args)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "target": args.base_url or "in-process",
+            "db_mode": DB_MODE,
+            "python": platform.python_version(),
+            "users": len(data.user_ids),
+            "roles": len(data.role_ids),
+            "concurrency": args.concurrency,
+            "assign_size": args.assign_size,
+        },
+        "scenarios": {},
+    }
+
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits)
+        async with client:
+            for scenario in scenarios:
+                report["scenarios"][scenario.name] = await run_scenario(client, scenario, args.concurrency)
+        return report
+
+    from main import app
+    transport = httpx.ASGITransport(app=app)
+    # ASGITransport không chạy lifespan: tự mở để warm-up, hash pool và reaper giống server thật
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=args.timeout) as client:
+            for scenario in scenarios:
+                report["scenarios"][scenario.name] = await run_scenario(client, scenario, args.concurrency)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default=None, help="đo server đang chạy thay vì app trong process")
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--roles", type=int, default=20)
+    parser.add_argument("--memberships", type=int, default=3)
+    parser.add_argument("--prefix", default="bench")
+    parser.add_argument("--skip-seed", action="store_true", help="dùng lại dữ liệu đã seed")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=1000, help="số request mỗi scenario")
+    parser.add_argument("--login-requests", type=int, default=200, help="login bị chặn bởi Argon2")
+    parser.add_argument("--assign-requests", type=int, default=20)
+    parser.add_argument("--assign-size", type=int, default=5000, help="số phần tử total_ids mỗi request")
+    parser.add_argument("--token-pool", type=int, default=200, help="số user khác nhau gọi /me")
+    parser.add_argument("--scenarios", default=None, help="danh sách tên, phân cách bằng dấu phẩy")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--save-baseline", default=None, help="ghi kết quả ra file JSON")
+    parser.add_argument("--baseline", default=None, help="so sánh với file JSON đã lưu")
+    parser.add_argument("--threshold", type=float, default=0.2, help="tỉ lệ chậm đi cho phép, 0.2 = 20%%")
+    args = parser.parse_args()
+
+    if args.skip_seed:
+        data = load(args.prefix)
+        if not data.user_ids:
+            sys.exit(f"No seeded users with prefix {args.prefix!r}; run without --skip-seed")
+    else:
+        start = time.perf_counter()
+        reset(args.prefix)
+        data = seed(args.users, args.roles, args.memberships, args.prefix)
+        print(f"seeded {len(data.user_ids)} users / {len(data.role_ids)} roles in {time.perf_counter() - start:.1f} s")
+
+    report = asyncio.run(run(args, data))
+    print_report(report)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.save_baseline) or ".", exist_ok=True)
+        with open(args.save_baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"\nREGRESSIONS (threshold {args.threshold:.0%}):")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nno regressions vs {args.baseline} (threshold {args.threshold:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Micro-benchmark: per-request auth overhead on /api/auth/me.
+
+So sánh chuỗi dependency cũ (HTTPBearer + get_payload + OAuth2PasswordBearer, verify
+JWT và query user mỗi request) với get_auth_context (parse 1 lần, verify tối đa 1 lần,
+cache token). Cần Postgres theo cấu hình POSTGRES_* như app, schema đã migrate
+(python migrate.py).
+
+    python -m benchmarks.bench_auth_context --requests 5000
+"""
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from uuid import UUID, uuid4
+import argparse
+import statistics
+import time
+
+from api.configs.db import SessionLocal, get_db
+from api.configs.auth import create_access_token, verify_token, revocation_key
+from src.cache.revocation_cache import revocation_cache
+from src.cache.token_cache import token_cache
+from src.controller.auth_controller import is_token_blacklisted
+from src.dependencies.auth_dependencies import get_current_user, oauth2_scheme
+from src.models.user_model import User
+from src.schemas.user_schema import UserOut
+
+
+# Chuỗi dependency trước khi có get_auth_context, giữ nguyên để so sánh
+def legacy_get_token(credentials: HTTPAuthorizationCredentials = Depends(HTTPBearer())):
+    return credentials.credentials
+
+
+def legacy_get_payload(token: str = Depends(legacy_get_token)):
+    return verify_token(token)
+
+
+def legacy_get_current_user(
+    token: str = Depends(legacy_get_token),
+    payload: dict = Depends(legacy_get_payload),
+    pass_flow: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> User:
+    if payload is None or is_token_blacklisted(db, revocation_key(token, payload)):
+        raise HTTPException(status_code=401)
+    user = db.query(User).filter(User.id == UUID(payload["user_id"])).first()
+    if user is None or not user.is_active:
+        raise HTTPException(status_code=401)
+    return user
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/legacy/me", response_model=UserOut)
+    def legacy_me(current_user: User = Depends(legacy_get_current_user)):
+        return current_user
+
+    @app.get("/context/me", response_model=UserOut)
+    def context_me(current_user: User = Depends(get_current_user)):
+        return current_user
+
+    return app
+
+
+def run(client: TestClient, path: str, headers: dict, requests: int) -> dict:
+    for _ in range(min(100, requests)):
+        client.get(path, headers=headers)
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = client.get(path, headers=headers)
+        timings.append((time.perf_counter() - start) * 1e6)
+        assert response.status_code == 200, response.text
+    timings.sort()
+    return {
+        "mean_us": statistics.fmean(timings),
+        "p50_us": timings[len(timings) // 2],
+        "p99_us": timings[int(len(timings) * 0.99) - 1],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        user = User(username=f"bench_{uuid4().hex[:12]}", email=f"{uuid4().hex[:12]}@example.com", password="x")
+        db.add(user)
+        db.commit()
+        user_id, username = user.id, user.username
+        revocation_cache.warm(db)
+
+    token = create_access_token({"sub": username, "user_id": str(user_id)})
+    headers = {"Authorization": f"Bearer {token}"}
+    token_cache.clear()
+
+    try:
+        with TestClient(build_app()) as client:
+            legacy = run(client, "/legacy/me", headers, args.requests)
+            context = run(client, "/context/me", headers, args.requests)
+    finally:
+        with SessionLocal() as db:
+            db.query(User).filter(User.id == user_id).delete()
+            db.commit()
+
+    print(f"{'chain':<10}{'mean us':>12}{'p50 us':>12}{'p99 us':>12}")
+    for name, result in (("legacy", legacy), ("context", context)):
+        print(f"{name:<10}{result['mean_us']:>12.1f}{result['p50_us']:>12.1f}{result['p99_us']:>12.1f}")
+    saved = legacy["mean_us"] - context["mean_us"]
+    print(f"overhead removed per request: {saved:.1f} us ({saved / legacy['mean_us']:.1%})")
+
+
+if __name__ == "__main__":
+    main()
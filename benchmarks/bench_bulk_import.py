@@ -0,0 +1,52 @@
+"""Benchmark /api/users/import: stream N synthetic users as NDJSON and report rows/second.
+
+Cần server đang chạy (uvicorn main:app) và Postgres. Hash Argon2 thường chiếm phần lớn
+thời gian; chỉnh HASH_TARGET_MS / HASH_WORKERS trên server để so sánh.
+
+    python -m benchmarks.bench_bulk_import --rows 1000000 --base-url http://localhost:8000
+"""
+import argparse
+import json
+import time
+import uuid
+
+import httpx
+
+
+def synthetic_users(rows: int, prefix: str):
+    for i in range(rows):
+        yield (json.dumps({
+            "username": f"{prefix}_{i}",
+            "email": f"{prefix}_{i}@import.bench",
+            "password": f"password-{i}",
+        }) + "\n").encode()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--timeout", type=float, default=None, help="giây, mặc định không giới hạn")
+    args = parser.parse_args()
+
+    prefix = f"imp{uuid.uuid4().hex[:8]}"
+    start = time.perf_counter()
+    with httpx.Client(base_url=args.base_url, timeout=args.timeout) as client:
+        response = client.post(
+            "/api/users/import",
+            content=synthetic_users(args.rows, prefix),
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+    elapsed = time.perf_counter() - start
+    response.raise_for_status()
+    result = response.json()
+
+    print(f"rows sent:     {args.rows}")
+    print(f"inserted:      {result['inserted']}")
+    print(f"failed:        {result['failed']}")
+    print(f"elapsed:       {elapsed:.1f} s")
+    print(f"throughput:    {result['inserted'] / elapsed:,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Cold-start benchmark: thời gian từ lúc spawn worker tới khi trả được request đầu tiên.
+
+Mỗi lần chạy là 1 process uvicorn mới (giống 1 worker gunicorn khi rolling restart). Đo
+riêng thời gian import main.py và thời gian tới response 200 đầu tiên trên GET /.
+--legacy chạy thêm Base.metadata.create_all trước khi import để so với cách khởi động cũ.
+Cần Postgres theo cấu hình POSTGRES_* như app (hoặc không có DB để thấy worker vẫn lên).
+
+    python -m benchmarks.bench_cold_start --runs 10
+    python -m benchmarks.bench_cold_start --runs 10 --legacy
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SCRIPT = """
+import time
+start = time.perf_counter()
+{prelude}
+import main
+print((time.perf_counter() - start) * 1000)
+"""
+
+
+def prelude(legacy: bool) -> str:
+    # Cách khởi động cũ (chỉ với --legacy): create_all trước khi import main
+    if not legacy:
+        return ""
+    return (
+        "from api.configs.db import Base, engine\n"
+        "from src.models import user_model, role_model, user_role_model, blacklist_model\n"
+        "Base.metadata.create_all(bind=engine)\n"
+    )
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_import(legacy: bool) -> float:
+    script = IMPORT_SCRIPT.format(prelude=prelude(legacy))
+    output = subprocess.run(
+        [sys.executable, "-c", script], cwd=ROOT, check=True, capture_output=True, text=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def measure_ready(legacy: bool, timeout: float = 30.0) -> float:
+    port = free_port()
+    script = f"{prelude(legacy)}\nimport uvicorn\nuvicorn.run('main:app', host='127.0.0.1', port={port}, log_level='warning')"
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-c", script], cwd=ROOT)
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as response:
+                    if response.status == 200:
+                        return (time.perf_counter() - start) * 1000
+            except OSError:
+                time.sleep(0.005)
+        raise TimeoutError(f"worker not ready after {timeout:.0f}s")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def summarize(name: str, timings: list) -> None:
+    timings = sorted(timings)
+    print(
+        f"{name:<14}{statistics.fmean(timings):>10.1f}{timings[len(timings) // 2]:>10.1f}"
+        f"{timings[0]:>10.1f}{timings[-1]:>10.1f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--legacy", action="store_true", help="create_all trước khi import như main.py cũ")
+    args = parser.parse_args()
+
+    imports = [measure_import(args.legacy) for _ in range(args.runs)]
+    ready = [measure_ready(args.legacy) for _ in range(args.runs)]
+
+    print(f"{'phase (ms)':<14}{'mean':>10}{'p50':>10}{'min':>10}{'max':>10}")
+    summarize("import main", imports)
+    summarize("first 200", ready)
+
+
+if __name__ == "__main__":
+    main()
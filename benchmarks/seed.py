@@ -0,0 +1,113 @@
+"""Seed Postgres với user/role/membership giả lập cho benchmark.
+
+Dữ liệu được đánh dấu bằng tiền tố (mặc định "bench") trong username/rolename để xóa và
+seed lại được. Mật khẩu chỉ hash 1 lần rồi dùng chung, nên seed 1 triệu user vẫn nhanh.
+Cần Postgres theo cấu hình POSTGRES_* như app, schema đã migrate (python migrate.py).
+
+    python -m benchmarks.seed --users 100000 --roles 50 --memberships 3 --reset
+"""
+from dataclasses import dataclass
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from typing import List
+from uuid import UUID, uuid4
+import argparse
+import random
+import time
+
+from api.configs.auth import get_password_hash
+from api.configs.db import SessionLocal
+from src.models.user_model import User
+from src.models.role_model import Role
+from src.models.user_role_model import UserRole
+
+BENCH_PASSWORD = "bench-password-123"
+SEED_CHUNK_SIZE = 5000
+
+
+@dataclass
+class SeedData:
+    prefix: str
+    password: str
+    user_ids: List[UUID]
+    usernames: List[str]
+    role_ids: List[UUID]
+
+
+def chunks(rows: list, size: int = SEED_CHUNK_SIZE):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def reset(prefix: str = "bench") -> None:
+    with SessionLocal() as db:
+        db.execute(delete(User).where(User.username.like(f"{prefix}\\_%")))
+        db.execute(delete(Role).where(Role.rolename.like(f"{prefix}\\_%")))
+        db.commit()
+
+
+def load(prefix: str = "bench") -> SeedData:
+    # Dùng lại dữ liệu đã seed từ lần chạy trước (--skip-seed)
+    with SessionLocal() as db:
+        users = db.execute(
+            select(User.id, User.username).where(User.username.like(f"{prefix}\\_%")).order_by(User.username)
+        ).all()
+        roles = db.execute(
+            select(Role.id).where(Role.rolename.like(f"{prefix}\\_%")).order_by(Role.rolename)
+        ).scalars().all()
+    return SeedData(prefix, BENCH_PASSWORD, [u.id for u in users], [u.username for u in users], list(roles))
+
+
+def seed(users: int, roles: int, memberships: int, prefix: str = "bench", rng_seed: int = 42) -> SeedData:
+    rng = random.Random(rng_seed)
+    hashed = get_password_hash(BENCH_PASSWORD)
+    user_rows = [
+        {
+            "id": UUID(int=rng.getrandbits(128), version=4),
+            "username": f"{prefix}_user_{i:08d}",
+            "email": f"{prefix}_user_{i:08d}@example.com",
+            "password": hashed,
+            "is_active": True,
+        }
+        for i in range(users)
+    ]
+    role_rows = [{"id": uuid4(), "rolename": f"{prefix}_role_{i:04d}"} for i in range(roles)]
+    role_ids = [row["id"] for row in role_rows]
+    membership_rows = [
+        {"user_id": row["id"], "role_id": role_id}
+        for row in user_rows
+        for role_id in rng.sample(role_ids, min(memberships, len(role_ids)))
+    ]
+
+    with SessionLocal() as db:
+        for table, rows in ((User, user_rows), (Role, role_rows), (UserRole, membership_rows)):
+            for chunk in chunks(rows):
+                db.execute(pg_insert(table).values(chunk).on_conflict_do_nothing())
+        db.commit()
+
+    return SeedData(prefix, BENCH_PASSWORD, [row["id"] for row in user_rows], [row["username"] for row in user_rows], role_ids)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--roles", type=int, default=20)
+    parser.add_argument("--memberships", type=int, default=3, help="số role mỗi user")
+    parser.add_argument("--prefix", default="bench")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="xóa dữ liệu cùng tiền tố trước khi seed")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.reset:
+        reset(args.prefix)
+    data = seed(args.users, args.roles, args.memberships, args.prefix, args.seed)
+    print(
+        f"seeded {len(data.user_ids)} users, {len(data.role_ids)} roles, "
+        f"~{len(data.user_ids) * min(args.memberships, args.roles)} memberships "
+        f"in {time.perf_counter() - start:.1f} s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,73 @@
+from contextlib import asynccontextmanager, suppress
+import asyncio
 from fastapi import FastAPI
 from fastapi.security import OAuth2PasswordBearer
-from api.routers.user_router import router
-from api.configs.db import engine, Base
-from api.routers.user_router import router as user_router
-from api.routers.auth_router import router as auth_router
-from api.routers.role_router import router as role_router
-from src.models.blacklist_model import TokenBlacklist
+from prometheus_fastapi_instrumentator import Instrumentator
+from api.configs.db import engine, async_engine, DB_MODE
+from api.configs.pool import pool_status
+from api.configs.replicas import replica_set, ReadYourWritesMiddleware
+from api.configs.metrics import RequestMetricsMiddleware, mark_worker_dead
+from api.configs.profiler import QueryProfilerMiddleware
+from api.configs.hashing import hashing_executor
+from src.tasks.token_reaper import run_token_reaper, reaper_stats
+from src.cache.response_cache import response_cache
+from src.tasks.warmup import warm_up
+from src.tasks.replica_monitor import run_replica_monitor
+from src.tasks.revocation_sync import run_revocation_sync
 
+if DB_MODE == "async":
+    from api.routers.async_user_router import router as user_router
+    from api.routers.async_auth_router import router as auth_router
+    from api.routers.async_role_router import router as role_router
+else:
+    from api.routers.user_router import router as user_router
+    from api.routers.auth_router import router as auth_router
+    from api.routers.role_router import router as role_router
 
-# Tạo tables khi khởi động
-Base.metadata.create_all(bind=engine)
+
+# Schema do migration quản lý (python migrate.py), không tạo bảng lúc import
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Mở sẵn connection trong pool và nạp token đã thu hồi vào cache, có giới hạn thời gian
+    await warm_up()
+    # Tune tham số Argon2 (hoặc đọc kết quả đã lưu) rồi mới khởi động process pool;
+    # chạy trong thread để lần tune đầu tiên không chặn event loop
+    await asyncio.to_thread(hashing_executor.start)
+    tasks = [asyncio.create_task(run_token_reaper()), asyncio.create_task(run_revocation_sync())]
+    if replica_set.replicas:
+        # Replica bắt đầu ở trạng thái chưa khỏe: đo độ trễ 1 lần trước khi nhận request đọc
+        await asyncio.to_thread(replica_set.check)
+        tasks.append(asyncio.create_task(run_replica_monitor()))
+    yield
+    for task in tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    hashing_executor.shutdown()
+    mark_worker_dead()
 
 
 app = FastAPI(
+    lifespan=lifespan,
     title="User Management API",
-    description="Sync FastAPI with PostgreSQL",
+    description=f"FastAPI with PostgreSQL ({DB_MODE} mode)",
     version="1.0.0"
 )
 
+# Client vừa ghi được đọc từ primary trong READ_YOUR_WRITES_SECONDS
+app.add_middleware(ReadYourWritesMiddleware)
+
+# Profile SQL từng request (QUERY_PROFILER=true); phải nằm trong RequestMetricsMiddleware
+app.add_middleware(QueryProfilerMiddleware)
+
+# Số câu SQL / thời gian SQL của từng request, gom theo route
+app.add_middleware(RequestMetricsMiddleware)
+
+# /metrics: histogram latency theo route; tự gộp số liệu các worker khi có PROMETHEUS_MULTIPROC_DIR
+Instrumentator(excluded_handlers=["/metrics"]).instrument(app).expose(app, include_in_schema=False)
+
 app.include_router(auth_router, prefix="/api", tags=["Auth"])
 app.include_router(user_router, prefix="/api", tags=["Users"])
 app.include_router(role_router, prefix="/api", tags=["Roles"])
@@ -30,6 +80,29 @@ def root():
         "docs": "/docs"
     }
 
+
+@app.get("/pool")
+def pool_info():
+    # Số liệu pool để điều chỉnh DB_POOL_SIZE / DB_MAX_OVERFLOW
+    active_engine = async_engine.sync_engine if async_engine is not None else engine
+    return pool_status(active_engine.pool)
+
+
+@app.get("/replicas")
+def replicas_info():
+    return replica_set.status()
+
+
+@app.get("/cache")
+def cache_info():
+    # Tỉ lệ hit và thời gian phục vụ của cache response
+    return response_cache.stats.snapshot()
+
+
+@app.get("/reaper")
+def reaper_info():
+    return reaper_stats.snapshot()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,57 @@
+"""Chạy migration Alembic một lần trước khi khởi động các worker.
+
+    python migrate.py            # upgrade lên head
+    python migrate.py 0004       # upgrade tới revision cụ thể
+
+Database tạo bằng Base.metadata.create_all từ trước khi có Alembic (đủ bảng nhưng chưa có
+alembic_version) được stamp 0001 trước, rồi mới upgrade tiếp từ 0002.
+"""
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.pool import NullPool
+from typing import Optional
+import os
+import sys
+
+from api.configs.db import DATABASE_URL
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini")
+
+# Schema của create_all trước khi có Alembic trùng với revision 0001
+LEGACY_TABLES = {"users", "roles", "user_roles", "blacklist_token"}
+LEGACY_REVISION = "0001"
+
+
+def alembic_config(url: Optional[str] = None) -> Config:
+    config = Config(ALEMBIC_INI)
+    if url is not None:
+        config.attributes["url"] = url
+    return config
+
+
+def stamp_legacy_schema(config: Config) -> bool:
+    engine = create_engine(config.attributes.get("url", DATABASE_URL), poolclass=NullPool)
+    try:
+        with engine.connect() as conn:
+            tables = set(inspect(conn).get_table_names())
+    finally:
+        engine.dispose()
+    if "alembic_version" in tables or not LEGACY_TABLES <= tables:
+        return False
+    command.stamp(config, LEGACY_REVISION)
+    return True
+
+
+def migrate(revision: str = "head", url: Optional[str] = None) -> None:
+    config = alembic_config(url)
+    if stamp_legacy_schema(config):
+        print(f"Existing schema without alembic_version, stamped {LEGACY_REVISION}")
+    command.upgrade(config, revision)
+
+
+if __name__ == "__main__":
+    target = sys.argv[1] if len(sys.argv) > 1 else "head"
+    print(f"Migrating database to {target}...")
+    migrate(target)
+    print("Migration complete!")
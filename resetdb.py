@@ -1,7 +1,11 @@
+from alembic import command
+
 from api.configs.db import engine, Base
+from migrate import alembic_config
 from src.models.user_model import User
 from src.models.role_model import Role
 from src.models.user_role_model import UserRole
+from src.models.blacklist_model import TokenBlacklist
 
 print("Dropping all tables...")
 Base.metadata.drop_all(bind=engine)
@@ -9,4 +13,8 @@ Base.metadata.drop_all(bind=engine)
 print("Creating all tables...")
 Base.metadata.create_all(bind=engine)
 
-print("Database reset complete!")
\ No newline at end of file
+# Schema vừa tạo đã khớp head -> đánh dấu để `python migrate.py` không chạy lại từ đầu
+print("Stamping alembic head...")
+command.stamp(alembic_config(), "head", purge=True)
+
+print("Database reset complete!")
@@ -0,0 +1,43 @@
+from threading import Lock
+from typing import Dict, Optional, Tuple
+import time
+
+
+class FakeRedis:
+    # Bản giả lập tối thiểu các lệnh redis đang dùng, để test không cần server Redis
+    def __init__(self) -> None:
+        self._data: Dict[str, Tuple[bytes, Optional[float]]] = {}
+        self._lock = Lock()
+
+    def _alive(self, name: str) -> bool:
+        item = self._data.get(name)
+        if item is None:
+            return False
+        if item[1] is not None and item[1] <= time.time():
+            del self._data[name]
+            return False
+        return True
+
+    def set(self, name: str, value, ex: Optional[int] = None) -> bool:
+        with self._lock:
+            expires = time.time() + ex if ex else None
+            self._data[name] = (value if isinstance(value, bytes) else str(value).encode(), expires)
+        return True
+
+    def get(self, name: str) -> Optional[bytes]:
+        with self._lock:
+            return self._data[name][0] if self._alive(name) else None
+
+    def incr(self, name: str) -> int:
+        with self._lock:
+            value = int(self._data[name][0]) + 1 if self._alive(name) else 1
+            self._data[name] = (str(value).encode(), self._data.get(name, (None, None))[1])
+        return value
+
+    def exists(self, *names: str) -> int:
+        with self._lock:
+            return sum(1 for name in names if self._alive(name))
+
+    def delete(self, *names: str) -> int:
+        with self._lock:
+            return sum(1 for name in names if self._data.pop(name, None) is not None)
@@ -0,0 +1,127 @@
+from api.configs.cache import RBAC_CACHE_SIZE, RBAC_CACHE_TTL_SECONDS
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+import time
+
+
+class RbacCache:
+    # Mỗi role_id được gán 1 bit; quyền của user là 1 số nguyên (bitset) nên kiểm tra
+    # "user có role Y" chỉ là phép AND, không chạm database khi cache hit
+    def __init__(self, maxsize: int = RBAC_CACHE_SIZE, ttl: float = RBAC_CACHE_TTL_SECONDS) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = Lock()
+        self._bits: Dict[UUID, int] = {}
+        self._free_bits: List[int] = []
+        self._role_ids: Dict[str, UUID] = {}
+        self._roles_loaded_at: Optional[float] = None
+        self._users: "OrderedDict[UUID, Tuple[float, int]]" = OrderedDict()
+
+    def roles_stale(self) -> bool:
+        # Tên role không có trong bảng đã nạp được coi là không tồn tại cho tới khi hết ttl,
+        # nên request nhắc tới role chưa có không làm nạp lại bảng roles mỗi lần
+        with self._lock:
+            return self._roles_loaded_at is None or self._roles_loaded_at + self.ttl <= time.time()
+
+    def load_roles(self, roles: Iterable[Tuple[UUID, str]]) -> None:
+        with self._lock:
+            self._role_ids = {rolename: role_id for role_id, rolename in roles}
+            for role_id in self._role_ids.values():
+                self._bit(role_id)
+            self._roles_loaded_at = time.time()
+
+    def role_mask(self, rolenames: Iterable[str]) -> Tuple[int, List[str]]:
+        # Trả về (bitset của các role đã biết, tên role chưa biết)
+        with self._lock:
+            mask = 0
+            missing = []
+            for rolename in rolenames:
+                role_id = self._role_ids.get(rolename)
+                if role_id is None:
+                    missing.append(rolename)
+                else:
+                    mask |= 1 << self._bit(role_id)
+            return mask, missing
+
+    def get_user_mask(self, user_id: UUID) -> Optional[int]:
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is None:
+                return None
+            expires_at, mask = entry
+            if expires_at <= time.time():
+                del self._users[user_id]
+                return None
+            self._users.move_to_end(user_id)
+            return mask
+
+    def put_user_roles(self, user_id: UUID, role_ids: Iterable[UUID]) -> int:
+        with self._lock:
+            mask = 0
+            for role_id in role_ids:
+                mask |= 1 << self._bit(role_id)
+            self._users[user_id] = (time.time() + self.ttl, mask)
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.maxsize:
+                self._users.popitem(last=False)
+            return mask
+
+    def invalidate_user(self, user_id: UUID) -> None:
+        with self._lock:
+            self._users.pop(user_id, None)
+
+    def invalidate_users(self, user_ids: Iterable[UUID]) -> None:
+        with self._lock:
+            for user_id in user_ids:
+                self._users.pop(user_id, None)
+
+    def invalidate_role_names(self) -> None:
+        # Tạo/đổi tên role: bit và bitset của user vẫn đúng, chỉ cần nạp lại bảng tên -> id
+        with self._lock:
+            self._role_ids.clear()
+            self._roles_loaded_at = None
+
+    def invalidate_role(self, role_id: UUID) -> None:
+        # Role bị xóa/đổi tên: bỏ bit của role, xóa user đang giữ bit đó, nạp lại tên role lần sau
+        with self._lock:
+            self._role_ids = {name: rid for name, rid in self._role_ids.items() if rid != role_id}
+            bit = self._bits.pop(role_id, None)
+            if bit is None:
+                return
+            flag = 1 << bit
+            for user_id in [user_id for user_id, (_, mask) in self._users.items() if mask & flag]:
+                del self._users[user_id]
+            self._free_bits.append(bit)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._bits.clear()
+            self._free_bits.clear()
+            self._role_ids.clear()
+            self._roles_loaded_at = None
+            self._users.clear()
+
+    def _bit(self, role_id: UUID) -> int:
+        bit = self._bits.get(role_id)
+        if bit is None:
+            bit = self._free_bits.pop() if self._free_bits else len(self._bits)
+            self._bits[role_id] = bit
+        return bit
+
+
+def required_mask(mask: int, missing: List[str], require_all: bool = False) -> Optional[int]:
+    # None = không user nào thỏa được (cần đủ mọi role mà có role không tồn tại, hoặc không role nào tồn tại)
+    if (missing and require_all) or mask == 0:
+        return None
+    return mask
+
+
+def has_roles(user_mask: int, required_mask: int, require_all: bool = False) -> bool:
+    if require_all:
+        return user_mask & required_mask == required_mask
+    return user_mask & required_mask != 0
+
+
+rbac_cache = RbacCache()
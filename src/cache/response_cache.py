@@ -0,0 +1,267 @@
+from fastapi import Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from api.configs.cache import (
+    REDIS_URL, RESPONSE_CACHE_BACKEND, RESPONSE_CACHE_MEMORY_TTL_SECONDS, RESPONSE_CACHE_SIZE,
+    RESPONSE_CACHE_TTL_SECONDS,
+)
+from api.configs.replicas import REPLICA_MAX_LAG_SECONDS
+from api.configs.metrics import RESPONSE_CACHE_REQUESTS
+from src.cache.fake_redis import FakeRedis
+from collections import OrderedDict
+from functools import lru_cache
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+import hashlib
+import json
+import logging
+import math
+import time
+
+logger = logging.getLogger(__name__)
+
+# Các nhóm dữ liệu có version riêng; controller ghi vào nhóm nào thì bump nhóm đó
+ROLES = "roles"
+USERS = "users"
+MEMBERSHIPS = "memberships"
+
+
+class CacheStats:
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.errors = 0
+        self.hit_ms_sum = 0.0
+        self.miss_ms_sum = 0.0
+
+    def observe(self, hit: bool, not_modified: bool, elapsed_ms: float) -> None:
+        RESPONSE_CACHE_REQUESTS.labels("hit" if hit else "miss").inc()
+        with self._lock:
+            if hit:
+                self.hits += 1
+                self.hit_ms_sum += elapsed_ms
+            else:
+                self.misses += 1
+                self.miss_ms_sum += elapsed_ms
+            if not_modified:
+                self.not_modified += 1
+
+    def observe_error(self) -> None:
+        with self._lock:
+            self.errors += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified,
+                "errors": self.errors,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "hit_avg_ms": self.hit_ms_sum / self.hits if self.hits else 0.0,
+                "miss_avg_ms": self.miss_ms_sum / self.misses if self.misses else 0.0,
+            }
+
+
+class InMemoryResponseBackend:
+    # Version bị bump ở worker khác không thấy được, nên TTL bị giới hạn bởi max_ttl:
+    # nhiều worker thì dữ liệu cũ tối đa max_ttl giây, trong cùng worker vẫn mất ngay khi bump
+    def __init__(self, maxsize: int = RESPONSE_CACHE_SIZE, max_ttl: float = RESPONSE_CACHE_MEMORY_TTL_SECONDS) -> None:
+        self.maxsize = maxsize
+        self.max_ttl = max_ttl
+        self._lock = Lock()
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+
+    def versions(self, entities: Iterable[str]) -> Tuple[int, ...]:
+        with self._lock:
+            return tuple(self._versions.get(entity, 0) for entity in entities)
+
+    def bump(self, entities: Iterable[str]) -> None:
+        with self._lock:
+            for entity in entities:
+                self._versions[entity] = self._versions.get(entity, 0) + 1
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+class RedisResponseBackend:
+    # Entry cũ không cần xóa: key chứa version nên bump xong là không còn ai đọc tới, TTL tự dọn
+    max_ttl = None
+
+    def __init__(self, client, prefix: str = "response:") -> None:
+        self.client = client
+        self.prefix = prefix
+
+    def versions(self, entities: Iterable[str]) -> Tuple[int, ...]:
+        return tuple(int(self.client.get(f"{self.prefix}version:{entity}") or 0) for entity in entities)
+
+    def bump(self, entities: Iterable[str]) -> None:
+        for entity in entities:
+            self.client.incr(f"{self.prefix}version:{entity}")
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self.client.set(self.prefix + key, value, ex=max(int(math.ceil(ttl)), 1))
+
+
+@lru_cache(maxsize=None)
+def _adapter(model) -> TypeAdapter:
+    return TypeAdapter(model)
+
+
+def _etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+class ResponseCache:
+    def __init__(self, backend, ttl: float = RESPONSE_CACHE_TTL_SECONDS) -> None:
+        self.backend = backend
+        self.ttl = ttl
+        self.stats = CacheStats()
+
+    def bump(self, *entities: str) -> None:
+        if self.backend is None:
+            return
+        try:
+            self.backend.bump(entities)
+        except Exception:
+            self.stats.observe_error()
+            logger.exception("Failed to bump response cache version for %s", entities)
+
+    def _key(self, request: Request, entities: Tuple[str, ...]) -> Optional[str]:
+        try:
+            versions = self.backend.versions(entities)
+        except Exception:
+            self.stats.observe_error()
+            logger.exception("Response cache version lookup failed, serving uncached")
+            return None
+        params = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+        tag = ",".join(f"{entity}:{version}" for entity, version in zip(entities, versions))
+        return f"{request.url.path}?{params}|{tag}"
+
+    def _lookup(self, key: Optional[str]) -> Optional[dict]:
+        if key is None:
+            return None
+        try:
+            raw = self.backend.get(key)
+        except Exception:
+            self.stats.observe_error()
+            logger.exception("Response cache lookup failed")
+            return None
+        return json.loads(raw) if raw is not None else None
+
+    def _store(self, key: Optional[str], model, value: Any, headers: Dict[str, str], ttl: float) -> dict:
+        body = json.dumps(
+            jsonable_encoder(_adapter(model).validate_python(value, from_attributes=True)),
+            separators=(",", ":"),
+        )
+        entry = {"etag": _etag(body.encode()), "body": body, "headers": headers}
+        if key is not None:
+            try:
+                self.backend.set(key, json.dumps(entry).encode(), ttl)
+            except Exception:
+                self.stats.observe_error()
+                logger.exception("Failed to store cached response")
+        return entry
+
+    def _response(self, request: Request, entry: dict, hit: bool, start: float) -> Response:
+        headers = {
+            **entry["headers"],
+            "ETag": entry["etag"],
+            "Cache-Control": "private, no-cache",
+            "X-Cache": "HIT" if hit else "MISS",
+        }
+        not_modified = _matches(request.headers.get("if-none-match"), entry["etag"])
+        if not_modified:
+            response = Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        else:
+            response = Response(content=entry["body"], media_type="application/json", headers=headers)
+        self.stats.observe(hit, not_modified, (time.perf_counter() - start) * 1000)
+        return response
+
+    def ttl_for(self, db) -> float:
+        # Dữ liệu đọc từ replica có thể trễ; đừng giữ lâu hơn độ trễ cho phép của replica
+        ttl = self.ttl
+        if self.backend is not None and self.backend.max_ttl is not None:
+            ttl = min(ttl, self.backend.max_ttl)
+        return ttl if db is None or db.info.get("replica") is None else min(ttl, REPLICA_MAX_LAG_SECONDS)
+
+    def respond(
+        self,
+        request: Request,
+        entities: Tuple[str, ...],
+        model,
+        build: Callable[[], Any],
+        headers_for: Optional[Callable[[Any], Dict[str, str]]] = None,
+        db=None,
+    ) -> Response:
+        # build() chỉ chạy khi miss; lỗi (vd. 404) đi thẳng ra ngoài và không được cache
+        start = time.perf_counter()
+        key = self._key(request, entities) if self.backend is not None else None
+        entry = self._lookup(key)
+        hit = entry is not None
+        if not hit:
+            value = build()
+            entry = self._store(key, model, value, headers_for(value) if headers_for else {}, self.ttl_for(db))
+        return self._response(request, entry, hit, start)
+
+    async def arespond(
+        self,
+        request: Request,
+        entities: Tuple[str, ...],
+        model,
+        build: Callable[[], Awaitable[Any]],
+        headers_for: Optional[Callable[[Any], Dict[str, str]]] = None,
+        db=None,
+    ) -> Response:
+        start = time.perf_counter()
+        key = self._key(request, entities) if self.backend is not None else None
+        entry = self._lookup(key)
+        hit = entry is not None
+        if not hit:
+            value = await build()
+            entry = self._store(key, model, value, headers_for(value) if headers_for else {}, self.ttl_for(db))
+        return self._response(request, entry, hit, start)
+
+
+def create_response_backend(name: str = RESPONSE_CACHE_BACKEND):
+    if name == "off":
+        return None
+    if name == "redis":
+        import redis
+        return RedisResponseBackend(redis.Redis.from_url(REDIS_URL))
+    if name == "fakeredis":
+        return RedisResponseBackend(FakeRedis())
+    return InMemoryResponseBackend()
+
+
+response_cache = ResponseCache(create_response_backend())
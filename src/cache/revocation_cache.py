@@ -0,0 +1,197 @@
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from src.models.blacklist_model import TokenBlacklist
+from api.configs.cache import (
+    REDIS_URL, REVOCATION_BACKEND,
+    REVOCATION_BLOOM_CAPACITY, REVOCATION_BLOOM_ERROR_RATE, REVOCATION_MAX_STALENESS_SECONDS,
+)
+from api.configs.metrics import REVOCATION_LOOKUPS
+from src.cache.fake_redis import FakeRedis
+from datetime import datetime, timedelta
+from threading import Lock
+from typing import Dict, Iterable, Optional, Tuple
+import logging
+import math
+import time
+
+logger = logging.getLogger(__name__)
+
+# blacklisted_at là NOW() lúc transaction bắt đầu, có thể commit sau lần đồng bộ kế tiếp
+# -> mỗi lần đồng bộ đọc lùi lại một khoảng; nạp trùng token không sao
+SYNC_OVERLAP = timedelta(seconds=30)
+
+
+class BloomFilter:
+    # Fingerprint đã là sha256 hex nên lấy luôn 2 đoạn 64 bit làm double hashing
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        capacity = max(capacity, 1)
+        self.size = max(int(-capacity * math.log(error_rate) / (math.log(2) ** 2)), 8)
+        self.hash_count = max(int(round(self.size / capacity * math.log(2))), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, fingerprint: str):
+        raw = bytes.fromhex(fingerprint)
+        h1 = int.from_bytes(raw[:8], "big")
+        h2 = int.from_bytes(raw[8:16], "big") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, fingerprint: str) -> None:
+        for pos in self._positions(fingerprint):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, fingerprint: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(fingerprint))
+
+
+class InMemoryRevocationBackend:
+    # Riêng từng process: token thu hồi ở worker khác chỉ thấy được sau RevocationCache.sync
+    shared = False
+
+    def __init__(self, capacity: int = REVOCATION_BLOOM_CAPACITY, error_rate: float = REVOCATION_BLOOM_ERROR_RATE) -> None:
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._lock = Lock()
+        self._expires: Dict[str, float] = {}
+        self._bloom = BloomFilter(capacity, error_rate)
+
+    def load(self, items: Iterable[Tuple[str, float]]) -> None:
+        with self._lock:
+            for fingerprint, expires_at in items:
+                self._expires[fingerprint] = expires_at
+            self._rebuild()
+
+    def add(self, fingerprint: str, expires_at: float) -> None:
+        with self._lock:
+            self._expires[fingerprint] = expires_at
+            if len(self._expires) > self.capacity:
+                # vượt capacity thì dựng lại filter lớn hơn để giữ tỉ lệ false positive
+                self.capacity *= 2
+                self._rebuild()
+            else:
+                self._bloom.add(fingerprint)
+
+    def contains(self, fingerprint: str) -> bool:
+        # Đường chính: bloom filter trả lời "chưa bị thu hồi" mà không cần lock
+        if fingerprint not in self._bloom:
+            return False
+        expires_at = self._expires.get(fingerprint)
+        return expires_at is not None and expires_at > time.time()
+
+    def prune(self, now: Optional[float] = None) -> int:
+        now = now or time.time()
+        with self._lock:
+            expired = [fp for fp, exp in self._expires.items() if exp <= now]
+            for fingerprint in expired:
+                del self._expires[fingerprint]
+            if expired:
+                self._rebuild()
+            return len(expired)
+
+    def _rebuild(self) -> None:
+        bloom = BloomFilter(max(self.capacity, len(self._expires)), self.error_rate)
+        for fingerprint in self._expires:
+            bloom.add(fingerprint)
+        self._bloom = bloom
+
+
+class RedisRevocationBackend:
+    # Key tự hết hạn theo expires_at của token nên prune không cần làm gì
+    shared = True
+
+    def __init__(self, client, prefix: str = "revoked:") -> None:
+        self.client = client
+        self.prefix = prefix
+
+    def load(self, items: Iterable[Tuple[str, float]]) -> None:
+        for fingerprint, expires_at in items:
+            self.add(fingerprint, expires_at)
+
+    def add(self, fingerprint: str, expires_at: float) -> None:
+        ttl = int(math.ceil(expires_at - time.time()))
+        if ttl > 0:
+            self.client.set(self.prefix + fingerprint, 1, ex=ttl)
+
+    def contains(self, fingerprint: str) -> bool:
+        return bool(self.client.exists(self.prefix + fingerprint))
+
+    def prune(self, now: Optional[float] = None) -> int:
+        return 0
+
+
+class RevocationCache:
+    def __init__(self, backend, max_staleness: float = REVOCATION_MAX_STALENESS_SECONDS) -> None:
+        self.backend = backend
+        self.max_staleness = max_staleness
+        # Chỉ tin kết quả của cache sau khi đã nạp danh sách từ bảng blacklist_token
+        self.ready = False
+        # Mốc blacklisted_at (giờ của database) đã nạp tới, và lúc đồng bộ thành công gần nhất
+        self.synced_until: Optional[datetime] = None
+        self.synced_at = 0.0
+
+    @property
+    def shared(self) -> bool:
+        return self.backend.shared
+
+    def _load(self, db: Session, since: Optional[datetime]) -> int:
+        now = db.execute(select(func.now())).scalar()
+        query = db.query(TokenBlacklist.token_hash, TokenBlacklist.expires_at).filter(
+            TokenBlacklist.expires_at > now
+        )
+        if since is not None:
+            query = query.filter(TokenBlacklist.blacklisted_at > since - SYNC_OVERLAP)
+        rows = query.all()
+        self.backend.load((token_hash, expires_at.timestamp()) for token_hash, expires_at in rows)
+        self.synced_until = now
+        self.synced_at = time.monotonic()
+        return len(rows)
+
+    def warm(self, db: Session) -> int:
+        loaded = self._load(db, None)
+        self.ready = True
+        return loaded
+
+    def sync(self, db: Session) -> int:
+        # Chỉ nạp các token bị thu hồi từ lần đồng bộ trước (index blacklisted_at)
+        if not self.ready:
+            return self.warm(db)
+        return self._load(db, self.synced_until)
+
+    def fresh(self) -> bool:
+        # Backend chia sẻ (redis) luôn thấy ngay token do worker khác thu hồi
+        return self.shared or time.monotonic() - self.synced_at <= self.max_staleness
+
+    def add(self, fingerprint: str, expires_at: datetime) -> None:
+        try:
+            self.backend.add(fingerprint, expires_at.timestamp())
+        except Exception:
+            logger.exception("Failed to record revoked token in cache")
+
+    def is_revoked(self, fingerprint: str) -> Optional[bool]:
+        # None = cache không trả lời được, caller phải hỏi lại database
+        if not self.ready or not self.fresh():
+            REVOCATION_LOOKUPS.labels("miss").inc()
+            return None
+        try:
+            revoked = self.backend.contains(fingerprint)
+        except Exception:
+            logger.exception("Revocation cache lookup failed, falling back to database")
+            REVOCATION_LOOKUPS.labels("miss").inc()
+            return None
+        REVOCATION_LOOKUPS.labels("hit").inc()
+        return revoked
+
+    def prune(self) -> int:
+        return self.backend.prune()
+
+
+def create_revocation_backend(name: str = REVOCATION_BACKEND):
+    if name == "redis":
+        import redis
+        return RedisRevocationBackend(redis.Redis.from_url(REDIS_URL))
+    if name == "fakeredis":
+        return RedisRevocationBackend(FakeRedis())
+    return InMemoryRevocationBackend()
+
+
+revocation_cache = RevocationCache(create_revocation_backend())
@@ -0,0 +1,89 @@
+from api.configs.cache import TOKEN_CACHE_SIZE, TOKEN_CACHE_TTL_SECONDS
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Dict, FrozenSet, Optional, Set, Tuple
+from uuid import UUID
+import time
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    id: UUID
+    username: str
+    is_active: bool
+    role_ids: FrozenSet[UUID]
+
+
+class TokenCache:
+    # LRU theo digest của token; mỗi entry hết hạn ở min(ttl, exp của token)
+    def __init__(self, maxsize: int = TOKEN_CACHE_SIZE, ttl: float = TOKEN_CACHE_TTL_SECONDS) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = Lock()
+        self._entries: "OrderedDict[str, Tuple[float, dict, UserSnapshot]]" = OrderedDict()
+        self._by_user: Dict[UUID, Set[str]] = {}
+
+    def get(self, digest: str) -> Optional[Tuple[dict, UserSnapshot]]:
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                return None
+            expires_at, payload, snapshot = entry
+            if expires_at <= time.time():
+                self._remove(digest)
+                return None
+            self._entries.move_to_end(digest)
+            return payload, snapshot
+
+    def put(self, digest: str, payload: dict, snapshot: UserSnapshot) -> None:
+        expires_at = time.time() + self.ttl
+        if payload.get("exp"):
+            expires_at = min(expires_at, float(payload["exp"]))
+        with self._lock:
+            self._remove(digest)
+            self._entries[digest] = (expires_at, payload, snapshot)
+            self._by_user.setdefault(snapshot.id, set()).add(digest)
+            while len(self._entries) > self.maxsize:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    def invalidate_token(self, digest: str) -> None:
+        with self._lock:
+            self._remove(digest)
+
+    def invalidate_user(self, user_id: UUID) -> None:
+        with self._lock:
+            for digest in list(self._by_user.get(user_id, ())):
+                self._remove(digest)
+
+    def invalidate_users(self, user_ids) -> None:
+        with self._lock:
+            for user_id in user_ids:
+                for digest in list(self._by_user.get(user_id, ())):
+                    self._remove(digest)
+
+    def invalidate_role(self, role_id: UUID) -> None:
+        with self._lock:
+            stale = [digest for digest, (_, _, snapshot) in self._entries.items() if role_id in snapshot.role_ids]
+            for digest in stale:
+                self._remove(digest)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+
+    def _remove(self, digest: str) -> None:
+        entry = self._entries.pop(digest, None)
+        if entry is None:
+            return
+        user_id = entry[2].id
+        digests = self._by_user.get(user_id)
+        if digests is not None:
+            digests.discard(digest)
+            if not digests:
+                del self._by_user[user_id]
+
+
+token_cache = TokenCache()
@@ -0,0 +1,81 @@
+from fastapi import BackgroundTasks
+from sqlalchemy import select, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.models.user_model import User
+from src.models.blacklist_model import TokenBlacklist
+from src.schemas.auth_schema import UserRegister
+from src.controller.integrity import raise_integrity_error
+from api.configs.cache import REAPER_BATCH_SIZE
+from api.configs.hashing import hashing_executor
+from src.cache.revocation_cache import revocation_cache
+from src.cache.response_cache import response_cache, USERS
+from src.controller.auth_controller import rehash_user_password
+from typing import Optional
+from datetime import datetime, timezone
+
+async def create_user_account(db: AsyncSession, user_data: UserRegister) -> User:
+    hashed_password = await hashing_executor.ahash(user_data.password)
+
+    user = User(
+        username=user_data.username,
+        email=user_data.email,
+        password=hashed_password,
+    )
+    db.add(user)
+    try:
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        raise_integrity_error(e)
+    response_cache.bump(USERS)
+    return user
+
+
+async def authenticate_user(
+    db: AsyncSession,
+    username: str,
+    password: str,
+    background_tasks: Optional[BackgroundTasks] = None,
+) -> Optional[User]:
+    result = await db.execute(select(User).filter(User.username == username))
+    user = result.scalars().first()
+    if not user:
+        return None
+    valid, needs_rehash = await hashing_executor.averify_and_check(password, user.password)
+    if not valid:
+        return None
+    if needs_rehash and background_tasks is not None:
+        background_tasks.add_task(rehash_user_password, user.id, password, user.password)
+    return user
+
+async def blacklist_token(db: AsyncSession, token_hash: str, expires_at: datetime) -> None:
+    blacklisted = TokenBlacklist(token_hash=token_hash, expires_at=expires_at)
+    db.add(blacklisted)
+    await db.commit()
+    revocation_cache.add(token_hash, expires_at)
+
+
+async def is_token_blacklisted(db: AsyncSession, token_hash: str) -> bool:
+    revoked = revocation_cache.is_revoked(token_hash)
+    if revoked is not None:
+        return revoked
+    result = await db.execute(select(TokenBlacklist.id).filter(TokenBlacklist.token_hash == token_hash))
+    return result.first() is not None
+
+
+async def cleanup_expired_tokens(db: AsyncSession, batch_size: int = REAPER_BATCH_SIZE) -> int:
+    delete_batch = text(
+        "DELETE FROM blacklist_token WHERE ctid IN ("
+        "SELECT ctid FROM blacklist_token WHERE expires_at < :now LIMIT :batch_size)"
+    )
+    now = datetime.now(timezone.utc)
+    total = 0
+    while True:
+        result = await db.execute(delete_batch, {"now": now, "batch_size": batch_size})
+        await db.commit()
+        total += result.rowcount
+        if result.rowcount < batch_size:
+            break
+    revocation_cache.prune()
+    return total
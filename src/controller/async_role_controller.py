@@ -0,0 +1,152 @@
+from sqlalchemy import select, delete, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.models.user_model import User
+from src.models.role_model import Role
+from src.models.user_role_model import UserRole
+from src.cache.token_cache import token_cache
+from src.cache.rbac_cache import rbac_cache
+from src.cache.response_cache import response_cache, ROLES, MEMBERSHIPS
+from src.controller.pagination import decode_cursor
+from src.controller.integrity import (
+    raise_integrity_error, raise_membership_error, constraint_name, USER_ROLES_USER_FK
+)
+from src.controller.role_controller import chunked
+from src.schemas.role_schema import RoleCreate, RoleUpdate, AssignRoleResult
+from typing import List, Optional
+from uuid import UUID
+
+
+async def get_missing_user_ids(db: AsyncSession, total_ids: List[UUID]) -> List[UUID]:
+    unique_ids = list(dict.fromkeys(total_ids))
+    found_ids = set()
+    for chunk in chunked(unique_ids):
+        result = await db.execute(select(User.id).filter(User.id.in_(chunk)))
+        found_ids.update(result.scalars().all())
+    return [user_id for user_id in unique_ids if user_id not in found_ids]
+
+
+async def create_role(db: AsyncSession, role_in: RoleCreate) -> Role:
+    role = Role(
+        rolename=role_in.rolename,
+    )
+    db.add(role)
+    try:
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        raise_integrity_error(e)
+    # Role mới có thể đang bị cache là "không tồn tại" trong require_roles
+    rbac_cache.invalidate_role_names()
+    response_cache.bump(ROLES)
+    return role
+
+
+async def get_role(db: AsyncSession, role_id: UUID) -> Optional[Role]:
+    result = await db.execute(select(Role).filter(Role.id == role_id))
+    return result.scalars().first()
+
+
+async def get_role_by_name(db: AsyncSession, rolename: str) -> Optional[Role]:
+    result = await db.execute(select(Role).filter(Role.rolename == rolename))
+    return result.scalars().first()
+
+
+async def list_roles(db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[Role]:
+    query = select(Role).order_by(Role.created_at, Role.id)
+    if cursor is not None:
+        created_at, last_id = decode_cursor(cursor)
+        query = query.filter(tuple_(Role.created_at, Role.id) > tuple_(created_at, last_id))
+    else:
+        query = query.offset(skip)
+    result = await db.execute(query.limit(limit))
+    return list(result.scalars().all())
+
+
+async def update_role(db: AsyncSession, role: Role, role_in: RoleUpdate) -> Role:
+    updated = False
+
+    if role_in.rolename is not None:
+        role.rolename = role_in.rolename
+        updated = True
+
+    if updated:
+        db.add(role)
+        try:
+            await db.commit()
+        except IntegrityError as e:
+            await db.rollback()
+            raise_integrity_error(e)
+        rbac_cache.invalidate_role_names()
+        response_cache.bump(ROLES)
+    return role
+
+
+
+async def assign_role(db: AsyncSession, role: Role, role_id: UUID, total_ids: List[UUID]) -> AssignRoleResult:
+    unique_ids = list(dict.fromkeys(total_ids))
+    inserted = 0
+    try:
+        for chunk in chunked(unique_ids):
+            stmt = (
+                pg_insert(UserRole)
+                .values([{"user_id": user_id, "role_id": role_id} for user_id in chunk])
+                .on_conflict_do_nothing(index_elements=[UserRole.user_id, UserRole.role_id])
+                .returning(UserRole.user_id)
+            )
+            result = await db.execute(stmt)
+            inserted += len(result.all())
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        missing_ids = await get_missing_user_ids(db, unique_ids) if constraint_name(e) == USER_ROLES_USER_FK else []
+        raise_membership_error(e, missing_ids)
+    response_cache.bump(MEMBERSHIPS)
+    token_cache.invalidate_users(unique_ids)
+    rbac_cache.invalidate_users(unique_ids)
+    return AssignRoleResult(
+        role_id=role_id,
+        requested=len(unique_ids),
+        inserted=inserted,
+        already_present=len(unique_ids) - inserted,
+    )
+
+
+
+async def remove_role_from_users(db: AsyncSession, role: Role, role_id: UUID, total_ids: List[UUID]) -> Role:
+    await db.execute(
+        delete(UserRole).filter(UserRole.role_id == role_id, UserRole.user_id.in_(total_ids))
+    )
+    await db.commit()
+    response_cache.bump(MEMBERSHIPS)
+    token_cache.invalidate_users(total_ids)
+    rbac_cache.invalidate_users(total_ids)
+    return role
+
+
+async def get_users_by_role(
+    db: AsyncSession, role: Role, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+) -> List[User]:
+    # role.users là lazy load, không dùng được với AsyncSession -> join trực tiếp
+    query = (
+        select(User)
+        .join(UserRole, UserRole.user_id == User.id)
+        .filter(UserRole.role_id == role.id)
+        .order_by(User.created_at, User.id)
+    )
+    if cursor is not None:
+        created_at, last_id = decode_cursor(cursor)
+        query = query.filter(tuple_(User.created_at, User.id) > tuple_(created_at, last_id))
+    else:
+        query = query.offset(skip)
+    result = await db.execute(query.limit(limit))
+    return list(result.scalars().all())
+
+
+async def delete_role(db: AsyncSession, role: Role) -> None:
+    await db.delete(role)
+    await db.commit()
+    response_cache.bump(ROLES, MEMBERSHIPS)
+    token_cache.invalidate_role(role.id)
+    rbac_cache.invalidate_role(role.id)
@@ -0,0 +1,150 @@
+from sqlalchemy import select, tuple_, delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from starlette.concurrency import run_in_threadpool
+from src.models.user_model import User
+from src.schemas.user_schema import UserCreate, UserUpdate, UserPatch, UserBatchResult
+from src.controller.user_controller import batch_results, group_patches, update_statement
+from src.cache.token_cache import token_cache
+from src.cache.rbac_cache import rbac_cache
+from src.cache.response_cache import response_cache, USERS, MEMBERSHIPS
+from api.configs.hashing import hashing_executor
+from src.controller.pagination import decode_cursor
+from src.controller.integrity import raise_integrity_error
+from typing import Dict, List, Optional
+from uuid import UUID
+
+async def create_user(db: AsyncSession, user_in: UserCreate) -> User:
+    user = User(
+        username=user_in.username,
+        email=user_in.email,
+        password=await hashing_executor.ahash(user_in.password),
+        phone=user_in.phone,
+        date_of_birth=user_in.date_of_birth
+    )
+
+    db.add(user)
+    try:
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        raise_integrity_error(e)
+    response_cache.bump(USERS)
+    return user
+
+
+def user_query(expand_roles: bool = False):
+    # AsyncSession không lazy load được -> roles phải nạp sẵn bằng selectinload
+    query = select(User)
+    if expand_roles:
+        query = query.options(selectinload(User.roles))
+    return query
+
+
+async def get_user(db: AsyncSession, user_id: UUID, expand_roles: bool = False) -> Optional[User]:
+    result = await db.execute(user_query(expand_roles).filter(User.id == user_id))
+    return result.scalars().first()
+
+
+async def get_user_by_name(db: AsyncSession, username: str) -> Optional[User]:
+    result = await db.execute(select(User).filter(User.username == username))
+    return result.scalars().first()
+
+
+
+async def list_users(
+    db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, expand_roles: bool = False
+) -> List[User]:
+    query = user_query(expand_roles).order_by(User.created_at, User.id)
+    if cursor is not None:
+        created_at, last_id = decode_cursor(cursor)
+        query = query.filter(tuple_(User.created_at, User.id) > tuple_(created_at, last_id))
+    else:
+        query = query.offset(skip)
+    result = await db.execute(query.limit(limit))
+    return list(result.scalars().all())
+
+
+async def update_user(db: AsyncSession, user: User, user_in: UserUpdate) -> User:
+    updated = False
+
+    if user_in.username is not None:
+        user.username = user_in.username
+        updated = True
+    if user_in.email is not None:
+        user.email = user_in.email
+        updated = True
+    if user_in.password is not None:
+        user.password = await hashing_executor.ahash(user_in.password)
+        updated = True
+    if user_in.phone is not None:
+        user.phone = user_in.phone
+        updated = True
+    if user_in.date_of_birth is not None:
+        user.date_of_birth = user_in.date_of_birth
+        updated = True
+
+    if updated:
+        db.add(user)
+        try:
+            await db.commit()
+        except IntegrityError as e:
+            await db.rollback()
+            raise_integrity_error(e)
+        token_cache.invalidate_user(user.id)
+        response_cache.bump(USERS)
+    return user
+
+
+async def delete_user(db: AsyncSession, user: User) -> None:
+    await db.delete(user)
+    await db.commit()
+    response_cache.bump(USERS, MEMBERSHIPS)
+    token_cache.invalidate_user(user.id)
+    rbac_cache.invalidate_user(user.id)
+
+
+async def get_users(db: AsyncSession, user_ids: List[UUID]) -> Dict[UUID, User]:
+    result = await db.execute(select(User).filter(User.id.in_(user_ids)))
+    return {user.id: user for user in result.scalars()}
+
+
+async def update_users(db: AsyncSession, patches: List[UserPatch]) -> List[UserBatchResult]:
+    patches = list({patch.user_id: patch for patch in patches}.values())
+    user_ids = [patch.user_id for patch in patches]
+    result = await db.execute(select(User.id).filter(User.id.in_(user_ids)))
+    found_ids = set(result.scalars())
+    patches = [patch for patch in patches if patch.user_id in found_ids]
+
+    hashed = await run_in_threadpool(
+        hashing_executor.hash_many, [p.password for p in patches if p.password is not None]
+    )
+    try:
+        for fields, rows in group_patches(patches, hashed).items():
+            await db.execute(update_statement(fields), rows)
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        raise_integrity_error(e)
+
+    token_cache.invalidate_users(found_ids)
+    response_cache.bump(USERS)
+    db.expire_all()
+    return batch_results(user_ids, await get_users(db, list(found_ids)))
+
+
+async def delete_users(db: AsyncSession, user_ids: List[UUID]) -> List[UserBatchResult]:
+    result = await db.execute(
+        delete(User).where(User.id.in_(user_ids)).returning(User.id),
+        execution_options={"synchronize_session": False},
+    )
+    deleted = set(result.scalars())
+    await db.commit()
+    response_cache.bump(USERS, MEMBERSHIPS)
+    token_cache.invalidate_users(deleted)
+    rbac_cache.invalidate_users(deleted)
+    return [
+        UserBatchResult(user_id=user_id, status="ok" if user_id in deleted else "not_found")
+        for user_id in dict.fromkeys(user_ids)
+    ]
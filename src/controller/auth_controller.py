@@ -1,13 +1,25 @@
+from fastapi import BackgroundTasks, HTTPException
+from sqlalchemy import text, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from api.configs.db import SessionLocal
 from src.models.user_model import User
 from src.models.blacklist_model import TokenBlacklist
 from src.schemas.auth_schema import UserRegister
-from api.configs.auth import get_password_hash, verify_password
+from src.controller.integrity import raise_integrity_error
+from api.configs.cache import REAPER_BATCH_SIZE
+from api.configs.hashing import hashing_executor
+from src.cache.revocation_cache import revocation_cache
+from src.cache.response_cache import response_cache, USERS
 from typing import Optional
-from datetime import datetime, timedelta, timezone
+from uuid import UUID
+from datetime import datetime, timezone
+import logging
+
+logger = logging.getLogger(__name__)
 
 def create_user_account(db: Session, user_data: UserRegister) -> User:
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = hashing_executor.hash(user_data.password)
     
     user = User(
         username=user_data.username,
@@ -15,30 +27,79 @@ def create_user_account(db: Session, user_data: UserRegister) -> User:
         password=hashed_password,
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    try:
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        raise_integrity_error(e)
+    response_cache.bump(USERS)
     return user
 
 
-def authenticate_user(db: Session, username: str, password: str) -> Optional[User]:
+def authenticate_user(
+    db: Session,
+    username: str,
+    password: str,
+    background_tasks: Optional[BackgroundTasks] = None,
+) -> Optional[User]:
     user = db.query(User).filter(User.username == username).first()
     if not user:
         return None
-    if not verify_password(password, user.password):
+    valid, needs_rehash = hashing_executor.verify_and_check(password, user.password)
+    if not valid:
         return None
+    if needs_rehash and background_tasks is not None:
+        # Hash cũ (bcrypt / tham số Argon2 cũ) -> hash lại sau khi đã trả response
+        background_tasks.add_task(rehash_user_password, user.id, password, user.password)
     return user
 
-def blacklist_token(db: Session, token: str, expires_at: datetime) -> None:
-    blacklisted = TokenBlacklist(token=token, expires_at=expires_at)
+
+def rehash_user_password(user_id: UUID, password: str, old_hash: str) -> None:
+    try:
+        new_hash = hashing_executor.hash(password)
+    except HTTPException:
+        # pool đang quá tải, để lần đăng nhập sau hash lại
+        return
+    with SessionLocal() as db:
+        # Chỉ ghi đè khi mật khẩu chưa bị đổi trong lúc đang hash
+        db.execute(
+            update(User)
+            .where(User.id == user_id, User.password == old_hash)
+            .values(password=new_hash)
+        )
+        db.commit()
+    # Hash mật khẩu không có trong response nào -> không cần bump cache response
+    logger.info("Rehashed password for user %s", user_id)
+
+def blacklist_token(db: Session, token_hash: str, expires_at: datetime) -> None:
+    blacklisted = TokenBlacklist(token_hash=token_hash, expires_at=expires_at)
     db.add(blacklisted)
     db.commit()
+    revocation_cache.add(token_hash, expires_at)
 
 
-def is_token_blacklisted(db: Session, token: str) -> bool:
-    result = db.query(TokenBlacklist).filter(TokenBlacklist.token == token).first()
+def is_token_blacklisted(db: Session, token_hash: str) -> bool:
+    # Hầu hết token chưa bị thu hồi -> cache trả lời luôn, không query Postgres
+    revoked = revocation_cache.is_revoked(token_hash)
+    if revoked is not None:
+        return revoked
+    result = db.query(TokenBlacklist.id).filter(TokenBlacklist.token_hash == token_hash).first()
     return result is not None
 
 
-def cleanup_expired_tokens(db: Session) -> None:
-    db.query(TokenBlacklist).filter(TokenBlacklist.expires_at < datetime.now(timezone.utc)).delete(synchronize_session=False)
-    db.commit()
\ No newline at end of file
+def cleanup_expired_tokens(db: Session, batch_size: int = REAPER_BATCH_SIZE) -> int:
+    # Xóa theo lô, commit sau mỗi lô để không giữ lock trên cả bảng
+    delete_batch = text(
+        "DELETE FROM blacklist_token WHERE ctid IN ("
+        "SELECT ctid FROM blacklist_token WHERE expires_at < :now LIMIT :batch_size)"
+    )
+    now = datetime.now(timezone.utc)
+    total = 0
+    while True:
+        deleted = db.execute(delete_batch, {"now": now, "batch_size": batch_size}).rowcount
+        db.commit()
+        total += deleted
+        if deleted < batch_size:
+            break
+    revocation_cache.prune()
+    return total
\ No newline at end of file
@@ -0,0 +1,65 @@
+from sqlalchemy import select
+from api.configs.replicas import read_session
+from src.models.user_model import User
+from src.models.user_role_model import UserRole
+from datetime import date, datetime
+from typing import Iterator, Sequence
+from uuid import UUID
+import csv
+import io
+import json
+import os
+
+# Số dòng mỗi lần fetch từ server-side cursor, cũng là kích thước mỗi chunk ghi ra response
+EXPORT_FETCH_SIZE = int(os.getenv("EXPORT_FETCH_SIZE", "2000"))
+
+USER_EXPORT_COLUMNS = (
+    User.id, User.username, User.email, User.phone, User.date_of_birth,
+    User.is_active, User.created_at, User.updated_at,
+)
+MEMBERSHIP_EXPORT_COLUMNS = (UserRole.user_id, UserRole.role_id, UserRole.assigned_at)
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def _stream_rows(statement, columns: Sequence, fmt: str) -> Iterator[str]:
+    # stream_results -> psycopg2 dùng server-side cursor, bộ nhớ chỉ giữ 1 partition
+    names = [column.key for column in columns]
+    with read_session() as db:
+        result = db.execute(
+            statement.execution_options(stream_results=True, yield_per=EXPORT_FETCH_SIZE)
+        )
+        if fmt == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(names)
+            for rows in result.partitions():
+                writer.writerows([[_plain(v) if v is not None else "" for v in row] for row in rows])
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            if buffer.tell():
+                yield buffer.getvalue()
+        else:
+            for rows in result.partitions():
+                yield "".join(
+                    json.dumps({name: _plain(v) for name, v in zip(names, row)}) + "\n" for row in rows
+                )
+
+
+def stream_users(fmt: str) -> Iterator[str]:
+    statement = select(*USER_EXPORT_COLUMNS).order_by(User.created_at, User.id)
+    return _stream_rows(statement, USER_EXPORT_COLUMNS, fmt)
+
+
+def stream_memberships(fmt: str) -> Iterator[str]:
+    statement = select(*MEMBERSHIP_EXPORT_COLUMNS).order_by(UserRole.role_id, UserRole.user_id)
+    return _stream_rows(statement, MEMBERSHIP_EXPORT_COLUMNS, fmt)
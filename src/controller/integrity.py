@@ -0,0 +1,42 @@
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+from typing import List, NoReturn, Optional
+from uuid import UUID
+
+# Tên constraint mặc định của Postgres cho unique=True: <bảng>_<cột>_key
+UNIQUE_CONSTRAINT_MESSAGES = {
+    "users_username_key": "Username already registered",
+    "users_email_key": "Email already registered",
+    "users_phone_key": "Phone already registered",
+    "roles_rolename_key": "Role already exists",
+}
+
+# Khóa ngoại của user_roles
+USER_ROLES_USER_FK = "user_roles_user_id_fkey"
+USER_ROLES_ROLE_FK = "user_roles_role_id_fkey"
+
+
+def constraint_name(exc: IntegrityError) -> Optional[str]:
+    orig = exc.orig
+    # psycopg2 để tên constraint trong diag, asyncpg trong exception gốc (__cause__)
+    name = getattr(getattr(orig, "diag", None), "constraint_name", None)
+    if name is None:
+        name = getattr(getattr(orig, "__cause__", None), "constraint_name", None)
+    return name
+
+
+def raise_integrity_error(exc: IntegrityError) -> NoReturn:
+    detail = UNIQUE_CONSTRAINT_MESSAGES.get(constraint_name(exc))
+    if detail is None:
+        raise exc
+    raise HTTPException(status_code=400, detail=detail) from exc
+
+
+def raise_membership_error(exc: IntegrityError, missing_ids: List[UUID]) -> NoReturn:
+    # User/role bị xóa giữa lúc kiểm tra và lúc INSERT vào user_roles -> 404 như bước kiểm tra
+    name = constraint_name(exc)
+    if name == USER_ROLES_ROLE_FK:
+        raise HTTPException(status_code=404, detail="Role not found") from exc
+    if name == USER_ROLES_USER_FK:
+        raise HTTPException(status_code=404, detail=f"Users not found: {missing_ids}") from exc
+    raise exc
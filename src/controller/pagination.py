@@ -0,0 +1,28 @@
+from fastapi import HTTPException
+from datetime import datetime
+from typing import Dict, Sequence, Tuple
+from uuid import UUID
+import base64
+import json
+
+
+# Cursor keyset theo (created_at, id), mã hóa base64 để client coi như chuỗi mờ
+def encode_cursor(created_at: datetime, row_id: UUID) -> str:
+    raw = json.dumps({"c": created_at.isoformat(), "i": str(row_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(data["c"]), UUID(data["i"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def next_cursor_headers(rows: Sequence, limit: int) -> Dict[str, str]:
+    # Trang đầy thì có thể còn trang sau -> trả X-Next-Cursor trỏ tới dòng cuối
+    if len(rows) == limit:
+        return {"X-Next-Cursor": encode_cursor(rows[-1].created_at, rows[-1].id)}
+    return {}
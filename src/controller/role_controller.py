@@ -1,19 +1,52 @@
+from sqlalchemy import tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from src.models.user_model import User
 from src.models.role_model import Role
 from src.models.user_role_model import UserRole
-from src.schemas.role_schema import RoleCreate, RoleUpdate, AssignRoleRequest, RemoveRoleRequest
+from src.cache.token_cache import token_cache
+from src.cache.rbac_cache import rbac_cache
+from src.cache.response_cache import response_cache, ROLES, MEMBERSHIPS
+from src.controller.pagination import decode_cursor
+from src.controller.integrity import (
+    raise_integrity_error, raise_membership_error, constraint_name, USER_ROLES_USER_FK
+)
+from src.schemas.role_schema import RoleCreate, RoleUpdate, AssignRoleResult
 from typing import List, Optional
 from uuid import UUID
-from fastapi import HTTPException
+
+# Số user mỗi câu INSERT/SELECT khi gán role hàng loạt (2 tham số/dòng, dưới giới hạn 65535 của Postgres)
+ASSIGN_ROLE_CHUNK_SIZE = 5000
+
+
+def chunked(ids: List[UUID], size: int = ASSIGN_ROLE_CHUNK_SIZE):
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def get_missing_user_ids(db: Session, total_ids: List[UUID]) -> List[UUID]:
+    # Chỉ lấy cột id, không load cả object User
+    unique_ids = list(dict.fromkeys(total_ids))
+    found_ids = set()
+    for chunk in chunked(unique_ids):
+        found_ids.update(user_id for (user_id,) in db.query(User.id).filter(User.id.in_(chunk)))
+    return [user_id for user_id in unique_ids if user_id not in found_ids]
+
 
 def create_role(db: Session, role_in: RoleCreate) -> Role:
     role = Role(
         rolename=role_in.rolename,
     )
     db.add(role)
-    db.commit()
-    db.refresh(role)
+    try:
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        raise_integrity_error(e)
+    # Role mới có thể đang bị cache là "không tồn tại" trong require_roles
+    rbac_cache.invalidate_role_names()
+    response_cache.bump(ROLES)
     return role
 
 
@@ -25,8 +58,12 @@ def get_role_by_name(db: Session, rolename: str) -> Optional[Role]:
     return db.query(Role).filter(Role.rolename == rolename).first()
 
 
-def list_roles(db: Session, skip: int = 0, limit: int = 100) -> List[Role]:
-    return db.query(Role).offset(skip).limit(limit).all()
+def list_roles(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[Role]:
+    query = db.query(Role).order_by(Role.created_at, Role.id)
+    if cursor is not None:
+        created_at, last_id = decode_cursor(cursor)
+        return query.filter(tuple_(Role.created_at, Role.id) > tuple_(created_at, last_id)).limit(limit).all()
+    return query.offset(skip).limit(limit).all()
 
 
 def update_role(db: Session, role: Role, role_in: RoleUpdate) -> Role:
@@ -38,45 +75,76 @@ def update_role(db: Session, role: Role, role_in: RoleUpdate) -> Role:
         
     if updated:
         db.add(role)
-        db.commit()
-        db.refresh(role)
+        try:
+            db.commit()
+        except IntegrityError as e:
+            db.rollback()
+            raise_integrity_error(e)
+        rbac_cache.invalidate_role_names()
+        response_cache.bump(ROLES)
     return role
 
 
 
-def assign_role(db: Session, role: Role, role_id: UUID, total_ids: List[UUID]) -> Role:
-    # Assign roles (avoid duplicates)
-    # client gửi request gán role cho 1 hoặc nhiều user, hàm kiểm tra id của user
-    # Kiểm tra db bảng user_roles trong UserRole lấy giá trị id của user và role đầu tiên nếu tồn tại
-    # Nếu không tồn tại thì tạo mới UserRole và thêm vào db
-    for user_id in total_ids:
-        existing = db.query(UserRole).filter(
-            UserRole.user_id == user_id,
-            UserRole.role_id == role_id
-        ).first()
-        
-        if not existing:
-            user_role = UserRole(user_id=user_id, role_id=role_id)
-        # bỏ db.add() ở đây để db.add() hoạt động trong vòng lặp, ghi id_role cho mỗi id_user không tìm thấy trong bảng trung gian user_roles
-        db.add(user_role)
-    
-    db.commit()
-    db.refresh(role)
-    return role
+def assign_role(db: Session, role: Role, role_id: UUID, total_ids: List[UUID]) -> AssignRoleResult:
+    # Gán role cho nhiều user bằng INSERT ... ON CONFLICT DO NOTHING theo từng lô,
+    # dòng đã tồn tại bị bỏ qua nên số dòng RETURNING chính là số dòng mới
+    unique_ids = list(dict.fromkeys(total_ids))
+    inserted = 0
+    try:
+        for chunk in chunked(unique_ids):
+            stmt = (
+                pg_insert(UserRole)
+                .values([{"user_id": user_id, "role_id": role_id} for user_id in chunk])
+                .on_conflict_do_nothing(index_elements=[UserRole.user_id, UserRole.role_id])
+                .returning(UserRole.user_id)
+            )
+            inserted += len(db.execute(stmt).all())
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        missing_ids = get_missing_user_ids(db, unique_ids) if constraint_name(e) == USER_ROLES_USER_FK else []
+        raise_membership_error(e, missing_ids)
+    response_cache.bump(MEMBERSHIPS)
+    token_cache.invalidate_users(unique_ids)
+    rbac_cache.invalidate_users(unique_ids)
+    return AssignRoleResult(
+        role_id=role_id,
+        requested=len(unique_ids),
+        inserted=inserted,
+        already_present=len(unique_ids) - inserted,
+    )
 
 
 
 def remove_role_from_users(db: Session, role: Role, role_id: UUID, total_ids: List[UUID]) -> Role:
     db.query(UserRole).filter(UserRole.role_id == role_id, UserRole.user_id.in_(total_ids)).delete(synchronize_session=False) 
     db.commit()
-    db.refresh(role)
+    response_cache.bump(MEMBERSHIPS)
+    token_cache.invalidate_users(total_ids)
+    rbac_cache.invalidate_users(total_ids)
     return role
     
 
-def get_users_by_role(db: Session, role:Role) -> List[User]:
-    return role.users
+def get_users_by_role(
+    db: Session, role: Role, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+) -> List[User]:
+    # Join thẳng user_roles thay vì role.users (lazy load toàn bộ quan hệ, không giới hạn)
+    query = (
+        db.query(User)
+        .join(UserRole, UserRole.user_id == User.id)
+        .filter(UserRole.role_id == role.id)
+        .order_by(User.created_at, User.id)
+    )
+    if cursor is not None:
+        created_at, last_id = decode_cursor(cursor)
+        return query.filter(tuple_(User.created_at, User.id) > tuple_(created_at, last_id)).limit(limit).all()
+    return query.offset(skip).limit(limit).all()
 
 
 def delete_role(db: Session, role: Role) -> None:
     db.delete(role)
-    db.commit()
\ No newline at end of file
+    db.commit()
+    response_cache.bump(ROLES, MEMBERSHIPS)
+    token_cache.invalidate_role(role.id)
+    rbac_cache.invalidate_role(role.id)
\ No newline at end of file
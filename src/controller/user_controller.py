@@ -1,35 +1,58 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import tuple_, update, delete, bindparam
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
 from src.models.user_model import User
-from src.schemas.user_schema import UserCreate, UserUpdate
-from typing import List, Optional
+from src.schemas.user_schema import UserCreate, UserUpdate, UserOut, UserExpandedOut, UserPatch, UserBatchResult
+from src.cache.token_cache import token_cache
+from src.cache.rbac_cache import rbac_cache
+from src.cache.response_cache import response_cache, USERS, MEMBERSHIPS
+from api.configs.hashing import hashing_executor
+from src.controller.pagination import decode_cursor
+from src.controller.integrity import raise_integrity_error
+from typing import Dict, List, Optional, Tuple
 from uuid import UUID
-from fastapi import HTTPException
 
 def create_user(db: Session, user_in: UserCreate) -> User:
-
-    existing = db.query(User).filter(
-        (User.username == user_in.username) | (User.email == user_in.email)
-    ).first()
-    
-    if existing:
-        raise HTTPException(status_code=400, detail="username or email already exists")
-
+    # Không kiểm tra trùng trước; unique constraint của DB quyết định và báo lỗi đúng field
     user = User(
         username=user_in.username,
         email=user_in.email,
-        password=user_in.password,  
+        password=hashing_executor.hash(user_in.password),
         phone=user_in.phone,
         date_of_birth=user_in.date_of_birth
     )
 
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    try:
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        raise_integrity_error(e)
+    response_cache.bump(USERS)
     return user
 
 
-def get_user(db: Session, user_id: UUID) -> Optional[User]:
-    return db.query(User).filter(User.id == user_id).first()
+def user_query(db: Session, expand_roles: bool = False):
+    # expand=roles: nạp roles của cả trang bằng 1 câu SELECT ... IN thay vì lazy load từng user
+    query = db.query(User)
+    if expand_roles:
+        query = query.options(selectinload(User.roles))
+    return query
+
+
+def expanded_user(user: User, expand_roles: bool = False) -> UserOut:
+    # Không expand thì dựng UserOut: không chạm tới user.roles (lazy load) và response không có khóa "roles"
+    if not expand_roles:
+        return UserOut.model_validate(user, from_attributes=True)
+    return UserExpandedOut.model_validate(user, from_attributes=True)
+
+
+def user_out_model(expand_roles: bool = False):
+    return UserExpandedOut if expand_roles else UserOut
+
+
+def get_user(db: Session, user_id: UUID, expand_roles: bool = False) -> Optional[User]:
+    return user_query(db, expand_roles).filter(User.id == user_id).first()
 
 
 def get_user_by_name(db: Session, username: str) -> Optional[User]:
@@ -37,8 +60,15 @@ def get_user_by_name(db: Session, username: str) -> Optional[User]:
 
 
 
-def list_users(db: Session, skip: int = 0, limit: int = 100) -> List[User]:
-    return db.query(User).offset(skip).limit(limit).all()
+def list_users(
+    db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, expand_roles: bool = False
+) -> List[User]:
+    # Sắp xếp ổn định theo (created_at, id); có cursor thì dùng keyset thay cho OFFSET
+    query = user_query(db, expand_roles).order_by(User.created_at, User.id)
+    if cursor is not None:
+        created_at, last_id = decode_cursor(cursor)
+        return query.filter(tuple_(User.created_at, User.id) > tuple_(created_at, last_id)).limit(limit).all()
+    return query.offset(skip).limit(limit).all()
 
 
 def update_user(db: Session, user: User, user_in: UserUpdate) -> User:
@@ -51,7 +81,7 @@ def update_user(db: Session, user: User, user_in: UserUpdate) -> User:
         user.email = user_in.email
         updated = True
     if user_in.password is not None:
-        user.password = user_in.password
+        user.password = hashing_executor.hash(user_in.password)
         updated = True
     if user_in.phone is not None:  
         user.phone = user_in.phone
@@ -62,12 +92,94 @@ def update_user(db: Session, user: User, user_in: UserUpdate) -> User:
         
     if updated:
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        try:
+            db.commit()
+        except IntegrityError as e:
+            db.rollback()
+            raise_integrity_error(e)
+        token_cache.invalidate_user(user.id)
+        response_cache.bump(USERS)
     return user
 
 
 def delete_user(db: Session, user: User) -> None:
     db.delete(user)
     db.commit()
+    response_cache.bump(USERS, MEMBERSHIPS)
+    token_cache.invalidate_user(user.id)
+    rbac_cache.invalidate_user(user.id)
+
+
+def get_users(db: Session, user_ids: List[UUID]) -> Dict[UUID, User]:
+    return {user.id: user for user in db.query(User).filter(User.id.in_(user_ids))}
+
+
+def batch_results(user_ids: List[UUID], users: Dict[UUID, User]) -> List[UserBatchResult]:
+    # Giữ thứ tự gửi lên, id trùng chỉ trả 1 kết quả (giống batch_update/batch_delete)
+    return [
+        UserBatchResult(user_id=user_id, status="ok", user=UserOut.model_validate(users[user_id], from_attributes=True))
+        if user_id in users else UserBatchResult(user_id=user_id, status="not_found")
+        for user_id in dict.fromkeys(user_ids)
+    ]
+
+
+def group_patches(patches: List[UserPatch], hashed: List[str]) -> Dict[Tuple[str, ...], List[dict]]:
+    # Cùng giữ nguyên ngữ nghĩa update_user: field None thì bỏ qua; gom theo tập field
+    # để mỗi nhóm là 1 câu UPDATE executemany
+    hashed_iter = iter(hashed)
+    groups: Dict[Tuple[str, ...], List[dict]] = {}
+    for patch in patches:
+        values = patch.model_dump(exclude_none=True, exclude={"user_id"})
+        if "password" in values:
+            values["password"] = next(hashed_iter)
+        if values:
+            row = {f"b_{field}": value for field, value in values.items()}
+            groups.setdefault(tuple(sorted(values)), []).append({"b_id": patch.user_id, **row})
+    return groups
+
+
+def update_statement(fields: Tuple[str, ...]):
+    # updated_at được cập nhật qua onupdate=NOW() của cột
+    return (
+        update(User.__table__)
+        .where(User.__table__.c.id == bindparam("b_id"))
+        .values({field: bindparam(f"b_{field}") for field in fields})
+    )
+
+
+def update_users(db: Session, patches: List[UserPatch]) -> List[UserBatchResult]:
+    # Patch sau cùng thắng nếu 1 user xuất hiện nhiều lần
+    patches = list({patch.user_id: patch for patch in patches}.values())
+    user_ids = [patch.user_id for patch in patches]
+    found_ids = {user_id for (user_id,) in db.query(User.id).filter(User.id.in_(user_ids))}
+    patches = [patch for patch in patches if patch.user_id in found_ids]
+
+    hashed = hashing_executor.hash_many([p.password for p in patches if p.password is not None])
+    try:
+        for fields, rows in group_patches(patches, hashed).items():
+            db.execute(update_statement(fields), rows)
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        raise_integrity_error(e)
+
+    token_cache.invalidate_users(found_ids)
+    response_cache.bump(USERS)
+    db.expire_all()
+    return batch_results(user_ids, get_users(db, list(found_ids)))
+
+
+def delete_users(db: Session, user_ids: List[UUID]) -> List[UserBatchResult]:
+    deleted = set(db.execute(
+        delete(User).where(User.id.in_(user_ids)).returning(User.id),
+        execution_options={"synchronize_session": False},
+    ).scalars())
+    db.commit()
+    response_cache.bump(USERS, MEMBERSHIPS)
+    token_cache.invalidate_users(deleted)
+    rbac_cache.invalidate_users(deleted)
+    return [
+        UserBatchResult(user_id=user_id, status="ok" if user_id in deleted else "not_found")
+        for user_id in dict.fromkeys(user_ids)
+    ]
      
\ No newline at end of file
@@ -0,0 +1,192 @@
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+from api.configs.db import SessionLocal
+from api.configs.hashing import hashing_executor
+from src.schemas.user_schema import UserCreate, UserImportError, UserImportResult
+from src.cache.response_cache import response_cache, USERS
+from collections import deque
+from typing import AsyncIterator, Deque, Dict, List, Tuple
+from uuid import uuid4
+import csv
+import io
+import json
+import os
+
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+# Giới hạn số lỗi trả về trong response, số dòng lỗi vẫn được đếm đủ
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", "1000"))
+
+STAGING_COLUMNS = ("row_no", "id", "username", "email", "password", "phone", "date_of_birth")
+
+
+async def iter_lines(stream: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    # Đọc body theo từng chunk, không giữ cả file trong bộ nhớ
+    buffer = b""
+    async for chunk in stream:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8").rstrip("\r")
+    if buffer:
+        yield buffer.decode("utf-8").rstrip("\r")
+
+
+class LineFeed:
+    # Nguồn dòng cho 1 csv.reader duy nhất trên cả body. Dòng từ stream async được giữ lại cho tới
+    # khi đủ 1 bản ghi (số dấu " chẵn), nên field trong ngoặc kép có xuống dòng không bị cắt đôi
+    def __init__(self) -> None:
+        self.lines: Deque[str] = deque()
+        self.quotes = 0
+
+    def push(self, line: str) -> bool:
+        self.lines.append(line + "\n")
+        self.quotes += line.count('"')
+        return self.quotes % 2 == 0
+
+    def clear(self) -> None:
+        self.lines.clear()
+        self.quotes = 0
+
+    def __iter__(self) -> "LineFeed":
+        return self
+
+    def __next__(self) -> str:
+        if not self.lines:
+            raise StopIteration
+        line = self.lines.popleft()
+        if not self.lines:
+            self.quotes = 0
+        return line
+
+
+async def iter_csv_rows(stream: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, object]]:
+    feed = LineFeed()
+    reader = csv.reader(feed)
+    header = None
+    row_no = 0
+    async for line in iter_lines(stream):
+        if not feed.lines and not line.strip():
+            continue
+        if not feed.push(line):
+            continue
+        try:
+            values = next(reader)
+        except csv.Error as e:
+            feed.clear()
+            row_no += 1
+            yield row_no, f"Malformed row: {e}"
+            continue
+        if header is None:
+            header = values
+            continue
+        row_no += 1
+        if len(values) != len(header):
+            yield row_no, f"Malformed row: expected {len(header)} fields, got {len(values)}"
+        else:
+            yield row_no, {key: value or None for key, value in zip(header, values)}
+    if feed.lines:
+        yield row_no + 1, "Malformed row: unterminated quoted field"
+
+
+async def iter_rows(stream: AsyncIterator[bytes], content_type: str) -> AsyncIterator[Tuple[int, object]]:
+    # Trả về (số dòng, dict) hoặc (số dòng, chuỗi lỗi) nếu dòng không parse được
+    if "csv" in content_type:
+        async for row in iter_csv_rows(stream):
+            yield row
+        return
+    row_no = 0
+    async for line in iter_lines(stream):
+        if not line.strip():
+            continue
+        row_no += 1
+        try:
+            yield row_no, json.loads(line)
+        except ValueError as e:
+            yield row_no, f"Malformed row: {e}"
+
+
+def validate_batch(rows: List[Tuple[int, object]]) -> Tuple[List[Tuple[int, UserCreate]], List[UserImportError]]:
+    valid, errors = [], []
+    for row_no, data in rows:
+        if isinstance(data, str):
+            errors.append(UserImportError(row=row_no, error=data))
+            continue
+        try:
+            valid.append((row_no, UserCreate.model_validate(data)))
+        except ValidationError as e:
+            errors.append(UserImportError(row=row_no, error="; ".join(
+                f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()
+            )))
+    return valid, errors
+
+
+def copy_batch(users: List[Tuple[int, UserCreate]], hashed_passwords: List[str]) -> List[int]:
+    # COPY vào bảng tạm rồi merge 1 lần; dòng trùng username/email/phone bị ON CONFLICT bỏ qua
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    ids: Dict[str, int] = {}
+    for (row_no, user_in), hashed in zip(users, hashed_passwords):
+        user_id = str(uuid4())
+        ids[user_id] = row_no
+        writer.writerow((
+            row_no, user_id, user_in.username, user_in.email, hashed,
+            user_in.phone or "", user_in.date_of_birth.isoformat() if user_in.date_of_birth else "",
+        ))
+    buffer.seek(0)
+
+    with SessionLocal() as db:
+        cursor = db.connection().connection.cursor()
+        cursor.execute(
+            "CREATE TEMP TABLE users_import_staging ("
+            "row_no integer, id uuid, username varchar(255), email varchar(255), "
+            "password varchar(255), phone varchar(10), date_of_birth date"
+            ") ON COMMIT DROP"
+        )
+        cursor.copy_expert(
+            f"COPY users_import_staging ({', '.join(STAGING_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+        cursor.execute(
+            "INSERT INTO users (id, username, email, password, phone, date_of_birth, is_active) "
+            "SELECT id, username, email, password, phone, date_of_birth, true "
+            "FROM users_import_staging ORDER BY row_no "
+            "ON CONFLICT DO NOTHING RETURNING id"
+        )
+        inserted = {str(user_id) for (user_id,) in cursor.fetchall()}
+        db.commit()
+    response_cache.bump(USERS)
+
+    return [row_no for user_id, row_no in ids.items() if user_id not in inserted]
+
+
+async def import_users(stream: AsyncIterator[bytes], content_type: str) -> UserImportResult:
+    total = inserted = failed = 0
+    errors: List[UserImportError] = []
+
+    def record(new_errors: List[UserImportError]) -> None:
+        nonlocal failed
+        failed += len(new_errors)
+        errors.extend(new_errors[:max(IMPORT_MAX_ERRORS - len(errors), 0)])
+
+    async def flush(batch: List[Tuple[int, object]]) -> None:
+        nonlocal inserted
+        valid, batch_errors = validate_batch(batch)
+        record(batch_errors)
+        if not valid:
+            return
+        hashed = await run_in_threadpool(hashing_executor.hash_many, [u.password for _, u in valid])
+        duplicates = await run_in_threadpool(copy_batch, valid, hashed)
+        inserted += len(valid) - len(duplicates)
+        record([UserImportError(row=row_no, error="username, email or phone already exists") for row_no in duplicates])
+
+    batch: List[Tuple[int, object]] = []
+    async for row in iter_rows(stream, content_type):
+        total += 1
+        batch.append(row)
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            await flush(batch)
+            batch = []
+    if batch:
+        await flush(batch)
+
+    return UserImportResult(total=total, inserted=inserted, failed=failed, errors=errors)
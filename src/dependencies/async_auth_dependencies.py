@@ -0,0 +1,79 @@
+from fastapi import Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from api.configs.replicas import get_async_read_db
+from api.configs.auth import verify_token, revocation_key, token_digest
+from src.models.user_model import User
+from src.models.user_role_model import UserRole
+from src.models.role_model import Role
+from src.controller.async_auth_controller import is_token_blacklisted
+from src.cache.token_cache import token_cache, UserSnapshot
+from src.cache.rbac_cache import rbac_cache, required_mask
+from src.dependencies.auth_dependencies import (
+    AuthContext, oauth2_scheme, credentials_exception, validate_payload, ensure_not_revoked, ensure_active,
+    ensure_roles
+)
+
+
+async def get_auth_context(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_read_db)
+) -> AuthContext:
+    digest = token_digest(token)
+    cached = token_cache.get(digest)
+    if cached is not None:
+        payload, principal = cached
+        ensure_not_revoked(await is_token_blacklisted(db, revocation_key(token, payload)))
+        return AuthContext(token, digest, payload, ensure_active(principal))
+
+    payload = verify_token(token)
+    user_id = validate_payload(payload)
+    ensure_not_revoked(await is_token_blacklisted(db, revocation_key(token, payload)))
+
+    result = await db.execute(select(User).filter(User.id == user_id))
+    user = result.scalars().first()
+    if user is None:
+        raise credentials_exception
+
+    result = await db.execute(select(UserRole.role_id).filter(UserRole.user_id == user.id))
+    principal = UserSnapshot(
+        id=user.id,
+        username=user.username,
+        is_active=user.is_active,
+        role_ids=frozenset(result.scalars().all()),
+    )
+    token_cache.put(digest, payload, principal)
+    return AuthContext(token, digest, payload, ensure_active(principal))
+
+
+async def get_current_principal(context: AuthContext = Depends(get_auth_context)) -> UserSnapshot:
+    return context.principal
+
+
+def require_roles(*rolenames: str, require_all: bool = False):
+    if not rolenames:
+        raise ValueError("require_roles needs at least one role name")
+
+    async def dependency(
+        context: AuthContext = Depends(get_auth_context),
+        db: AsyncSession = Depends(get_async_read_db)
+    ) -> UserSnapshot:
+        mask, missing = rbac_cache.role_mask(rolenames)
+        if missing and rbac_cache.roles_stale():
+            result = await db.execute(select(Role.id, Role.rolename))
+            rbac_cache.load_roles(result.all())
+            mask, missing = rbac_cache.role_mask(rolenames)
+        return ensure_roles(context.principal, required_mask(mask, missing, require_all), require_all)
+
+    return dependency
+
+
+async def get_current_user(
+    principal: UserSnapshot = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_read_db)
+) -> User:
+    result = await db.execute(select(User).filter(User.id == principal.id))
+    user = result.scalars().first()
+    if user is None:
+        raise credentials_exception
+    return user
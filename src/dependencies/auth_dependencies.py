@@ -1,69 +1,150 @@
+from dataclasses import dataclass
 from fastapi import Depends, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials, OAuth2PasswordBearer
+from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from api.configs.db import get_db
-from api.configs.auth import verify_token
+from api.configs.replicas import get_read_db
+from api.configs.auth import verify_token, revocation_key, token_digest
 from src.models.user_model import User
+from src.models.user_role_model import UserRole
+from src.models.role_model import Role
 from src.controller.auth_controller import is_token_blacklisted
+from src.cache.token_cache import token_cache, UserSnapshot
+from src.cache.rbac_cache import rbac_cache, has_roles, required_mask
+from typing import Optional
 from uuid import UUID
 
 
+# Scheme duy nhất đọc header Authorization; mọi dependency xác thực đều đi qua get_auth_context
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
-bearer_scheme = HTTPBearer(auto_error=True)
 
 
-def get_token(credentials: HTTPAuthorizationCredentials = Depends(HTTPBearer())):
-    return credentials.credentials
+@dataclass(frozen=True)
+class AuthContext:
+    token: str
+    digest: str
+    payload: dict
+    principal: UserSnapshot
 
 
-def get_payload(token: str = Depends(get_token)):
-    return verify_token(token)
+credentials_exception = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Could not validate credentials",
+    headers={"WWW-Authenticate": "Bearer"},
+)
 
 
-def get_current_user(
-    token: str = Depends(get_token),
-    payload: dict = Depends(get_payload),
-    pass_flow: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
-    
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-        
-    if is_token_blacklisted(db, token):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token has been revoked",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
+def validate_payload(payload: dict) -> UUID:
     if payload is None:
         raise credentials_exception
-    
+
     username: str = payload.get("sub")
     user_id: str = payload.get("user_id")
     token_type: str = payload.get("type")
-    
+
     if username is None or user_id is None:
         raise credentials_exception
-    
+
     if token_type != "access":
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token type",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
-    user = db.query(User).filter(User.id == UUID(user_id)).first()
-    if user is None:
-        raise credentials_exception
-    
-    if not user.is_active:
+    return UUID(user_id)
+
+
+def ensure_not_revoked(revoked: bool) -> None:
+    if revoked:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+def ensure_active(principal: UserSnapshot) -> UserSnapshot:
+    if not principal.is_active:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Inactive user"
-        )   
+        )
+    return principal
+
+
+def get_auth_context(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_read_db)
+) -> AuthContext:
+    # Header chỉ parse 1 lần, JWT verify nhiều nhất 1 lần; FastAPI cache kết quả trong cùng request
+    # Cache hit: không decode JWT, không query user; chỉ còn kiểm tra thu hồi (đã có cache riêng)
+    digest = token_digest(token)
+    cached = token_cache.get(digest)
+    if cached is not None:
+        payload, principal = cached
+        ensure_not_revoked(is_token_blacklisted(db, revocation_key(token, payload)))
+        return AuthContext(token, digest, payload, ensure_active(principal))
+
+    payload = verify_token(token)
+    user_id = validate_payload(payload)
+    ensure_not_revoked(is_token_blacklisted(db, revocation_key(token, payload)))
+
+    user = db.query(User).filter(User.id == user_id).first()
+    if user is None:
+        raise credentials_exception
+
+    role_ids = db.query(UserRole.role_id).filter(UserRole.user_id == user.id).all()
+    principal = UserSnapshot(
+        id=user.id,
+        username=user.username,
+        is_active=user.is_active,
+        role_ids=frozenset(role_id for (role_id,) in role_ids),
+    )
+    token_cache.put(digest, payload, principal)
+    return AuthContext(token, digest, payload, ensure_active(principal))
+
+
+def get_current_principal(context: AuthContext = Depends(get_auth_context)) -> UserSnapshot:
+    return context.principal
+
+
+def ensure_roles(principal: UserSnapshot, required_mask: Optional[int], require_all: bool) -> UserSnapshot:
+    # Bitset của user lấy từ role_ids trong principal (đã nạp cùng token), không query thêm
+    user_mask = rbac_cache.get_user_mask(principal.id)
+    if user_mask is None:
+        user_mask = rbac_cache.put_user_roles(principal.id, principal.role_ids)
+    if required_mask is None or not has_roles(user_mask, required_mask, require_all):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    return principal
+
+
+def require_roles(*rolenames: str, require_all: bool = False):
+    # Dùng: Depends(require_roles("admin")) hoặc require_roles("a", "b", require_all=True)
+    if not rolenames:
+        raise ValueError("require_roles needs at least one role name")
+
+    def dependency(
+        context: AuthContext = Depends(get_auth_context),
+        db: Session = Depends(get_read_db)
+    ) -> UserSnapshot:
+        mask, missing = rbac_cache.role_mask(rolenames)
+        if missing and rbac_cache.roles_stale():
+            # Có tên role chưa biết (lần đầu, role mới tạo/đổi tên) -> nạp lại bảng roles, tối đa 1 lần mỗi ttl
+            rbac_cache.load_roles(db.query(Role.id, Role.rolename).all())
+            mask, missing = rbac_cache.role_mask(rolenames)
+        return ensure_roles(context.principal, required_mask(mask, missing, require_all), require_all)
+
+    return dependency
+
+
+def get_current_user(
+    principal: UserSnapshot = Depends(get_current_principal),
+    db: Session = Depends(get_read_db)
+) -> User:
+    # Chỉ dùng khi endpoint cần đủ thông tin user (vd. /auth/me)
+    user = db.query(User).filter(User.id == principal.id).first()
+    if user is None:
+        raise credentials_exception
     return user
@@ -5,6 +5,7 @@ from uuid import uuid4
 
 class TokenBlacklist(Base):
     __tablename__ = "blacklist_token"
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(
         PostgresUUID(as_uuid=True), 
@@ -12,12 +13,14 @@ class TokenBlacklist(Base):
         default=uuid4
     )
     
-    token = Column(String, unique=True, nullable=False)
+    # sha256 hex của jti (hoặc của cả token nếu không có jti), cố định 64 ký tự
+    token_hash = Column(String(64), unique=True, nullable=False)
     
     blacklisted_at = Column(
         DateTime(timezone=True), 
         server_default=text("NOW()"), 
-        nullable=False
+        nullable=False,
+        index=True
     )
     
-    expires_at = Column(DateTime(timezone=True), nullable=False)
\ No newline at end of file
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
\ No newline at end of file
@@ -1,5 +1,5 @@
 from api.configs.db import Base
-from sqlalchemy import Column, String, DateTime, text
+from sqlalchemy import Column, String, DateTime, text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID as PostgresUUID
 
@@ -7,6 +7,10 @@ from uuid import uuid4
 
 class Role(Base):
     __tablename__ = "roles"
+    # Khóa phân trang keyset (created_at, id)
+    __table_args__ = (Index("ix_roles_created_at_id", "created_at", "id"),)
+    # Lấy created_at/updated_at bằng INSERT/UPDATE ... RETURNING thay vì refresh()
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(
         PostgresUUID(as_uuid=True), 
@@ -1,10 +1,13 @@
 from api.configs.db import Base
-from sqlalchemy import Column, ForeignKey, DateTime, text
+from sqlalchemy import Column, ForeignKey, DateTime, text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID as PostgresUUID
 
 class UserRole(Base):
     __tablename__ = "user_roles"
+    # PK là (user_id, role_id); lọc theo role_id cần index đảo chiều
+    __table_args__ = (Index("ix_user_roles_role_id_user_id", "role_id", "user_id"),)
+    __mapper_args__ = {"eager_defaults": True}
 
     user_id = Column(
         PostgresUUID(as_uuid=True), 
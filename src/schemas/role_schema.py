@@ -21,5 +21,11 @@ class RoleOut(BaseModel): #lấy role
 class AssignRoleRequest(BaseModel):
     total_ids: List[UUID] = Field(..., min_items=1)
 
+class AssignRoleResult(BaseModel):
+    role_id: UUID
+    requested: int
+    inserted: int
+    already_present: int
+
 class RemoveRoleRequest(BaseModel):
     total_ids: List[UUID] = Field(..., min_items=1)
\ No newline at end of file
@@ -1,8 +1,9 @@
 from pydantic import BaseModel, EmailStr
 from uuid import UUID
 from datetime import datetime, date
-from typing import Optional, List
+from typing import Literal, Optional, List
 from pydantic import Field
+from src.schemas.role_schema import RoleOut
 
 class UserCreate(BaseModel):
     username: str = Field(..., min_length=3, max_length=64)
@@ -30,6 +31,28 @@ class UserOut(BaseModel): #lấyuser
     created_at: datetime
     updated_at: datetime
 
+
+class UserExpandedOut(UserOut):
+    # Chỉ có giá trị khi gọi với expand=roles
+    roles: Optional[List[RoleOut]] = None
+
+class UserBatchRequest(BaseModel):
+    user_ids: List[UUID] = Field(..., min_length=1, max_length=1000)
+
+
+class UserPatch(UserUpdate):
+    user_id: UUID
+
+
+class UserBatchUpdateRequest(BaseModel):
+    items: List[UserPatch] = Field(..., min_length=1, max_length=1000)
+
+
+class UserBatchResult(BaseModel):
+    user_id: UUID
+    status: Literal["ok", "not_found"]
+    user: Optional[UserOut] = None
+
 class RegisterRequest(BaseModel):
     email: EmailStr
     password: str = Field(..., min_length=6)
@@ -44,4 +67,16 @@ class LogOutRequest(BaseModel):
 
 
 class Config:
-    from_attributes = True
\ No newline at end of file
+    from_attributes = True
+
+
+class UserImportError(BaseModel):
+    row: int
+    error: str
+
+
+class UserImportResult(BaseModel):
+    total: int
+    inserted: int
+    failed: int
+    errors: List[UserImportError]
@@ -0,0 +1,16 @@
+from api.configs.replicas import replica_set, REPLICA_CHECK_INTERVAL_SECONDS
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+async def run_replica_monitor(interval: float = REPLICA_CHECK_INTERVAL_SECONDS) -> None:
+    # Đo độ trễ từng replica định kỳ, replica trễ/lỗi bị loại khỏi vòng đọc cho tới khi bắt kịp.
+    # Lần đo đầu tiên đã chạy trong lifespan
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(replica_set.check)
+        except Exception:
+            logger.exception("Replica lag check failed")
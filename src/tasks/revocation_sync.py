@@ -0,0 +1,25 @@
+from api.configs.db import SessionLocal
+from api.configs.cache import REVOCATION_SYNC_INTERVAL_SECONDS
+from src.cache.revocation_cache import revocation_cache
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def sync_revocation_cache() -> int:
+    with SessionLocal() as db:
+        return revocation_cache.sync(db)
+
+
+async def run_revocation_sync(interval: float = REVOCATION_SYNC_INTERVAL_SECONDS) -> None:
+    # Backend memory không chia sẻ giữa worker: nạp định kỳ token do worker khác thu hồi.
+    # Lỗi liên tục quá REVOCATION_MAX_STALENESS_SECONDS thì is_revoked tự chuyển sang hỏi database
+    while True:
+        await asyncio.sleep(interval)
+        if revocation_cache.shared and revocation_cache.ready:
+            continue
+        try:
+            await asyncio.to_thread(sync_revocation_cache)
+        except Exception:
+            logger.warning("Revocation cache sync failed", exc_info=True)
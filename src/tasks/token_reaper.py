@@ -0,0 +1,92 @@
+from sqlalchemy import text
+from api.configs.db import engine, SessionLocal
+from api.configs.cache import REAPER_INTERVAL_SECONDS, REAPER_BATCH_SIZE
+from src.controller.auth_controller import cleanup_expired_tokens
+from src.cache.revocation_cache import revocation_cache
+from threading import Lock
+from typing import Dict, Optional
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Khóa advisory chung cho mọi worker: mỗi lượt chỉ 1 worker chạy DELETE
+REAPER_LOCK_ID = 7_250_001
+
+
+class ReaperStats:
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self.runs = 0
+        self.skipped = 0
+        self.failures = 0
+        self.rows_reaped_total = 0
+        self.last_rows_reaped = 0
+        self.last_duration_seconds = 0.0
+        self.last_run_at: Optional[float] = None
+
+    def observe_run(self, rows: int, duration: float) -> None:
+        with self._lock:
+            self.runs += 1
+            self.rows_reaped_total += rows
+            self.last_rows_reaped = rows
+            self.last_duration_seconds = duration
+            self.last_run_at = time.time()
+
+    def observe_skip(self) -> None:
+        with self._lock:
+            self.skipped += 1
+
+    def observe_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "runs": self.runs,
+                "skipped": self.skipped,
+                "failures": self.failures,
+                "rows_reaped_total": self.rows_reaped_total,
+                "last_rows_reaped": self.last_rows_reaped,
+                "last_duration_seconds": self.last_duration_seconds,
+                "last_run_at": self.last_run_at,
+            }
+
+
+reaper_stats = ReaperStats()
+
+
+def reap_expired_tokens(batch_size: int = REAPER_BATCH_SIZE) -> Optional[int]:
+    # Lock cấp session giữ trên 1 connection riêng (AUTOCOMMIT, không mở transaction dài);
+    # worker không lấy được lock chỉ dọn cache của chính nó. Trả None khi bỏ qua lượt này
+    start = time.perf_counter()
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as lock_conn:
+        if not lock_conn.execute(text("SELECT pg_try_advisory_lock(:id)"), {"id": REAPER_LOCK_ID}).scalar():
+            revocation_cache.prune()
+            reaper_stats.observe_skip()
+            return None
+        try:
+            with SessionLocal() as db:
+                rows = cleanup_expired_tokens(db, batch_size=batch_size)
+        finally:
+            lock_conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": REAPER_LOCK_ID})
+    reaper_stats.observe_run(rows, time.perf_counter() - start)
+    return rows
+
+
+async def run_token_reaper(
+    interval: float = REAPER_INTERVAL_SECONDS,
+    batch_size: int = REAPER_BATCH_SIZE,
+) -> None:
+    # Chạy trong lifespan của app; DELETE chạy trong thread riêng để không block event loop
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            rows = await asyncio.to_thread(reap_expired_tokens, batch_size)
+            if rows:
+                logger.info("Reaped %d expired blacklisted tokens", rows)
+        except Exception:
+            reaper_stats.observe_failure()
+            logger.exception("Expired token reaper run failed")
@@ -0,0 +1,72 @@
+from sqlalchemy import text
+from api.configs.db import (
+    engine, async_engine, SessionLocal, DB_POOL_WARM, DB_WARM_TIMEOUT
+)
+from src.cache.revocation_cache import revocation_cache
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def warm_pool(connections: int = DB_POOL_WARM) -> int:
+    # Mở đồng thời nhiều connection rồi trả về pool, request đầu tiên không phải chờ connect
+    opened = []
+    try:
+        for _ in range(connections):
+            conn = engine.connect()
+            opened.append(conn)
+            conn.execute(text("SELECT 1"))
+    finally:
+        for conn in opened:
+            conn.close()
+    return len(opened)
+
+
+async def warm_async_pool(connections: int = DB_POOL_WARM) -> int:
+    if async_engine is None:
+        return 0
+    opened = []
+    try:
+        for _ in range(connections):
+            conn = await async_engine.connect()
+            opened.append(conn)
+            await conn.execute(text("SELECT 1"))
+    finally:
+        for conn in opened:
+            await conn.close()
+    return len(opened)
+
+
+def warm_revocation_cache() -> bool:
+    # Lỗi thì cache giữ trạng thái chưa ready -> is_revoked trả None và hỏi database
+    try:
+        with SessionLocal() as db:
+            revocation_cache.warm(db)
+        return True
+    except Exception:
+        logger.warning("Revocation cache warm-up failed, falling back to database lookups", exc_info=True)
+        return False
+
+
+def warm_sync() -> None:
+    # Chế độ async: pool sync chỉ dùng cho vài tác vụ nền, không cần mở sẵn
+    if async_engine is None:
+        warm_pool()
+    warm_revocation_cache()
+
+
+async def warm_up(timeout: float = DB_WARM_TIMEOUT) -> bool:
+    # Không bao giờ làm lifespan thất bại: DB chưa sẵn sàng thì worker vẫn lên,
+    # pool tự connect khi có request, cache được token reaper nạp lại sau
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(asyncio.to_thread(warm_sync), warm_async_pool()), timeout
+        )
+    except Exception:
+        logger.warning("Startup warm-up incomplete after %.0f ms", (time.perf_counter() - start) * 1000, exc_info=True)
+        return False
+    logger.info("Startup warm-up finished in %.0f ms", (time.perf_counter() - start) * 1000)
+    return True
@@ -0,0 +1,90 @@
+from sqlalchemy import text
+from uuid import uuid4
+import os
+import pytest
+
+# Hash rẻ, 1 process: test không cần Argon2 thật và không chờ auto-tune
+os.environ.setdefault("HASH_AUTOTUNE", "false")
+os.environ.setdefault("HASH_TIME_COST", "1")
+os.environ.setdefault("HASH_MEMORY_COST", "8192")
+os.environ.setdefault("HASH_WORKERS", "1")
+
+
+@pytest.fixture(scope="session")
+def database():
+    # Test cần Postgres theo cấu hình POSTGRES_* như app; không có thì bỏ qua thay vì báo lỗi
+    from api.configs.db import engine
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except Exception as e:
+        pytest.skip(f"Postgres is not available: {e}")
+    from migrate import migrate
+    migrate()
+    return engine
+
+
+@pytest.fixture
+def db(database):
+    from api.configs.db import SessionLocal
+    with SessionLocal() as session:
+        yield session
+
+
+@pytest.fixture
+def make_user(db):
+    # Tạo user/role với tên ngẫu nhiên, xóa hết sau test (user_roles xóa theo ON DELETE CASCADE)
+    from src.models.user_model import User
+    created = []
+
+    def factory(**fields):
+        name = f"test_{uuid4().hex[:12]}"
+        user = User(username=name, email=f"{name}@example.com", password="x", **fields)
+        db.add(user)
+        db.commit()
+        created.append(user.id)
+        return user
+
+    yield factory
+    db.rollback()
+    db.query(User).filter(User.id.in_(created)).delete(synchronize_session=False)
+    db.commit()
+
+
+@pytest.fixture
+def make_role(db):
+    from src.models.role_model import Role
+    created = []
+
+    def factory():
+        role = Role(rolename=f"test_{uuid4().hex[:12]}")
+        db.add(role)
+        db.commit()
+        created.append(role.id)
+        return role
+
+    yield factory
+    db.rollback()
+    db.query(Role).filter(Role.id.in_(created)).delete(synchronize_session=False)
+    db.commit()
+
+
+@pytest.fixture(scope="session")
+def client(database):
+    # Không chạy lifespan: không warm-up, không task nền; hash pool tự khởi động ở lần hash đầu
+    from anyio.from_thread import start_blocking_portal
+    from fastapi.testclient import TestClient
+    from api.configs.db import async_engine
+    from api.configs.hashing import hashing_executor
+    from main import app
+    client = TestClient(app)
+    if async_engine is None:
+        yield client
+    else:
+        # DB_MODE=async: connection asyncpg gắn với event loop tạo ra nó, nên mọi request
+        # dùng chung 1 loop cho cả session thay vì mỗi request 1 loop mới
+        with start_blocking_portal() as portal:
+            client.portal = portal
+            yield client
+            portal.call(async_engine.dispose)
+    hashing_executor.shutdown()
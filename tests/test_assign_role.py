@@ -0,0 +1,40 @@
+from uuid import uuid4
+
+from fastapi import HTTPException
+import pytest
+
+from src.controller.role_controller import assign_role
+
+
+def test_assign_role_reports_users_deleted_after_the_precheck(db, make_user, make_role):
+    role = make_role()
+    kept = make_user()
+    # Không qua get_missing_user_ids: giả lập user bị xóa ngay trước INSERT
+    vanished = uuid4()
+
+    with pytest.raises(HTTPException) as excinfo:
+        assign_role(db, role, role.id, [kept.id, vanished])
+
+    assert excinfo.value.status_code == 404
+    assert str(vanished) in excinfo.value.detail
+    assert str(kept.id) not in excinfo.value.detail
+
+
+def test_assign_role_reports_role_deleted_after_the_precheck(db, make_user, make_role):
+    user = make_user()
+
+    with pytest.raises(HTTPException) as excinfo:
+        assign_role(db, make_role(), uuid4(), [user.id])
+
+    assert excinfo.value.status_code == 404
+    assert excinfo.value.detail == "Role not found"
+
+
+def test_assign_role_counts_new_and_existing_memberships(db, make_user, make_role):
+    role = make_role()
+    first, second = make_user(), make_user()
+
+    assert assign_role(db, role, role.id, [first.id]).inserted == 1
+    result = assign_role(db, role, role.id, [first.id, second.id, second.id])
+
+    assert (result.requested, result.inserted, result.already_present) == (2, 1, 1)
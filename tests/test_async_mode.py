@@ -0,0 +1,20 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from api.configs.db import DB_MODE
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.mark.skipif(DB_MODE == "async", reason="already running with DB_MODE=async")
+def test_suite_passes_in_async_mode(database):
+    # Router/controller async là bản song song của bản sync; DB_MODE đọc lúc import nên chạy
+    # lại cả bộ test trong 1 process riêng với DB_MODE=async để 2 bản không lệch nhau
+    result = subprocess.run(
+        [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", "tests"],
+        cwd=ROOT, env={**os.environ, "DB_MODE": "async"}, capture_output=True, text=True, timeout=600,
+    )
+    assert result.returncode == 0, result.stdout[-5000:] + result.stderr[-2000:]
@@ -0,0 +1,73 @@
+from uuid import uuid4
+
+from src.models.role_model import Role
+from src.models.user_model import User
+
+# Luồng chính của API qua HTTP; chạy ở cả DB_MODE=sync và async (xem test_async_mode.py)
+
+
+def cleanup(db, name: str) -> None:
+    db.rollback()
+    db.query(User).filter(User.username == name).delete()
+    db.query(Role).filter(Role.rolename == name).delete()
+    db.commit()
+
+
+def test_user_role_flow(client, db):
+    name = f"test_{uuid4().hex[:12]}"
+    try:
+        created = client.post(
+            "/api/users/create", json={"username": name, "email": f"{name}@example.com", "password": "secret1"}
+        )
+        assert created.status_code == 201, created.text
+        user_id = created.json()["id"]
+        fetched = client.get("/api/users/get", params={"user_id": user_id})
+        assert fetched.status_code == 200, fetched.text
+        assert fetched.json()["username"] == name
+        assert "roles" not in fetched.json()
+        assert client.get("/api/users/get", params={"user_id": str(uuid4())}).status_code == 404
+
+        role = client.post("/api/roles/create", json={"rolename": name})
+        assert role.status_code == 201, role.text
+        role_id = role.json()["id"]
+        assigned = client.post("/api/roles/assign_role", params={"role_id": role_id}, json={"total_ids": [user_id]})
+        assert assigned.status_code == 200, assigned.text
+        assert assigned.json()["inserted"] == 1
+        missing = client.post(
+            "/api/roles/assign_role", params={"role_id": role_id}, json={"total_ids": [str(uuid4())]}
+        )
+        assert missing.status_code == 404
+
+        expanded = client.get("/api/users/get", params={"user_id": user_id, "expand": "roles"})
+        assert [r["id"] for r in expanded.json()["roles"]] == [role_id]
+        members = client.get("/api/roles/list/get_users_with_role", params={"role_id": role_id})
+        assert [u["id"] for u in members.json()] == [user_id]
+        listed = client.get("/api/users/list", params={"limit": 200})
+        assert listed.status_code == 200, listed.text
+        assert user_id in {item["id"] for item in listed.json()}
+    finally:
+        cleanup(db, name)
+
+
+def test_register_login_logout(client, db):
+    name = f"test_{uuid4().hex[:12]}"
+    try:
+        registered = client.post(
+            "/api/auth/register", json={"username": name, "email": f"{name}@example.com", "password": "secret1"}
+        )
+        assert registered.status_code == 201, registered.text
+        assert client.post("/api/auth/login", data={"username": name, "password": "wrong-password"}).status_code == 401
+
+        login = client.post("/api/auth/login", data={"username": name, "password": "secret1"})
+        assert login.status_code == 200, login.text
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        me = client.get("/api/auth/me", headers=headers)
+        assert me.status_code == 200, me.text
+        assert me.json()["username"] == name
+
+        logout = client.post("/api/auth/logout", headers=headers)
+        assert logout.status_code == 200, logout.text
+        # Token đã thu hồi không dùng lại được
+        assert client.get("/api/auth/me", headers=headers).status_code == 401
+    finally:
+        cleanup(db, name)
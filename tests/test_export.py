@@ -0,0 +1,93 @@
+import csv
+import io
+import json
+import math
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import false, select
+
+from src.controller import export_controller
+from src.controller.export_controller import stream_users
+from src.controller.role_controller import assign_role
+from src.models.user_model import User
+from src.models.user_role_model import UserRole
+
+FETCH_SIZE = 2
+
+
+@pytest.fixture(autouse=True)
+def small_fetch_size(monkeypatch):
+    # Vài dòng đã đủ nhiều partition, tức nhiều chunk trong response
+    monkeypatch.setattr(export_controller, "EXPORT_FETCH_SIZE", FETCH_SIZE)
+
+
+@pytest.fixture
+def users(make_user):
+    return [make_user() for _ in range(4)] + [make_user(phone=f"{uuid4().int % 10 ** 10:010d}")]
+
+
+def parse(body: str, fmt: str) -> list:
+    if fmt == "csv":
+        return list(csv.DictReader(io.StringIO(body)))
+    return [json.loads(line) for line in body.splitlines()]
+
+
+@pytest.mark.parametrize("fmt", ["ndjson", "csv"])
+def test_export_users(client, db, users, fmt):
+    response = client.get("/api/users/export", params={"format": fmt})
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith(export_controller.EXPORT_MEDIA_TYPES[fmt])
+    assert response.headers["content-disposition"] == f"attachment; filename=users.{fmt}"
+    if fmt == "csv":
+        assert response.text.splitlines()[0] == "id,username,email,phone,date_of_birth,is_active,created_at,updated_at"
+
+    rows = parse(response.text, fmt)
+    assert len(rows) == db.query(User).count()
+    # Thứ tự (created_at, id): các user vừa tạo nằm liên tiếp theo thứ tự tạo
+    ids = [row["id"] for row in rows]
+    assert [id for id in ids if id in {str(user.id) for user in users}] == [str(user.id) for user in users]
+
+    by_id = {row["id"]: row for row in rows}
+    plain, with_phone = by_id[str(users[0].id)], by_id[str(users[-1].id)]
+    assert plain["username"] == users[0].username
+    assert with_phone["phone"] == users[-1].phone
+    # Giá trị NULL: null trong NDJSON, ô rỗng trong CSV
+    empty = "" if fmt == "csv" else None
+    assert plain["phone"] == empty and plain["date_of_birth"] == empty
+    assert plain["is_active"] == ("True" if fmt == "csv" else True)
+    assert "password" not in plain
+
+
+@pytest.mark.parametrize("fmt", ["ndjson", "csv"])
+def test_export_streams_one_chunk_per_fetch(db, users, fmt):
+    chunks = list(stream_users(fmt))
+    total = db.query(User).count()
+    assert len(chunks) == math.ceil(total / FETCH_SIZE)
+    assert len(parse("".join(chunks), fmt)) == total
+    if fmt == "ndjson":
+        assert [chunk.count("\n") for chunk in chunks[:-1]] == [FETCH_SIZE] * (len(chunks) - 1)
+
+
+@pytest.mark.parametrize("fmt", ["ndjson", "csv"])
+def test_export_memberships(client, db, users, make_role, fmt):
+    roles = [make_role(), make_role()]
+    for role in roles:
+        assign_role(db, role, role.id, [user.id for user in users[:3]])
+
+    response = client.get("/api/roles/export_memberships", params={"format": fmt})
+    assert response.status_code == 200, response.text
+    rows = parse(response.text, fmt)
+    assert len(rows) == db.query(UserRole).count()
+    assert set(rows[0]) == {"user_id", "role_id", "assigned_at"}
+    keys = [(row["role_id"], row["user_id"]) for row in rows]
+    assert keys == sorted(keys)
+    ours = {(str(role.id), str(user.id)) for role in roles for user in users[:3]}
+    assert ours <= set(keys)
+    assert all(row["assigned_at"] for row in rows)
+
+
+def test_export_csv_without_rows_has_header_only(db):
+    statement = select(*export_controller.MEMBERSHIP_EXPORT_COLUMNS).where(false())
+    chunks = list(export_controller._stream_rows(statement, export_controller.MEMBERSHIP_EXPORT_COLUMNS, "csv"))
+    assert chunks == ["user_id,role_id,assigned_at\r\n"]
@@ -0,0 +1,97 @@
+from concurrent.futures import ThreadPoolExecutor
+from prometheus_client import REGISTRY
+from uuid import uuid4
+import json
+import os
+import time
+
+import pytest
+
+from api.configs import hashing
+from src.models.user_model import User
+
+
+def test_concurrent_workers_tune_once_and_share_params(tmp_path, monkeypatch):
+    path = str(tmp_path / "hash_params.json")
+    calls = []
+
+    def slow_tune():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"time_cost": len(calls) + 1, "memory_cost": 19456, "parallelism": 1}
+
+    monkeypatch.setattr(hashing, "HASH_AUTOTUNE", True)
+    monkeypatch.setattr(hashing, "tune_argon2_params", slow_tune)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: hashing.load_or_tune_hash_params(path), range(8)))
+
+    assert len(calls) == 1
+    assert all(params == results[0] for params in results)
+    with open(path) as f:
+        assert json.load(f)["target_ms"] == hashing.HASH_TARGET_MS
+    assert os.listdir(tmp_path) == ["hash_params.json"]
+
+
+def test_stale_lock_from_a_dead_worker_is_taken_over(tmp_path, monkeypatch):
+    path = str(tmp_path / "hash_params.json")
+    lock = path + ".lock"
+    open(lock, "w").close()
+    os.utime(lock, (time.time() - 120, time.time() - 120))
+
+    monkeypatch.setattr(hashing, "HASH_AUTOTUNE", True)
+    monkeypatch.setattr(hashing, "tune_argon2_params", lambda: {"time_cost": 2, "memory_cost": 19456, "parallelism": 1})
+
+    assert hashing.load_or_tune_hash_params(path)["time_cost"] == 2
+    assert not os.path.exists(lock)
+
+
+@pytest.fixture
+def registered_user(client, db):
+    name = f"test_{uuid4().hex[:12]}"
+    response = client.post(
+        "/api/auth/register", json={"username": name, "email": f"{name}@example.com", "password": "secret1"}
+    )
+    assert response.status_code == 201, response.text
+    yield name
+    db.query(User).filter(User.username == name).delete()
+    db.commit()
+
+
+def hold_all_slots():
+    executor = hashing.hashing_executor
+    held = 0
+    while executor._slots.acquire(blocking=False):
+        held += 1
+    return held
+
+
+def test_saturated_pool_rejects_immediately_and_recovers(client, registered_user):
+    executor = hashing.hashing_executor
+    capacity = executor.workers + executor.queue_size
+    login = {"username": registered_user, "password": "secret1"}
+    rejected_before = REGISTRY.get_sample_value("password_hash_rejected_total") or 0
+
+    assert hold_all_slots() == capacity
+    try:
+        start = time.perf_counter()
+        busy = client.post("/api/auth/login", data=login)
+        name = f"test_{uuid4().hex[:12]}"
+        register = client.post(
+            "/api/auth/register", json={"username": name, "email": f"{name}@example.com", "password": "secret1"}
+        )
+        # Không xếp hàng chờ process hash: trả 503 ngay
+        assert time.perf_counter() - start < 1
+        for response in (busy, register):
+            assert response.status_code == 503, response.text
+            assert response.headers["Retry-After"] == "1"
+        assert REGISTRY.get_sample_value("password_hash_rejected_total") == rejected_before + 2
+    finally:
+        for _ in range(capacity):
+            executor._slots.release()
+
+    assert client.post("/api/auth/login", data=login).status_code == 200
+    # Request bị từ chối và request thành công đều không giữ lại slot nào
+    assert hold_all_slots() == capacity
+    for _ in range(capacity):
+        executor._slots.release()
@@ -0,0 +1,81 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+import json
+
+from sqlalchemy import text
+import pytest
+
+# Bảng test thường nhỏ nên planner chọn seq scan; tắt seq scan để kiểm tra index có *dùng được*
+# cho các query nóng hay không. (tên, SQL, index mong đợi)
+CHECKS = (
+    (
+        "get_users_by_role",
+        "SELECT users.* FROM users JOIN user_roles ON user_roles.user_id = users.id "
+        "WHERE user_roles.role_id = :role_id ORDER BY users.created_at, users.id LIMIT 50",
+        "ix_user_roles_role_id_user_id",
+    ),
+    (
+        "remove_role_from_users",
+        "SELECT user_id FROM user_roles WHERE role_id = :role_id AND user_id = ANY(:user_ids)",
+        "ix_user_roles_role_id_user_id",
+    ),
+    (
+        "reap_expired_tokens",
+        "SELECT ctid FROM blacklist_token WHERE expires_at < :now LIMIT 1000",
+        "ix_blacklist_token_expires_at",
+    ),
+    (
+        "sync_revocation_cache",
+        "SELECT token_hash, expires_at FROM blacklist_token WHERE blacklisted_at > :now",
+        "ix_blacklist_token_blacklisted_at",
+    ),
+    (
+        "is_token_blacklisted",
+        "SELECT 1 FROM blacklist_token WHERE token_hash = :token_hash",
+        "blacklist_token_token_hash_key",
+    ),
+    (
+        "list_users_keyset",
+        "SELECT * FROM users WHERE (created_at, id) > (:created_at, :last_id) "
+        "ORDER BY created_at, id LIMIT 50",
+        "ix_users_created_at_id",
+    ),
+    (
+        "list_roles_keyset",
+        "SELECT * FROM roles WHERE (created_at, id) > (:created_at, :last_id) "
+        "ORDER BY created_at, id LIMIT 50",
+        "ix_roles_created_at_id",
+    ),
+)
+
+PARAMS = {
+    "role_id": uuid4(),
+    "user_ids": [uuid4(), uuid4()],
+    "now": datetime.now(timezone.utc),
+    "token_hash": "0" * 64,
+    "created_at": datetime(2000, 1, 1, tzinfo=timezone.utc),
+    "last_id": uuid4(),
+}
+
+
+def index_names(plan: dict) -> set:
+    names = {plan["Index Name"]} if "Index Name" in plan else set()
+    for child in plan.get("Plans", []):
+        names |= index_names(child)
+    return names
+
+
+@pytest.fixture
+def planner(database):
+    with database.connect() as conn:
+        conn.execute(text("SET LOCAL enable_seqscan = off"))
+        yield conn
+        conn.rollback()
+
+
+@pytest.mark.parametrize("sql, expected", [check[1:] for check in CHECKS], ids=[check[0] for check in CHECKS])
+def test_hot_query_uses_index(planner, sql, expected):
+    plan = planner.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"), PARAMS).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    assert expected in index_names(plan[0]["Plan"])
@@ -0,0 +1,45 @@
+from prometheus_client.parser import text_string_to_metric_families
+from uuid import uuid4
+
+from src.models.user_model import User
+
+EXPECTED_SERIES = {
+    "db_statements_per_request",
+    "db_duration_per_request_seconds",
+    "db_statements",
+    "db_statement_duration_seconds",
+    "db_pool_wait_seconds",
+    "password_hash_duration_seconds",
+    "jwt_duration_seconds",
+    "revocation_cache_lookups",
+}
+
+
+def test_metrics_exposes_app_series_by_route_template(client, db, make_user):
+    name = f"test_{uuid4().hex[:12]}"
+    user = make_user()
+    try:
+        # Hash (register/login), JWT (tạo + verify), tra cứu thu hồi (/me), SQL theo route (/users/get)
+        client.post("/api/auth/register", json={"username": name, "email": f"{name}@example.com", "password": "secret1"})
+        token = client.post("/api/auth/login", data={"username": name, "password": "secret1"}).json()["access_token"]
+        assert client.get("/api/auth/me", headers={"Authorization": f"Bearer {token}"}).status_code == 200
+        assert client.get("/api/users/get", params={"user_id": str(user.id)}).status_code == 200
+        assert client.get(f"/api/no_such_route/{user.id}").status_code == 404
+
+        response = client.get("/metrics")
+        assert response.status_code == 200
+    finally:
+        db.query(User).filter(User.username == name).delete()
+        db.commit()
+
+    families = {family.name: family for family in text_string_to_metric_families(response.text)}
+    missing = {name for name in EXPECTED_SERIES if name not in families or not families[name].samples}
+    assert not missing, f"missing metric series: {sorted(missing)}"
+
+    handlers = {sample.labels.get("handler") for sample in families["db_statements_per_request"].samples}
+    # Label là path template của route, không phải path thật chứa id
+    assert "/api/users/get" in handlers
+    assert "/api/auth/me" in handlers
+    assert not any(str(user.id) in (handler or "") for handler in handlers)
+    # Path không khớp route nào gom chung 1 label
+    assert "unmatched" in handlers
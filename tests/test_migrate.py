@@ -0,0 +1,64 @@
+from uuid import uuid4
+import hashlib
+
+from alembic import command
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool
+import pytest
+
+from migrate import alembic_config, migrate
+
+
+def head() -> str:
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+
+@pytest.fixture
+def scratch_url(database):
+    # Database tạm, tách khỏi database chung của các test khác
+    name = f"migrate_test_{uuid4().hex[:8]}"
+    admin = database.execution_options(isolation_level="AUTOCOMMIT")
+    try:
+        with admin.connect() as conn:
+            conn.execute(text(f'CREATE DATABASE "{name}"'))
+    except Exception as e:
+        pytest.skip(f"Cannot create a scratch database: {e}")
+    yield database.url.set(database=name).render_as_string(hide_password=False)
+    with admin.connect() as conn:
+        conn.execute(text(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)'))
+
+
+def test_migrate_adopts_schema_created_without_alembic(scratch_url):
+    # Giống database do create_all của bản cũ tạo: đủ bảng, token lưu nguyên chuỗi, không có alembic_version
+    command.upgrade(alembic_config(scratch_url), "0001")
+    engine = create_engine(make_url(scratch_url), poolclass=NullPool)
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("DROP TABLE alembic_version"))
+            conn.execute(text(
+                "INSERT INTO blacklist_token (id, token, expires_at) "
+                "VALUES (gen_random_uuid(), 'legacy.jwt.token', NOW() + interval '1 hour')"
+            ))
+
+        migrate(url=scratch_url)
+
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT version_num FROM alembic_version")).scalar() == head()
+            token_hash = conn.execute(text("SELECT token_hash FROM blacklist_token")).scalar()
+            indexes = {index["name"] for index in inspect(conn).get_indexes("user_roles")}
+        assert token_hash == hashlib.sha256(b"legacy.jwt.token").hexdigest()
+        assert "ix_user_roles_role_id_user_id" in indexes
+    finally:
+        engine.dispose()
+
+
+def test_migrate_on_empty_database_runs_every_revision(scratch_url):
+    migrate(url=scratch_url)
+    engine = create_engine(make_url(scratch_url), poolclass=NullPool)
+    try:
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT version_num FROM alembic_version")).scalar() == head()
+    finally:
+        engine.dispose()
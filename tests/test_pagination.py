@@ -0,0 +1,68 @@
+from datetime import datetime, timezone
+from uuid import UUID, uuid4
+import base64
+
+import pytest
+
+from src.controller.pagination import encode_cursor
+from src.models.user_model import User
+
+# Mọi user của test có cùng created_at (ở tương lai để không lẫn dữ liệu khác): thứ tự
+# trong trang chỉ còn dựa vào id
+TIED_AT = datetime(2100, 1, 1, tzinfo=timezone.utc)
+START = encode_cursor(TIED_AT, UUID(int=0))
+
+
+@pytest.fixture
+def tied_users(db):
+    created = []
+
+    def factory(count: int):
+        users = []
+        for _ in range(count):
+            name = f"test_{uuid4().hex[:12]}"
+            users.append(User(username=name, email=f"{name}@example.com", password="x", created_at=TIED_AT))
+        db.add_all(users)
+        db.commit()
+        created.extend(user.id for user in users)
+        return sorted(user.id for user in users)
+
+    yield factory
+    db.rollback()
+    db.query(User).filter(User.id.in_(created)).delete(synchronize_session=False)
+    db.commit()
+
+
+def walk(client, limit: int):
+    pages, cursor = [], START
+    while cursor is not None:
+        response = client.get("/api/users/list", params={"cursor": cursor, "limit": limit})
+        assert response.status_code == 200, response.text
+        pages.append([UUID(item["id"]) for item in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+    return pages
+
+
+def test_cursor_walks_every_row_once_across_ties(client, tied_users):
+    ids = tied_users(7)
+    pages = walk(client, limit=3)
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert [user_id for page in pages for user_id in page] == ids
+
+
+def test_full_last_page_is_followed_by_an_empty_page(client, tied_users):
+    # Trang đầy nên vẫn có X-Next-Cursor; trang sau rỗng và không có header
+    ids = tied_users(4)
+    pages = walk(client, limit=2)
+    assert pages == [ids[:2], ids[2:], []]
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor",
+    base64.urlsafe_b64encode(b"[1, 2]").decode(),
+    base64.urlsafe_b64encode(b'{"c": "yesterday", "i": "x"}').decode(),
+])
+def test_invalid_cursor_is_rejected(client, database, cursor):
+    response = client.get("/api/users/list", params={"cursor": cursor})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
@@ -0,0 +1,39 @@
+from collections import Counter
+
+import pytest
+
+from api.configs.profiler import assert_max_queries
+from src.controller.role_controller import assign_role
+from src.models.role_model import Role
+
+
+@pytest.fixture
+def role_with_users(db, make_user, make_role):
+    role = make_role()
+    users = [make_user() for _ in range(5)]
+    user_ids = [user.id for user in users]
+    assign_role(db, role, role.id, user_ids)
+    # Bỏ quan hệ đã nạp trong session để lần đọc sau phải đi database
+    role_id = role.id
+    db.expire_all()
+    return role_id, user_ids
+
+
+def test_assert_max_queries_catches_n_plus_one(db, role_with_users):
+    # Cách cũ: role.users rồi lazy load roles của từng user -> 1 + N câu SELECT
+    role_id, user_ids = role_with_users
+    with pytest.raises(AssertionError, match="Expected at most 2 queries"):
+        with assert_max_queries(2) as statements:
+            for user in db.get(Role, role_id).users:
+                user.roles
+    # Cùng 1 dạng câu SELECT lặp lại cho từng user
+    assert max(Counter(statements).values()) == len(user_ids)
+
+
+def test_users_with_role_is_a_single_join(client, role_with_users):
+    role_id, user_ids = role_with_users
+    # 1 SELECT role + 1 SELECT users JOIN user_roles, không phụ thuộc số user
+    with assert_max_queries(2):
+        response = client.get("/api/roles/list/get_users_with_role", params={"role_id": str(role_id)})
+    assert response.status_code == 200, response.text
+    assert {item["id"] for item in response.json()} == {str(user_id) for user_id in user_ids}
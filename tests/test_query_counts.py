@@ -0,0 +1,62 @@
+from uuid import UUID, uuid4
+
+from api.configs.profiler import assert_max_queries
+from src.models.role_model import Role
+from src.models.user_model import User
+
+# expire_on_commit=False + eager_defaults: ghi xong trả response không cần SELECT lại
+
+
+def test_create_user_is_a_single_insert(client, db):
+    name = f"test_{uuid4().hex[:12]}"
+    with assert_max_queries(1):
+        response = client.post(
+            "/api/users/create", json={"username": name, "email": f"{name}@example.com", "password": "secret1"}
+        )
+    assert response.status_code == 201, response.text
+    assert response.json()["created_at"]
+
+    db.query(User).filter(User.id == UUID(response.json()["id"])).delete()
+    db.commit()
+
+
+def test_update_user_loads_once_and_updates_once(client, make_user):
+    user = make_user()
+    with assert_max_queries(2):
+        response = client.put(
+            "/api/users/update", params={"user_id": str(user.id)}, json={"email": f"new_{user.email}"}
+        )
+    assert response.status_code == 201, response.text
+    assert response.json()["email"] == f"new_{user.email}"
+
+
+def test_create_role_is_a_single_insert(client, db):
+    name = f"test_{uuid4().hex[:12]}"
+    with assert_max_queries(1):
+        response = client.post("/api/roles/create", json={"rolename": name})
+    assert response.status_code == 201, response.text
+
+    db.query(Role).filter(Role.id == UUID(response.json()["id"])).delete()
+    db.commit()
+
+
+def test_update_role_loads_once_and_updates_once(client, make_role):
+    role = make_role()
+    with assert_max_queries(2):
+        response = client.put(
+            "/api/roles/update", params={"role_id": str(role.id)}, json={"rolename": f"{role.rolename}_x"}
+        )
+    assert response.status_code == 200, response.text
+    assert response.json()["rolename"] == f"{role.rolename}_x"
+
+
+def test_assign_role_query_count_does_not_grow_with_users(client, make_user, make_role):
+    role = make_role()
+    user_ids = [str(make_user().id) for _ in range(20)]
+    # get_role + kiểm tra user tồn tại + 1 INSERT ... ON CONFLICT cho cả lô
+    with assert_max_queries(3):
+        response = client.post(
+            "/api/roles/assign_role", params={"role_id": str(role.id)}, json={"total_ids": user_ids}
+        )
+    assert response.status_code == 200, response.text
+    assert response.json()["inserted"] == 20
@@ -0,0 +1,79 @@
+from fastapi import HTTPException
+from uuid import UUID, uuid4
+import pytest
+
+from api.configs.profiler import assert_max_queries
+from src.cache.rbac_cache import rbac_cache
+from src.cache.token_cache import UserSnapshot
+from src.dependencies.auth_dependencies import AuthContext, require_roles
+from src.models.role_model import Role
+
+
+@pytest.fixture(autouse=True)
+def clean_rbac_cache():
+    rbac_cache.clear()
+    yield
+    rbac_cache.clear()
+
+
+def context_for(*role_ids: UUID) -> AuthContext:
+    principal = UserSnapshot(uuid4(), "test", True, frozenset(role_ids))
+    return AuthContext("token", "digest", {}, principal)
+
+
+def test_warm_role_check_does_no_db_work(db, make_role):
+    role = make_role()
+    check = require_roles(role.rolename)
+    context = context_for(role.id)
+
+    with assert_max_queries(1):
+        assert check(context=context, db=db) is context.principal
+    with assert_max_queries(0):
+        assert check(context=context, db=db) is context.principal
+
+
+def test_missing_role_is_denied(db, make_role):
+    role = make_role()
+    check = require_roles(role.rolename)
+    with pytest.raises(HTTPException) as exc:
+        check(context=context_for(), db=db)
+    assert exc.value.status_code == 403
+
+
+def test_unknown_role_name_is_cached_negatively(db, make_role):
+    role = make_role()
+    check = require_roles(f"unknown_{uuid4().hex[:12]}")
+    context = context_for(role.id)
+
+    with assert_max_queries(1), pytest.raises(HTTPException):
+        check(context=context, db=db)
+    # Tên không tồn tại không làm nạp lại bảng roles ở mỗi request
+    with assert_max_queries(0), pytest.raises(HTTPException):
+        check(context=context, db=db)
+
+
+def test_require_all_with_unknown_role_is_denied(db, make_role):
+    role = make_role()
+    check = require_roles(role.rolename, f"unknown_{uuid4().hex[:12]}", require_all=True)
+    with pytest.raises(HTTPException) as exc:
+        check(context=context_for(role.id), db=db)
+    assert exc.value.status_code == 403
+    # require_all=False: đủ 1 role tồn tại là được
+    context = context_for(role.id)
+    assert require_roles(role.rolename, "unknown")(context=context, db=db) is context.principal
+
+
+def test_created_role_is_visible_after_negative_lookup(client, db):
+    rolename = f"test_{uuid4().hex[:12]}"
+    check = require_roles(rolename)
+    with pytest.raises(HTTPException):
+        check(context=context_for(), db=db)
+
+    response = client.post("/api/roles/create", json={"rolename": rolename})
+    assert response.status_code == 201, response.text
+    try:
+        context = context_for(UUID(response.json()["id"]))
+        assert check(context=context, db=db) is context.principal
+    finally:
+        db.query(Role).filter(Role.rolename == rolename).delete()
+        db.commit()
@@ -0,0 +1,77 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, text
+import pytest
+
+from api.configs import replicas
+from api.configs.db import engine
+from api.configs.replicas import (
+    ReadYourWritesMiddleware, ReplicaSet, READ_YOUR_WRITES_COOKIE, READ_YOUR_WRITES_HEADER, pinned_to_primary,
+    read_session
+)
+from src.models.user_model import User
+
+# Replica là file SQLite: chạy được không cần Postgres hay replication thật
+
+
+@pytest.fixture
+def replica_set(tmp_path, monkeypatch):
+    replica_set = ReplicaSet([f"sqlite:///{tmp_path / 'replica.db'}"], async_mode=False)
+    monkeypatch.setattr(replicas, "replica_set", replica_set)
+    yield replica_set
+    for replica in replica_set.replicas:
+        replica.engine.dispose()
+
+
+def test_replica_is_unhealthy_until_first_check(replica_set):
+    assert replica_set.choose() is None
+    replica_set.check()
+    assert replica_set.choose() is replica_set.replicas[0]
+    assert replica_set.status()[0]["healthy"] is True
+
+
+def test_unreachable_replica_is_taken_out(tmp_path):
+    replica_set = ReplicaSet([f"sqlite:///{tmp_path / 'missing' / 'replica.db'}"], async_mode=False)
+    replica_set.check()
+    assert replica_set.choose() is None
+    assert replica_set.status()[0]["last_error"]
+
+
+def test_reads_go_to_replica_and_writes_to_primary(replica_set):
+    replica_set.check()
+    with read_session() as db:
+        assert db.execute(text("SELECT sqlite_version()")).scalar()
+        assert db.get_bind(clause=insert(User)) is engine
+
+
+def make_app() -> TestClient:
+    app = FastAPI()
+    app.add_middleware(ReadYourWritesMiddleware)
+
+    @app.get("/read")
+    def read():
+        return {"pinned": pinned_to_primary()}
+
+    @app.post("/write")
+    def write():
+        return {}
+
+    return TestClient(app)
+
+
+def test_write_pins_client_by_cookie_and_header(replica_set):
+    replica_set.check()
+    client = make_app()
+    assert client.get("/read").json() == {"pinned": False}
+
+    response = client.post("/write")
+    until = response.headers[READ_YOUR_WRITES_HEADER]
+    assert response.cookies[READ_YOUR_WRITES_COOKIE] == until
+    # TestClient giữ cookie
+    assert client.get("/read").json() == {"pinned": True}
+
+    # Client không giữ cookie thì gửi lại header
+    client.cookies.clear()
+    assert client.get("/read").json() == {"pinned": False}
+    assert client.get("/read", headers={READ_YOUR_WRITES_HEADER: until}).json() == {"pinned": True}
+    assert client.get("/read", headers={READ_YOUR_WRITES_HEADER: "0"}).json() == {"pinned": False}
@@ -0,0 +1,89 @@
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+import pytest
+
+from src.cache.fake_redis import FakeRedis
+from src.cache.response_cache import (
+    InMemoryResponseBackend, RedisResponseBackend, ResponseCache, ROLES, USERS,
+)
+
+
+class Item(BaseModel):
+    value: int
+
+
+def make_client(cache: ResponseCache):
+    # Endpoint đếm số lần build(), tức số lần thực sự phải đọc database
+    app = FastAPI()
+    builds = []
+
+    @app.get("/items")
+    def items(request: Request):
+        def build():
+            builds.append(1)
+            return Item(value=len(builds))
+        return cache.respond(request, (USERS,), Item, build)
+
+    return TestClient(app), builds
+
+
+@pytest.fixture(params=["memory", "fakeredis"])
+def cache(request):
+    backend = InMemoryResponseBackend() if request.param == "memory" else RedisResponseBackend(FakeRedis())
+    return ResponseCache(backend, ttl=60)
+
+
+def test_hit_until_version_bump(cache):
+    client, builds = make_client(cache)
+    first = client.get("/items")
+    assert first.headers["X-Cache"] == "MISS"
+    second = client.get("/items")
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.json() == first.json() == {"value": 1}
+
+    # Nhóm khác không ảnh hưởng; bump đúng nhóm thì key đổi version và build lại
+    cache.bump(ROLES)
+    assert client.get("/items").headers["X-Cache"] == "HIT"
+    cache.bump(USERS)
+    third = client.get("/items")
+    assert third.headers["X-Cache"] == "MISS"
+    assert third.json() == {"value": 2}
+    assert len(builds) == 2
+
+
+def test_if_none_match_returns_304(cache):
+    client, _ = make_client(cache)
+    etag = client.get("/items").headers["ETag"]
+
+    response = client.get("/items", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+    assert client.get("/items", headers={"If-None-Match": '"other"'}).status_code == 200
+
+    cache.bump(USERS)
+    response = client.get("/items", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_shared_backend_sees_bumps_from_other_workers():
+    redis = FakeRedis()
+    worker_a = ResponseCache(RedisResponseBackend(redis), ttl=60)
+    worker_b = ResponseCache(RedisResponseBackend(redis), ttl=60)
+    client_a, _ = make_client(worker_a)
+    client_b, _ = make_client(worker_b)
+    client_a.get("/items")
+    assert client_b.get("/items").headers["X-Cache"] == "HIT"
+
+    worker_b.bump(USERS)
+    assert client_a.get("/items").headers["X-Cache"] == "MISS"
+
+
+def test_memory_backend_caps_ttl():
+    # Worker khác không thấy bump của worker này, nên entry trong memory không được sống lâu
+    cache = ResponseCache(InMemoryResponseBackend(max_ttl=5), ttl=300)
+    assert cache.ttl_for(None) == 5
+    assert ResponseCache(RedisResponseBackend(FakeRedis()), ttl=300).ttl_for(None) == 300
+    assert ResponseCache(None, ttl=300).ttl_for(None) == 300
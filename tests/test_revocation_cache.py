@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+import hashlib
+import time
+
+import pytest
+
+from src.cache.fake_redis import FakeRedis
+from src.cache.revocation_cache import InMemoryRevocationBackend, RedisRevocationBackend, RevocationCache
+from src.models.blacklist_model import TokenBlacklist
+
+
+def fingerprint() -> str:
+    return hashlib.sha256(uuid4().bytes).hexdigest()
+
+
+@pytest.fixture
+def revoked_rows(db):
+    # Ghi thẳng vào blacklist_token như 1 worker khác vừa logout; dọn lại sau test
+    created = []
+
+    def revoke(expires_in: timedelta = timedelta(hours=1)) -> str:
+        token_hash = fingerprint()
+        db.add(TokenBlacklist(token_hash=token_hash, expires_at=datetime.now(timezone.utc) + expires_in))
+        db.commit()
+        created.append(token_hash)
+        return token_hash
+
+    yield revoke
+    db.query(TokenBlacklist).filter(TokenBlacklist.token_hash.in_(created)).delete(synchronize_session=False)
+    db.commit()
+
+
+def test_not_ready_cache_defers_to_database():
+    cache = RevocationCache(RedisRevocationBackend(FakeRedis()))
+    assert cache.is_revoked(fingerprint()) is None
+
+
+def test_fakeredis_backend_add_and_is_revoked(db):
+    cache = RevocationCache(RedisRevocationBackend(FakeRedis()))
+    cache.warm(db)
+    revoked, expired, other = fingerprint(), fingerprint(), fingerprint()
+    cache.add(revoked, datetime.now(timezone.utc) + timedelta(minutes=5))
+    cache.add(expired, datetime.now(timezone.utc) - timedelta(seconds=1))
+
+    assert cache.is_revoked(revoked) is True
+    assert cache.is_revoked(expired) is False
+    assert cache.is_revoked(other) is False
+
+
+def test_warm_loads_only_unexpired_rows(db, revoked_rows):
+    live = revoked_rows()
+    expired = revoked_rows(timedelta(seconds=-1))
+    cache = RevocationCache(RedisRevocationBackend(FakeRedis()))
+    cache.warm(db)
+
+    assert cache.ready
+    assert cache.is_revoked(live) is True
+    assert cache.is_revoked(expired) is False
+
+
+def test_memory_backend_sees_other_workers_revocations_after_sync(db, revoked_rows):
+    worker_a = RevocationCache(InMemoryRevocationBackend(capacity=100))
+    worker_b = RevocationCache(InMemoryRevocationBackend(capacity=100))
+    worker_a.warm(db)
+    worker_b.warm(db)
+
+    token_hash = revoked_rows()
+    worker_a.add(token_hash, datetime.now(timezone.utc) + timedelta(hours=1))
+    assert worker_a.is_revoked(token_hash) is True
+    assert worker_b.is_revoked(token_hash) is False
+
+    assert worker_b.sync(db) >= 1
+    assert worker_b.is_revoked(token_hash) is True
+
+
+def test_stale_memory_backend_falls_back_to_database(db):
+    cache = RevocationCache(InMemoryRevocationBackend(capacity=100), max_staleness=5)
+    cache.warm(db)
+    assert cache.is_revoked(fingerprint()) is False
+
+    cache.synced_at = time.monotonic() - 10
+    assert cache.is_revoked(fingerprint()) is None
+
+
+def test_shared_backend_never_goes_stale(db):
+    cache = RevocationCache(RedisRevocationBackend(FakeRedis()), max_staleness=5)
+    cache.warm(db)
+    cache.synced_at = time.monotonic() - 10
+    assert cache.is_revoked(fingerprint()) is False
@@ -0,0 +1,16 @@
+from sqlalchemy import text
+
+from src.tasks.token_reaper import REAPER_LOCK_ID, reap_expired_tokens
+
+
+def test_reaper_skips_while_another_worker_holds_the_lock(database):
+    with database.connect() as other_worker:
+        assert other_worker.execute(text("SELECT pg_try_advisory_lock(:id)"), {"id": REAPER_LOCK_ID}).scalar()
+        try:
+            assert reap_expired_tokens() is None
+        finally:
+            other_worker.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": REAPER_LOCK_ID})
+
+    assert reap_expired_tokens() >= 0
+    # Lock đã được trả: lượt tiếp theo vẫn chạy được
+    assert reap_expired_tokens() is not None
@@ -0,0 +1,93 @@
+from uuid import uuid4
+
+from api.configs.auth import verify_password
+from api.configs.profiler import assert_max_queries
+from src.models.user_model import User
+
+
+def test_batch_get_keeps_order_and_reports_missing(client, make_user):
+    first, second = make_user(), make_user()
+    missing = uuid4()
+    ids = [str(second.id), str(missing), str(first.id), str(second.id)]
+
+    # 1 SELECT ... IN cho cả lô
+    with assert_max_queries(1):
+        response = client.post("/api/users/batch_get", json={"user_ids": ids})
+    assert response.status_code == 200, response.text
+    results = response.json()
+    # Thứ tự gửi lên, id trùng chỉ 1 kết quả
+    assert [item["user_id"] for item in results] == [str(second.id), str(missing), str(first.id)]
+    assert [item["status"] for item in results] == ["ok", "not_found", "ok"]
+    assert results[0]["user"]["username"] == second.username
+    assert results[1]["user"] is None
+
+
+def test_batch_update_is_one_update_per_field_set(client, db, make_user):
+    users = [make_user() for _ in range(5)]
+    missing = uuid4()
+    items = [{"user_id": str(user.id), "email": f"new_{user.email}"} for user in users]
+    items.insert(2, {"user_id": str(missing), "email": f"{missing.hex[:12]}@example.com"})
+
+    # SELECT id có tồn tại + 1 UPDATE executemany + SELECT kết quả
+    with assert_max_queries(3) as statements:
+        response = client.put("/api/users/batch_update", json={"items": items})
+    assert response.status_code == 200, response.text
+    assert sum(sql.startswith("UPDATE") for sql in statements) == 1
+
+    results = response.json()
+    assert [item["user_id"] for item in results] == [item["user_id"] for item in items]
+    assert [item["status"] for item in results] == ["ok", "ok", "not_found", "ok", "ok", "ok"]
+    db.expire_all()
+    for user in users:
+        assert db.get(User, user.id).email.startswith("new_")
+
+
+def test_batch_update_duplicate_ids_last_patch_wins(client, db, make_user):
+    user = make_user()
+    items = [
+        {"user_id": str(user.id), "email": f"first_{user.email}"},
+        {"user_id": str(user.id), "email": f"last_{user.email}"},
+    ]
+    response = client.put("/api/users/batch_update", json={"items": items})
+    assert response.status_code == 200, response.text
+    assert [item["user"]["email"] for item in response.json()] == [f"last_{user.email}"]
+
+
+def test_batch_update_hashes_new_password(client, db, make_user):
+    user, other = make_user(), make_user()
+    items = [{"user_id": str(user.id), "password": "new-secret"}, {"user_id": str(other.id), "phone": "0987654321"}]
+    response = client.put("/api/users/batch_update", json={"items": items})
+    assert response.status_code == 200, response.text
+    db.expire_all()
+    stored = db.get(User, user.id).password
+    assert stored != "new-secret"
+    assert verify_password("new-secret", stored)
+    assert db.get(User, other.id).password == "x"
+
+
+def test_batch_update_unique_conflict_rolls_back(client, db, make_user):
+    first, second = make_user(), make_user()
+    items = [
+        {"user_id": str(first.id), "username": f"renamed_{uuid4().hex[:8]}"},
+        {"user_id": str(second.id), "email": first.email},
+    ]
+    response = client.put("/api/users/batch_update", json={"items": items})
+    assert response.status_code == 400, response.text
+    assert response.json()["detail"] == "Email already registered"
+    db.expire_all()
+    assert db.get(User, first.id).username == first.username
+
+
+def test_batch_delete_is_one_statement(client, db, make_user):
+    user_ids = [make_user().id for _ in range(3)]
+    missing = uuid4()
+    ids = [str(user_ids[1]), str(missing), str(user_ids[0]), str(user_ids[1]), str(user_ids[2])]
+
+    with assert_max_queries(1):
+        response = client.post("/api/users/batch_delete", json={"user_ids": ids})
+    assert response.status_code == 200, response.text
+    results = response.json()
+    assert [item["user_id"] for item in results] == [str(user_ids[1]), str(missing), str(user_ids[0]), str(user_ids[2])]
+    assert [item["status"] for item in results] == ["ok", "not_found", "ok", "ok"]
+    db.expire_all()
+    assert db.query(User).filter(User.id.in_(user_ids)).count() == 0
@@ -0,0 +1,38 @@
+from uuid import UUID
+
+from api.configs.profiler import assert_max_queries
+from src.controller.pagination import encode_cursor
+from src.controller.role_controller import assign_role
+
+
+def test_get_user_omits_roles_unless_expanded(client, db, make_user, make_role):
+    user, role = make_user(), make_role()
+    assign_role(db, role, role.id, [user.id])
+
+    plain = client.get("/api/users/get", params={"user_id": str(user.id)})
+    assert plain.status_code == 200, plain.text
+    assert "roles" not in plain.json()
+
+    expanded = client.get("/api/users/get", params={"user_id": str(user.id), "expand": "roles"})
+    assert expanded.status_code == 200, expanded.text
+    assert [r["id"] for r in expanded.json()["roles"]] == [str(role.id)]
+
+
+def test_list_users_expands_roles_in_one_extra_query(client, db, make_user, make_role):
+    role = make_role()
+    users = [make_user() for _ in range(5)]
+    assign_role(db, role, role.id, [user.id for user in users])
+    # Trang bắt đầu từ user đầu tiên vừa tạo, không phụ thuộc dữ liệu sẵn có trong database
+    params = {"limit": 200, "cursor": encode_cursor(users[0].created_at, UUID(int=0))}
+
+    plain = client.get("/api/users/list", params=params)
+    assert plain.status_code == 200, plain.text
+    assert all("roles" not in item for item in plain.json())
+
+    # 1 SELECT users + 1 SELECT ... IN cho roles của cả trang
+    with assert_max_queries(2):
+        expanded = client.get("/api/users/list", params={**params, "expand": "roles"})
+    assert expanded.status_code == 200, expanded.text
+    by_id = {item["id"]: item for item in expanded.json()}
+    for user in users:
+        assert [r["id"] for r in by_id[str(user.id)]["roles"]] == [str(role.id)]
@@ -0,0 +1,100 @@
+from uuid import uuid4
+import json
+
+import pytest
+
+from src.controller import user_import_controller
+from src.models.user_model import User
+
+
+@pytest.fixture
+def prefix(db):
+    # Tên user của test bắt đầu bằng prefix riêng, xóa hết sau test
+    prefix = f"imp_{uuid4().hex[:8]}"
+    yield prefix
+    db.rollback()
+    db.query(User).filter(User.username.like(f"{prefix}%")).delete(synchronize_session=False)
+    db.commit()
+
+
+def imported(db, prefix):
+    db.expire_all()
+    return {user.username: user for user in db.query(User).filter(User.username.like(f"{prefix}%"))}
+
+
+def error_rows(result) -> list:
+    return sorted(error["row"] for error in result["errors"])
+
+
+@pytest.mark.parametrize("batch_size", [1000, 2])
+def test_import_ndjson(client, db, make_user, prefix, monkeypatch, batch_size):
+    monkeypatch.setattr(user_import_controller, "IMPORT_BATCH_SIZE", batch_size)
+    existing = make_user()
+    rows = [
+        json.dumps({"username": f"{prefix}_a", "email": f"{prefix}_a@example.com", "password": "secret1"}),
+        '{"username": ',
+        json.dumps({"username": f"{prefix}_bad", "email": "not-an-email", "password": "1"}),
+        json.dumps({"username": f"{prefix}_b", "email": f"{prefix}_b@example.com", "password": "secret1",
+                    "phone": "0123456789", "date_of_birth": "2000-01-02"}),
+        json.dumps({"username": f"{prefix}_a", "email": f"{prefix}_a2@example.com", "password": "secret1"}),
+        json.dumps({"username": f"{prefix}_c", "email": existing.email, "password": "secret1"}),
+    ]
+    body = "\n".join(rows[:3]) + "\n\n" + "\r\n".join(rows[3:])
+
+    response = client.post("/api/users/import", content=body, headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert (result["total"], result["inserted"], result["failed"]) == (6, 2, 4)
+    assert error_rows(result) == [2, 3, 5, 6]
+    errors = {error["row"]: error["error"] for error in result["errors"]}
+    assert errors[2].startswith("Malformed row")
+    assert "email" in errors[3] and "password" in errors[3]
+    assert "already exists" in errors[5] and "already exists" in errors[6]
+
+    users = imported(db, prefix)
+    assert set(users) == {f"{prefix}_a", f"{prefix}_b"}
+    assert users[f"{prefix}_a"].email == f"{prefix}_a@example.com"
+    assert users[f"{prefix}_b"].phone == "0123456789"
+    assert str(users[f"{prefix}_b"].date_of_birth) == "2000-01-02"
+    assert users[f"{prefix}_a"].password.startswith("$argon2")
+
+
+def test_import_csv(client, db, make_user, prefix):
+    existing = make_user()
+    body = "\n".join([
+        "username,email,password,phone,date_of_birth",
+        # Field trong ngoặc kép có xuống dòng vẫn là 1 bản ghi
+        f'"{prefix}_multi\nline",{prefix}_m@example.com,secret1,,',
+        f"{prefix}_plain,{prefix}_p@example.com,secret1,0123456789,1999-12-31",
+        f"{prefix}_short,{prefix}_s@example.com",
+        f"{prefix}_invalid,{prefix}_i@example.com,secret1,123,",
+        f"{prefix}_plain,{prefix}_p2@example.com,secret1,,",
+        f'{prefix}_dup,"{existing.email}",secret1,,',
+        "",
+    ])
+
+    response = client.post("/api/users/import", content=body, headers={"Content-Type": "text/csv"})
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert (result["total"], result["inserted"], result["failed"]) == (6, 2, 4)
+    assert error_rows(result) == [3, 4, 5, 6]
+    errors = {error["row"]: error["error"] for error in result["errors"]}
+    assert errors[3] == "Malformed row: expected 5 fields, got 2"
+    assert "phone" in errors[4]
+
+    users = imported(db, prefix)
+    assert set(users) == {f"{prefix}_multi\nline", f"{prefix}_plain"}
+    # Ô rỗng được lưu là NULL
+    multi = users[f"{prefix}_multi\nline"]
+    assert multi.phone is None and multi.date_of_birth is None
+    assert users[f"{prefix}_plain"].email == f"{prefix}_p@example.com"
+
+
+def test_import_csv_unterminated_quote(client, db, prefix):
+    body = f'username,email,password\n{prefix}_ok,{prefix}_ok@example.com,secret1\n"{prefix}_open,x@example.com,secret1\n'
+    response = client.post("/api/users/import", content=body, headers={"Content-Type": "text/csv"})
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert (result["total"], result["inserted"], result["failed"]) == (2, 1, 1)
+    assert result["errors"] == [{"row": 2, "error": "Malformed row: unterminated quoted field"}]
+    assert set(imported(db, prefix)) == {f"{prefix}_ok"}